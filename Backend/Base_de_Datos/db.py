@@ -1,8 +1,77 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
-# Configuración de la base de datos SQLite
+import config
 
-DATABASE_URL = "sqlite:////home/kendall/Desktop/ProyectoModelado/IntelliHome/Backend/Base_de_Datos/intellihome.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Configuración de la base de datos (URL y pool definidos en config.py / variables de entorno)
+
+DATABASE_URL = config.DATABASE_URL
+
+
+# URL asíncrona equivalente a la URL síncrona
+def url_asincrona(url: str) -> str:
+    """
+    Devuelve la URL con el driver asíncrono: sqlite -> aiosqlite, postgresql -> asyncpg.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        return url.set(drivername='sqlite+aiosqlite').render_as_string(hide_password=False)
+    if url.get_backend_name() == 'postgresql':
+        return url.set(drivername='postgresql+asyncpg').render_as_string(hide_password=False)
+    return url.render_as_string(hide_password=False)
+
+
+# PRAGMAs de rendimiento para SQLite
+def _configurar_sqlite(engine):
+    """
+    En cada conexión nueva: WAL (los lectores no se bloquean durante una escritura),
+    synchronous=NORMAL, busy_timeout, mmap_size y cache_size.
+    """
+    @event.listens_for(engine, "connect")
+    def aplicar_pragmas(conexion_dbapi, registro):
+        cursor = conexion_dbapi.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+        cursor.close()
+
+
+# Parámetros del engine según el motor
+def _opciones_engine(url: str) -> dict:
+    opciones = {
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+        'pool_pre_ping': True,
+    }
+    if make_url(url).get_backend_name() == 'sqlite':
+        opciones['connect_args'] = {'check_same_thread': False}
+    return opciones
+
+
+# Fábrica del engine síncrono (Alembic, scripts y herramientas)
+def crear_engine(url: str = DATABASE_URL):
+    engine = create_engine(url, **_opciones_engine(url))
+    if engine.dialect.name == 'sqlite':
+        _configurar_sqlite(engine)
+    return engine
+
+
+# Fábrica del engine asíncrono (endpoints de FastAPI)
+def crear_async_engine(url: str = None):
+    url = url or config.ASYNC_DATABASE_URL or url_asincrona(DATABASE_URL)
+    engine = create_async_engine(url, **_opciones_engine(url))
+    if engine.dialect.name == 'sqlite':
+        _configurar_sqlite(engine.sync_engine)
+    return engine
+
+
+engine = crear_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = crear_async_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
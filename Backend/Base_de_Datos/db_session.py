@@ -1,14 +1,10 @@
-
-from Base_de_Datos.db import SessionLocal
+from Base_de_Datos.db import AsyncSessionLocal
 
 # Dependencia para obtener la sesión de base de datos
 
-def get_db():
+async def get_db():
     """
-    Proporciona una sesión de base de datos a través de una dependencia de FastAPI.
+    Proporciona una sesión asíncrona de base de datos a través de una dependencia de FastAPI.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
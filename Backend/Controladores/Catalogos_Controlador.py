@@ -1,23 +1,35 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import List
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from Base_de_Datos.db_session import get_db
-from Modelos.Hobby import Hobby
-from Modelos.TipoCasa import TipoCasa
-from Modelos.PreguntaRecuperacion import PreguntaRecuperacion
+from Servicios.Catalogos_Servicio import Catalogos_Servicio
+from Servicios.Http_Utilidades import coincide_etag
+from Esquemas.Catalogos_Esquemas import ElementoCatalogo, PreguntaRecuperacion
 
 router = APIRouter(prefix="/catalogos", tags=["catálogos"])
 
+# Respuesta de un catálogo con soporte de ETag / 304.
+# El cuerpo ya viene serializado desde la caché; response_model solo documenta el esquema en OpenAPI.
+async def _responder_catalogo(nombre: str, request: Request, db: AsyncSession) -> Response:
+    entrada = await Catalogos_Servicio.obtener(db, nombre)
+    headers = {"ETag": entrada.etag, "Cache-Control": Catalogos_Servicio.CACHE_CONTROL}
+    if coincide_etag(request.headers.get("if-none-match"), entrada.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entrada.cuerpo, media_type="application/json", headers=headers)
+
 # Endpoint para obtener la lista de hobbies
-@router.get("/hobbies")
-def get_hobbies(db: Session = Depends(get_db)):
-    return [{"id": h.id, "nombre": h.nombre} for h in db.query(Hobby).all()]
+@router.get("/hobbies", response_model=List[ElementoCatalogo])
+async def get_hobbies(request: Request, db: AsyncSession = Depends(get_db)):
+    return await _responder_catalogo("hobbies", request, db)
 
 # Endpoint para obtener la lista de tipos de casa
-@router.get("/tipos-casa")
-def get_tipos_casa(db: Session = Depends(get_db)):
-    return [{"id": t.id, "nombre": t.nombre} for t in db.query(TipoCasa).all()]
+@router.get("/tipos-casa", response_model=List[ElementoCatalogo])
+async def get_tipos_casa(request: Request, db: AsyncSession = Depends(get_db)):
+    return await _responder_catalogo("tipos_casa", request, db)
 
 # Endpoint para obtener la lista de preguntas de recuperación
-@router.get("/preguntas-recuperacion")
-def get_preguntas_recuperacion(db: Session = Depends(get_db)):
-    return [{"id": p.id, "texto": p.texto} for p in db.query(PreguntaRecuperacion).all()]
+@router.get("/preguntas-recuperacion", response_model=List[PreguntaRecuperacion])
+async def get_preguntas_recuperacion(request: Request, db: AsyncSession = Depends(get_db)):
+    return await _responder_catalogo("preguntas_recuperacion", request, db)
+
@@ -0,0 +1,22 @@
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from Servicios.Token_Servicio import Token_Servicio, TokenInvalidoError
+
+# Esquema Bearer (Authorization: Bearer <token>)
+bearer = HTTPBearer(auto_error=False)
+
+# Dependencia para obtener el usuario autenticado a partir del token de acceso
+async def obtener_usuario_actual(credenciales: HTTPAuthorizationCredentials = Depends(bearer)) -> dict:
+    """
+    Verifica el token de acceso (firma HMAC, sin consultar la base de datos) y devuelve sus datos.
+    """
+    if credenciales is None:
+        raise HTTPException(
+            status_code=401,
+            detail={'token': 'Se requiere un token de acceso.'},
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+    try:
+        return Token_Servicio.verificar(credenciales.credentials, 'acceso')
+    except TokenInvalidoError as e:
+        raise HTTPException(status_code=401, detail={'token': str(e)}, headers={'WWW-Authenticate': 'Bearer'})
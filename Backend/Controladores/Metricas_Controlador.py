@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from Base_de_Datos.db_session import get_db
+from Servicios.Cola_Servicio import Cola_Servicio
+from Servicios.Metricas_Servicio import Metricas_Servicio
+
+router = APIRouter(tags=["métricas"])
+
+# Endpoint de métricas en formato de texto de Prometheus
+@router.get("/metrics", include_in_schema=False)
+async def get_metricas(db: AsyncSession = Depends(get_db)):
+    cola = await Cola_Servicio.profundidad(db)
+    valores = {
+        'intellihome_cola_pendientes': ('gauge', 'Trabajos pendientes en la cola (incluye los que esperan un reintento).', cola['pendiente']),
+        'intellihome_cola_en_proceso': ('gauge', 'Trabajos reclamados por un trabajador.', cola['en_proceso']),
+        'intellihome_cola_muertos': ('gauge', 'Trabajos que agotaron sus intentos.', cola['muerto']),
+        'intellihome_cola_antiguedad_segundos': ('gauge', 'Antigüedad del trabajo disponible más antiguo sin reclamar.', cola['antiguedad']),
+    }
+    return Response(
+        content=Metricas_Servicio.exportar(valores),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
+
+from Servicios.Arranque_Servicio import Arranque_Servicio
+
+router = APIRouter(tags=["salud"])
+
+# Liveness: el proceso atiende solicitudes (no consulta dependencias)
+@router.get("/healthz", include_in_schema=False)
+async def get_healthz():
+    return ORJSONResponse({"estado": "ok"})
+
+# Readiness: el worker está precalentado, la base de datos responde y la cola de hashing tiene espacio
+@router.get("/readyz", include_in_schema=False)
+async def get_readyz():
+    resultado = await Arranque_Servicio.verificar()
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK if resultado['listo'] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=resultado,
+        headers={"Cache-Control": "no-store"},
+    )
@@ -1,16 +1,27 @@
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Body, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from Servicios.Usuario_Servicio import Usuario_Servicio
-from typing import Optional
+from Servicios.Similitud_Servicio import Similitud_Servicio
+from typing import Dict, Optional
 from Base_de_Datos.db_session import get_db
+from Servicios.Almacenamiento_Servicio import obtener_almacenamiento
+from Servicios.Imagen_Servicio import Imagen_Servicio
+from Servicios.Http_Utilidades import coincide_etag
+from Controladores.Dependencias import obtener_usuario_actual
+from Esquemas.Usuario_Esquemas import (
+    Mensaje, LoginRespuesta, TokensSesion, PreguntaRecuperacionRespuesta, UsuarioActual, ValidacionRespuesta,
+    SimilaresRespuesta
+)
+import config
 
 router = APIRouter(prefix="/usuarios", tags=["usuarios"])
 
 # Endpoint para el registro de un nuevo usuario
 
-@router.post("/registro")
-def registrar_usuario(
+@router.post("/registro", response_model=Mensaje)
+async def registrar_usuario(
     nombre: str = Form(...),
     apellidos: str = Form(...),
     username: str = Form(...),
@@ -29,12 +40,12 @@ def registrar_usuario(
     numero_tarjeta: str = Form(...),
     fecha_expiracion: str = Form(...),
     token_publico: Optional[str] = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
     ):
     # Convertir cadenas separadas por comas a listas de enteros
     hobbies_ids_list = [int(i) for i in hobbies_ids.split(",")] if hobbies_ids else []
     tipos_casa_ids_list = [int(i) for i in tipos_casa_ids.split(",")] if tipos_casa_ids else []
-    resultado = Usuario_Servicio.registrar_usuario(
+    resultado = await Usuario_Servicio.registrar_usuario(
         db=db,
         nombre=nombre,
         apellidos=apellidos,
@@ -59,37 +70,37 @@ def registrar_usuario(
         raise HTTPException(status_code=422, detail=resultado['errores'])
     return resultado
 
-@router.post("/login")
-def login_usuario(
+@router.post("/login", response_model=LoginRespuesta)
+async def login_usuario(
     identificador: str = Form(...),
     contrasena: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
     ):
-    resultado = Usuario_Servicio.login_usuario(db=db, identificador=identificador, contrasena=contrasena)
+    resultado = await Usuario_Servicio.login_usuario(db=db, identificador=identificador, contrasena=contrasena)
     if "errores" in resultado:
         raise HTTPException(status_code=401, detail=resultado["errores"])
     return resultado
 
-@router.post("/recuperar-contrasena")
-def recuperar_contrasena(
+@router.post("/recuperar-contrasena", response_model=PreguntaRecuperacionRespuesta)
+async def recuperar_contrasena(
     identificador: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
     ):
     # respuesta con la pregunta de recuperación
-    resultado = Usuario_Servicio.obtener_pregunta_recuperacion(db=db, identificador=identificador)
+    resultado = await Usuario_Servicio.obtener_pregunta_recuperacion(db=db, identificador=identificador)
 
     if "errores" in resultado:
         raise HTTPException(status_code=400, detail=resultado["errores"])
     return resultado
 
-@router.post("/restablecer-contrasena")
-def restablecer_contrasena(
+@router.post("/restablecer-contrasena", response_model=Mensaje)
+async def restablecer_contrasena(
     identificador: str = Form(...),
     nueva_contrasena: str = Form(...),
     respuesta_recuperacion: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
     ):
-    resultado = Usuario_Servicio.restablecer_contrasena(
+    resultado = await Usuario_Servicio.restablecer_contrasena(
         db=db,
         identificador=identificador,
         nueva_contrasena=nueva_contrasena,
@@ -99,10 +110,67 @@ def restablecer_contrasena(
         raise HTTPException(status_code=400, detail=resultado["errores"])
     return resultado
     
+# Endpoint para renovar los tokens de sesión
+@router.post("/token/refrescar", response_model=TokensSesion)
+async def refrescar_token(refresh_token: str = Form(...), db: AsyncSession = Depends(get_db)):
+    resultado = await Usuario_Servicio.refrescar_sesion(db=db, refresh_token=refresh_token)
+    if 'errores' in resultado:
+        raise HTTPException(status_code=401, detail=resultado['errores'])
+    return resultado
+
+# Endpoint para cerrar la sesión
+@router.post("/logout", response_model=Mensaje)
+async def cerrar_sesion(refresh_token: str = Form(...), db: AsyncSession = Depends(get_db)):
+    resultado = await Usuario_Servicio.cerrar_sesion(db=db, refresh_token=refresh_token)
+    if 'errores' in resultado:
+        raise HTTPException(status_code=401, detail=resultado['errores'])
+    return resultado
+
+# Endpoint para validar campos del formulario de registro mientras se escriben (sin consultar la base de datos)
+@router.post("/validar", response_model=ValidacionRespuesta)
+async def validar_campos(campos: Dict[str, Optional[str]] = Body(...)):
+    return Usuario_Servicio.validar_campos(campos)
+
+# Endpoint para obtener el usuario autenticado (solo con el token, sin consultar la base de datos)
+@router.get("/yo", response_model=UsuarioActual)
+async def usuario_actual(usuario: dict = Depends(obtener_usuario_actual)):
+    return {"id": usuario["sub"], "username": usuario["username"], "rol_id": usuario["rol_id"]}
+
+# Endpoint de usuarios con hobbies y tipos de casa parecidos a los del usuario autenticado
+@router.get("/similares", response_model=SimilaresRespuesta)
+async def usuarios_similares(
+    k: int = Query(10, ge=1, le=config.SIMILITUD_MAX_K),
+    usuario: dict = Depends(obtener_usuario_actual),
+    db: AsyncSession = Depends(get_db)
+):
+    return await Similitud_Servicio.similares(db=db, usuario_id=usuario["sub"], k=k)
+
 # Endpoint para buscar usuario por token público
-@router.post("/buscar-por-token")
-def buscar_usuario_por_token(token_publico: str = Form(...), db: Session = Depends(get_db)):
-    resultado = Usuario_Servicio.buscar_por_token_publico(db=db, token_publico=token_publico)
+@router.post("/buscar-por-token", response_model=LoginRespuesta)
+async def buscar_usuario_por_token(token_publico: str = Form(...), db: AsyncSession = Depends(get_db)):
+    resultado = await Usuario_Servicio.buscar_por_token_publico(db=db, token_publico=token_publico)
     if 'errores' in resultado:
         raise HTTPException(status_code=404, detail=resultado['errores'])
     return resultado
+
+# Endpoint para obtener la imagen de perfil (miniatura con ?size=, la más grande si no se indica)
+@router.get("/{usuario_id}/imagen")
+async def obtener_imagen(usuario_id: int, request: Request, size: Optional[int] = None, db: AsyncSession = Depends(get_db)):
+    resultado = await Usuario_Servicio.obtener_imagen(db=db, usuario_id=usuario_id, tamano=size)
+    if 'errores' in resultado:
+        raise HTTPException(status_code=400 if 'size' in resultado['errores'] else 404, detail=resultado['errores'])
+    clave = resultado['clave']
+    # La clave se deriva del hash del contenido, por lo que sirve como ETag fuerte
+    headers = {
+        "ETag": f'"{clave.rsplit(".", 1)[0]}"',
+        "Cache-Control": f"public, max-age={config.IMAGEN_MAX_AGE}",
+    }
+    if coincide_etag(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    media_type = Imagen_Servicio.TIPOS_MIME.get(clave.rsplit(".", 1)[-1], "application/octet-stream")
+    almacenamiento = obtener_almacenamiento()
+    ruta = almacenamiento.ruta_local(clave)
+    if ruta:
+        # FileResponse atiende solicitudes Range
+        return FileResponse(ruta, media_type=media_type, headers=headers)
+    return Response(content=await almacenamiento.leer(clave), media_type=media_type, headers=headers)
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class ElementoCatalogo(BaseModel):
+    """
+    Elemento de los catálogos de hobbies y tipos de casa.
+    """
+    id: int
+    nombre: str
+
+
+class PreguntaRecuperacion(BaseModel):
+    """
+    Elemento del catálogo de preguntas de recuperación.
+    """
+    id: int
+    texto: str
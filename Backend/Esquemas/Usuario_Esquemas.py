@@ -0,0 +1,84 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class Mensaje(BaseModel):
+    """
+    Respuesta de confirmación de una operación.
+    """
+    mensaje: str
+
+
+class UsuarioSesion(BaseModel):
+    """
+    Datos del usuario que se devuelven al iniciar sesión.
+    """
+    id: int
+    username: str
+    correo: str
+    telefono: str
+    nombre: str
+    apellidos: str
+    rol_id: int
+    estado_cuenta: str
+
+
+class TokensSesion(BaseModel):
+    """
+    Par de tokens de sesión (acceso y refresco).
+    """
+    access_token: str
+    refresh_token: str
+    token_type: str
+    expires_in: int
+
+
+class LoginRespuesta(TokensSesion, UsuarioSesion):
+    """
+    Respuesta del login y de la búsqueda por token público: usuario + tokens de sesión
+    (pydantic ordena los campos desde la última base, así el JSON empieza con los del usuario).
+    """
+
+
+class PreguntaRecuperacionRespuesta(BaseModel):
+    """
+    Pregunta de recuperación asociada al identificador.
+    """
+    identificador: str
+    pregunta_id: int
+    pregunta: str
+
+
+class UsuarioActual(BaseModel):
+    """
+    Usuario autenticado según el token de acceso.
+    """
+    id: int
+    username: str
+    rol_id: int
+
+
+class ValidacionRespuesta(BaseModel):
+    """
+    Resultado de validar campos del formulario de registro.
+    """
+    valido: bool
+    errores: Dict[str, str]
+
+
+class UsuarioSimilar(BaseModel):
+    """
+    Usuario con hobbies y tipos de casa en común (similitud = índice de Jaccard).
+    """
+    id: int
+    username: str
+    en_comun: int
+    similitud: float
+
+
+class SimilaresRespuesta(BaseModel):
+    """
+    Usuarios más parecidos al usuario autenticado, de mayor a menor similitud.
+    """
+    usuarios: List[UsuarioSimilar]
@@ -0,0 +1,86 @@
+"""
+Exportación de usuarios a CSV o JSONL sin cargar la tabla en memoria.
+
+Las filas se leen con un cursor en streaming (yield_per) y se escriben a medida que llegan.
+Los hobbies y tipos de casa se exportan como IDs separados por comas, en el mismo formato que
+acepta Herramientas.importar_usuarios. No se exportan la contraseña (hash), el número de tarjeta
+cifrado ni la respuesta de recuperación.
+
+Uso (desde la carpeta Backend):
+    python -m Herramientas.exportar_usuarios usuarios.csv
+    python -m Herramientas.exportar_usuarios usuarios.jsonl --lote 2000
+"""
+import argparse
+import asyncio
+import csv
+import json
+
+from sqlalchemy import String, cast, func, select
+
+from Modelos.Usuario import Usuario
+from Modelos.Hobby import UsuarioHobby
+from Modelos.UsuarioTipoCasa import UsuarioTipoCasa
+from Modelos.Roles import Rol  # noqa: F401 (necesario para configurar los mappers)
+from Modelos.TipoCasa import TipoCasa  # noqa: F401
+
+# Columnas exportadas de la tabla usuario
+COLUMNAS = (
+    'id', 'username', 'correo', 'telefono', 'nombre', 'apellidos', 'fecha_nacimiento', 'domicilio',
+    'imagen_perfil', 'rol_id', 'pregunta_recuperacion_id', 'permitir_huella', 'token_publico',
+    'intentos_fallidos', 'estado_cuenta', 'nombre_titular', 'fecha_expiracion', 'marca', 'ultimos_4',
+)
+
+
+# Consulta de exportación
+def consulta_exportacion():
+    """
+    Selecciona las columnas exportadas y las asociaciones agregadas como "1,2,3" (subconsultas correlacionadas).
+    """
+    hobbies = select(func.aggregate_strings(cast(UsuarioHobby.hobby_id, String), ',')) \
+        .where(UsuarioHobby.usuario_id == Usuario.id).scalar_subquery()
+    tipos_casa = select(func.aggregate_strings(cast(UsuarioTipoCasa.tipo_casa_id, String), ',')) \
+        .where(UsuarioTipoCasa.usuario_id == Usuario.id).scalar_subquery()
+    return select(
+        *(getattr(Usuario, c) for c in COLUMNAS),
+        hobbies.label('hobbies_ids'),
+        tipos_casa.label('tipos_casa_ids'),
+    ).order_by(Usuario.id)
+
+
+# Exportar la tabla
+async def exportar(ruta: str, session_factory, tamano_lote: int = 1000) -> int:
+    """
+    Escribe los usuarios en el archivo (CSV o JSONL según la extensión) y devuelve cuántos se exportaron.
+    """
+    jsonl = ruta.lower().endswith(('.jsonl', '.ndjson'))
+    total = 0
+    async with session_factory() as db:
+        resultado = await db.stream(consulta_exportacion().execution_options(yield_per=tamano_lote))
+        with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+            escritor = None if jsonl else csv.writer(archivo)
+            if escritor:
+                escritor.writerow((*COLUMNAS, 'hobbies_ids', 'tipos_casa_ids'))
+            async for fila in resultado:
+                if jsonl:
+                    archivo.write(json.dumps(fila._asdict(), ensure_ascii=False, default=str) + '\n')
+                else:
+                    escritor.writerow(fila)
+                total += 1
+    return total
+
+
+if __name__ == "__main__":
+    from Base_de_Datos.db import AsyncSessionLocal, async_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo", help="Archivo de salida .csv o .jsonl")
+    parser.add_argument("--lote", type=int, default=1000, help="Filas leídas por viaje a la base de datos")
+    args = parser.parse_args()
+
+    async def principal():
+        try:
+            return await exportar(args.archivo, AsyncSessionLocal, args.lote)
+        finally:
+            await async_engine.dispose()
+
+    print(f"Usuarios exportados: {asyncio.run(principal())}")
@@ -0,0 +1,176 @@
+"""
+Importación masiva de usuarios desde un archivo CSV o JSONL.
+
+El archivo se lee por lotes (memoria constante) y cada lote pasa por los mismos validadores del
+registro (Usuario_Servicio.registrar_lote): las contraseñas se hashean en el pool de procesos y los
+usuarios válidos se insertan con executemany y un commit por lote.
+
+Columnas (las mismas del formulario de registro):
+    nombre, apellidos, username, correo, telefono, fecha_nacimiento, domicilio, contrasena,
+    imagen_perfil (ruta del archivo, relativa al archivo de entrada), hobbies_ids ("1,2" o lista),
+    tipos_casa_ids, pregunta_recuperacion_id, respuesta_recuperacion, permitir_huella,
+    nombre_titular, numero_tarjeta, fecha_expiracion, token_publico (opcional)
+
+Los registros rechazados se escriben en el reporte (JSONL: fila y errores por campo). Después de cada
+lote confirmado se actualiza el checkpoint; con --reanudar se continúa desde la última fila confirmada.
+
+Uso (desde la carpeta Backend):
+    python -m Herramientas.importar_usuarios socios.csv --lote 500 --reporte errores.jsonl --reanudar
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+
+from starlette.datastructures import UploadFile
+
+from Servicios.Usuario_Servicio import Usuario_Servicio
+from Modelos.Roles import Rol  # noqa: F401 (necesario para configurar los mappers)
+from Modelos.TipoCasa import TipoCasa  # noqa: F401
+
+# Columnas de texto obligatorias (se normalizan a '' si faltan)
+COLUMNAS_TEXTO = (
+    'nombre', 'apellidos', 'username', 'correo', 'telefono', 'fecha_nacimiento', 'domicilio',
+    'contrasena', 'respuesta_recuperacion', 'nombre_titular', 'numero_tarjeta', 'fecha_expiracion',
+)
+
+
+# Leer los registros del archivo uno a uno
+def leer_registros(ruta: str):
+    """
+    Devuelve un iterador de (número de fila, diccionario crudo) para CSV o JSONL.
+    """
+    with open(ruta, encoding='utf-8-sig', newline='') as archivo:
+        if ruta.lower().endswith(('.jsonl', '.ndjson')):
+            filas = (json.loads(linea) for linea in archivo if linea.strip())
+        else:
+            filas = csv.DictReader(archivo)
+        yield from enumerate(filas, start=1)
+
+
+# Convertir una fila cruda en los argumentos del registro
+def convertir(crudo: dict, carpeta: str):
+    """
+    Normaliza los tipos de una fila (IDs, enteros, imagen). Devuelve (registro, errores de formato).
+    """
+    errores = {}
+    registro = {columna: str(crudo.get(columna) or '').strip() for columna in COLUMNAS_TEXTO}
+    registro['token_publico'] = str(crudo.get('token_publico') or '').strip() or None
+
+    for columna in ('hobbies_ids', 'tipos_casa_ids'):
+        valor = crudo.get(columna) or []
+        try:
+            registro[columna] = [int(v) for v in (valor.split(',') if isinstance(valor, str) else valor) if str(v).strip()]
+        except ValueError:
+            errores[columna] = 'Debe ser una lista de IDs numéricos separados por comas.'
+    for columna, defecto in (('pregunta_recuperacion_id', None), ('permitir_huella', 0)):
+        valor = crudo.get(columna)
+        try:
+            registro[columna] = int(valor) if valor not in (None, '') else defecto
+        except (TypeError, ValueError):
+            errores[columna] = 'Debe ser un número entero.'
+
+    registro['imagen_perfil'] = None
+    ruta_imagen = str(crudo.get('imagen_perfil') or '').strip()
+    if ruta_imagen:
+        ruta_imagen = os.path.join(carpeta, ruta_imagen)
+        try:
+            registro['imagen_perfil'] = UploadFile(
+                open(ruta_imagen, 'rb'), size=os.path.getsize(ruta_imagen), filename=os.path.basename(ruta_imagen)
+            )
+        except OSError:
+            errores['imagen_perfil'] = f'No se pudo abrir la imagen {ruta_imagen}.'
+    return registro, errores
+
+
+# Leer el checkpoint
+def leer_checkpoint(ruta: str, archivo: str) -> int:
+    """
+    Devuelve la última fila confirmada del archivo (0 si no hay checkpoint para él).
+    """
+    if not os.path.exists(ruta):
+        return 0
+    with open(ruta, encoding='utf-8') as f:
+        datos = json.load(f)
+    return datos['fila'] if datos.get('archivo') == os.path.abspath(archivo) else 0
+
+
+# Guardar el checkpoint
+def guardar_checkpoint(ruta: str, archivo: str, resumen: dict):
+    """
+    Escribe el checkpoint (última fila confirmada) de forma atómica: archivo temporal + reemplazo.
+    """
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'archivo': os.path.abspath(archivo), **resumen}, f)
+    os.replace(temporal, ruta)
+
+
+# Importar el archivo completo
+async def importar(ruta: str, session_factory, tamano_lote: int = 500, ruta_reporte: str = None,
+                   ruta_checkpoint: str = None, reanudar: bool = False) -> dict:
+    """
+    Importa los registros del archivo por lotes y devuelve el resumen (importados, rechazados, fila).
+    Si el proceso se interrumpe entre un commit y el checkpoint, al reanudar ese lote se reporta
+    como duplicado (la unicidad impide insertarlo dos veces).
+    """
+    ruta_reporte = ruta_reporte or ruta + '.errores.jsonl'
+    ruta_checkpoint = ruta_checkpoint or ruta + '.checkpoint.json'
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    desde = leer_checkpoint(ruta_checkpoint, ruta) if reanudar else 0
+    resumen = {'importados': 0, 'rechazados': 0, 'fila': desde}
+
+    registros = ((fila, crudo) for fila, crudo in leer_registros(ruta) if fila > desde)
+    with open(ruta_reporte, 'a' if reanudar else 'w', encoding='utf-8') as reporte:
+        while lote := list(itertools.islice(registros, tamano_lote)):
+            convertidos = [(fila, *convertir(crudo, carpeta)) for fila, crudo in lote]
+            try:
+                aptos = [(fila, registro) for fila, registro, errores in convertidos if not errores]
+                async with session_factory() as db:
+                    errores_lote = await Usuario_Servicio.registrar_lote(db, [registro for _, registro in aptos])
+            finally:
+                for _, registro, _ in convertidos:
+                    if registro['imagen_perfil'] is not None:
+                        registro['imagen_perfil'].file.close()
+
+            rechazos = [(fila, errores) for fila, _, errores in convertidos if errores]
+            rechazos += [(fila, errores) for (fila, _), errores in zip(aptos, errores_lote) if errores]
+            for fila, errores in sorted(rechazos, key=lambda r: r[0]):
+                reporte.write(json.dumps({'fila': fila, 'errores': errores}, ensure_ascii=False) + '\n')
+            reporte.flush()
+
+            resumen['rechazados'] += len(rechazos)
+            resumen['importados'] += len(lote) - len(rechazos)
+            resumen['fila'] = lote[-1][0]
+            guardar_checkpoint(ruta_checkpoint, ruta, resumen)
+            print(f"fila {resumen['fila']}: {resumen['importados']} importados, {resumen['rechazados']} rechazados")
+    return resumen
+
+
+if __name__ == "__main__":
+    from Base_de_Datos.db import AsyncSessionLocal, async_engine
+    from Servicios.Cifrado_Servicio import Cifrado_Servicio
+    from Servicios.Hash_Servicio import Hash_Servicio
+    from Servicios.Obscenidad_Servicio import Obscenidad_Servicio
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo", help="Archivo .csv o .jsonl")
+    parser.add_argument("--lote", type=int, default=500, help="Registros por lote (un commit por lote)")
+    parser.add_argument("--reporte", help="Reporte de errores (por defecto <archivo>.errores.jsonl)")
+    parser.add_argument("--checkpoint", help="Archivo de checkpoint (por defecto <archivo>.checkpoint.json)")
+    parser.add_argument("--reanudar", action="store_true", help="Continuar desde el checkpoint")
+    args = parser.parse_args()
+
+    async def principal():
+        try:
+            return await importar(args.archivo, AsyncSessionLocal, args.lote, args.reporte, args.checkpoint, args.reanudar)
+        finally:
+            await async_engine.dispose()
+            Hash_Servicio.cerrar()
+
+    Cifrado_Servicio.cargar()
+    Obscenidad_Servicio.cargar()
+    resultado = asyncio.run(principal())
+    print(f"Importados: {resultado['importados']}  Rechazados: {resultado['rechazados']}")
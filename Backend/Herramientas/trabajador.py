@@ -0,0 +1,87 @@
+"""
+Trabajador de la cola de trabajos en un proceso aparte.
+
+Por defecto cada worker de la API ejecuta su propio trabajador (COLA_TRABAJADOR_EMBEBIDO=1). Con
+COLA_TRABAJADOR_EMBEBIDO=0 la API solo encola y los trabajos los ejecuta este proceso; pueden
+ejecutarse varios a la vez (un trabajo nunca lo reclaman dos trabajadores al mismo tiempo).
+SIGTERM o Ctrl+C dejan de reclamar trabajos y esperan los que están en curso.
+
+Uso (desde la carpeta Backend):
+    python -m Herramientas.trabajador --concurrencia 8 --puerto-metricas 9100
+    python -m Herramientas.trabajador --estado
+    python -m Herramientas.trabajador --reintentar-muertos --tipo miniaturas
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Servicios.Metricas_Servicio import Metricas_Servicio
+
+
+# Servidor de métricas del trabajador (en un hilo aparte)
+def servir_metricas(puerto: int):
+    """
+    Expone /metrics con los contadores e histogramas de los trabajos ejecutados por este proceso.
+    """
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            cuerpo = Metricas_Servicio.exportar({}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('0.0.0.0', puerto), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+
+# Ejecutar el trabajador hasta recibir SIGTERM o SIGINT
+async def ejecutar(trabajador):
+    bucle = asyncio.get_running_loop()
+    tarea = asyncio.create_task(trabajador.ejecutar())
+    detener = asyncio.Event()
+    for senal in (signal.SIGTERM, signal.SIGINT):
+        bucle.add_signal_handler(senal, detener.set)
+    await detener.wait()
+    await trabajador.detener()
+    tarea.cancel()
+
+
+if __name__ == "__main__":
+    from Base_de_Datos.db import AsyncSessionLocal, async_engine
+    from Servicios.Cola_Servicio import Cola_Servicio
+    from Servicios.Trabajador import Trabajador
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrencia", type=int, help="Trabajos simultáneos (por defecto COLA_CONCURRENCIA)")
+    parser.add_argument("--puerto-metricas", type=int, help="Puerto para exponer /metrics de este proceso")
+    parser.add_argument("--estado", action="store_true", help="Mostrar la cantidad de trabajos por estado y salir")
+    parser.add_argument("--reintentar-muertos", action="store_true", help="Devolver los trabajos muertos a la cola y salir")
+    parser.add_argument("--tipo", help="Con --reintentar-muertos: solo los trabajos de este tipo")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    async def principal():
+        try:
+            async with AsyncSessionLocal() as db:
+                if args.estado:
+                    return await Cola_Servicio.profundidad(db)
+                if args.reintentar_muertos:
+                    return {'reencolados': await Cola_Servicio.reintentar_muertos(db, args.tipo)}
+            if args.puerto_metricas:
+                servir_metricas(args.puerto_metricas)
+            await ejecutar(Trabajador(concurrencia=args.concurrencia))
+        finally:
+            await async_engine.dispose()
+
+    resultado = asyncio.run(principal())
+    if resultado is not None:
+        print('  '.join(f'{clave}: {valor:.1f}' if isinstance(valor, float) else f'{clave}: {valor}'
+                        for clave, valor in resultado.items()))
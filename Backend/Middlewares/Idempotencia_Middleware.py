@@ -0,0 +1,175 @@
+import json
+import time
+
+import config
+from Servicios.Idempotencia_Servicio import HuellaCuerpo, Idempotencia_Servicio
+from Servicios.Metricas_Servicio import Metricas_Servicio
+
+# Rutas POST que aceptan el encabezado Idempotency-Key
+RUTAS_IDEMPOTENTES = frozenset(('/usuarios/registro',))
+
+# Longitud máxima de la clave enviada por el cliente
+MAX_CLAVE = 255
+
+
+class Idempotencia_Middleware:
+    """
+    Middleware ASGI de claves de idempotencia (encabezado Idempotency-Key).
+
+    La primera solicitud con una clave reserva la clave, se procesa normalmente y su respuesta
+    (estado, encabezados y cuerpo) se guarda por IDEMPOTENCIA_TTL segundos junto con la huella del
+    cuerpo. Un reintento con la misma clave recibe esa respuesta byte por byte sin llegar a la
+    aplicación (ni al multipart, ni a bcrypt, ni a la base de datos); si llega mientras la primera
+    sigue en curso, espera a que termine en lugar de procesarse en paralelo. Reutilizar la clave con
+    otro cuerpo responde 422. Las respuestas 5xx, 408 y 429 no se guardan.
+    """
+
+    def __init__(self, app, rutas: frozenset = None):
+        self.app = app
+        self.rutas = RUTAS_IDEMPOTENTES if rutas is None else rutas
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'POST' or scope['path'] not in self.rutas:
+            await self.app(scope, receive, send)
+            return
+        clave = _encabezado(scope, b'idempotency-key')
+        if clave is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(clave) <= MAX_CLAVE:
+            await _responder(send, 400, f'La clave de idempotencia debe tener entre 1 y {MAX_CLAVE} caracteres.')
+            return
+
+        clave = f"idempotencia:{scope['path']}:{clave}"
+        almacen = Idempotencia_Servicio.almacen()
+        fin = time.monotonic() + config.IDEMPOTENCIA_ESPERA_SEGUNDOS
+        coalescida = False
+        while True:
+            registro = await almacen.reservar(clave, config.IDEMPOTENCIA_RESERVA_SEGUNDOS)
+            if registro is None:
+                await self._procesar(scope, receive, send, clave)
+                return
+            if registro['estado'] == 'completa':
+                await _reproducir(scope, receive, send, registro, 'coalescida' if coalescida else 'reproducida')
+                return
+            restante = fin - time.monotonic()
+            if restante <= 0:
+                _contar('en_curso')
+                await _responder(send, 409, 'La solicitud original sigue en proceso. Intente de nuevo.', reintentar=True)
+                return
+            coalescida = True
+            await almacen.esperar(clave, restante)
+
+    # Procesar la solicitud y guardar su respuesta
+    async def _procesar(self, scope, receive, send, clave: str):
+        """
+        Ejecuta la aplicación calculando la huella del cuerpo a medida que lo lee y copiando la
+        respuesta. La respuesta se guarda con el último fragmento (antes de las tareas de fondo),
+        así las solicitudes que esperaban la clave no esperan también a esas tareas.
+        """
+        almacen = Idempotencia_Servicio.almacen()
+        huella = HuellaCuerpo(_delimitador(scope))
+        estado = {'cuerpo_completo': False, 'inicio': None, 'partes': [], 'terminada': False}
+
+        async def receive_con_huella():
+            mensaje = await receive()
+            if mensaje['type'] == 'http.request':
+                huella.actualizar(mensaje.get('body', b''))
+                if not mensaje.get('more_body', False):
+                    estado['cuerpo_completo'] = True
+            return mensaje
+
+        async def guardar_respuesta():
+            inicio = estado['inicio']
+            cuerpo = b''.join(estado['partes'])
+            if not Idempotencia_Servicio.se_guarda(inicio['status']) or len(cuerpo) > config.IDEMPOTENCIA_MAX_RESPUESTA:
+                _contar('no_guardada')
+                await almacen.liberar(clave)
+                return
+            await almacen.guardar(clave, {
+                'estado': 'completa',
+                # Si la aplicación no leyó todo el cuerpo, la huella es parcial y no se compara
+                'huella': huella.resultado() if estado['cuerpo_completo'] else None,
+                'status': inicio['status'],
+                'headers': [[nombre.decode('latin-1'), valor.decode('latin-1')] for nombre, valor in inicio.get('headers', [])],
+                'cuerpo': cuerpo,
+            }, config.IDEMPOTENCIA_TTL)
+            _contar('nueva')
+
+        async def send_con_copia(mensaje):
+            # Se guarda antes de enviar el último fragmento: si el cliente ya se desconectó,
+            # su reintento recibe esta respuesta en lugar de volver a registrar
+            if mensaje['type'] == 'http.response.start':
+                estado['inicio'] = mensaje
+            elif mensaje['type'] == 'http.response.body' and not estado['terminada']:
+                estado['partes'].append(mensaje.get('body', b''))
+                if not mensaje.get('more_body', False):
+                    estado['terminada'] = True
+                    await guardar_respuesta()
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive_con_huella, send_con_copia)
+        finally:
+            if not estado['terminada']:
+                _contar('no_guardada')
+                await almacen.liberar(clave)
+
+
+#================================= UTILIDADES ================================= #
+
+# Leer un encabezado de la solicitud
+def _encabezado(scope, nombre: bytes):
+    for clave, valor in scope['headers']:
+        if clave == nombre:
+            return valor.decode('latin-1').strip()
+    return None
+
+
+# Delimitador multipart del Content-Type (vacío si no es multipart)
+def _delimitador(scope) -> bytes:
+    tipo = (_encabezado(scope, b'content-type') or '').encode('latin-1')
+    if not tipo.startswith(b'multipart/form-data') or b'boundary=' not in tipo:
+        return b''
+    return tipo.split(b'boundary=', 1)[1].split(b';')[0].strip(b'"')
+
+
+# Responder con la respuesta guardada
+async def _reproducir(scope, receive, send, registro: dict, resultado: str):
+    """
+    Lee el cuerpo del reintento solo para calcular su huella (no se interpreta) y, si coincide con
+    la de la solicitud original, envía la respuesta guardada con Idempotent-Replayed: true.
+    """
+    huella = HuellaCuerpo(_delimitador(scope))
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'http.disconnect':
+            return
+        huella.actualizar(mensaje.get('body', b''))
+        if not mensaje.get('more_body', False):
+            break
+    if registro['huella'] is not None and huella.resultado() != registro['huella']:
+        _contar('distinta')
+        await _responder(send, 422, 'La clave de idempotencia ya se usó con una solicitud distinta.')
+        return
+
+    _contar(resultado)
+    headers = [(nombre.encode('latin-1'), valor.encode('latin-1')) for nombre, valor in registro['headers']]
+    headers.append((b'idempotent-replayed', b'true'))
+    await send({'type': 'http.response.start', 'status': registro['status'], 'headers': headers})
+    await send({'type': 'http.response.body', 'body': registro['cuerpo']})
+
+
+# Responder un error de idempotencia
+async def _responder(send, status: int, mensaje: str, reintentar: bool = False):
+    cuerpo = json.dumps({'detail': {'idempotencia': mensaje}}, ensure_ascii=False).encode('utf-8')
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(cuerpo)).encode())]
+    if reintentar:
+        headers.append((b'retry-after', b'1'))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': cuerpo})
+
+
+# Contar el resultado de una solicitud con clave
+def _contar(resultado: str):
+    Metricas_Servicio.incrementar('intellihome_idempotencia_total', (('resultado', resultado),))
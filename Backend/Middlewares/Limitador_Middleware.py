@@ -0,0 +1,175 @@
+import json
+import math
+from collections import deque
+from urllib.parse import parse_qs
+
+import config
+from Servicios.Limitador_Servicio import Limitador_Servicio
+
+# Rutas limitadas y el campo del formulario que identifica la cuenta atacada
+RUTAS_LIMITADAS = {
+    '/usuarios/login': 'identificador',
+    '/usuarios/recuperar-contrasena': 'identificador',
+    '/usuarios/restablecer-contrasena': 'identificador',
+    '/usuarios/buscar-por-token': 'token_publico',
+}
+
+# Tamaño máximo del cuerpo en las rutas limitadas (estos formularios son pequeños). Uno más grande se
+# rechaza con 413: si pasara sin leerse, no se consumiría la cubeta del identificador
+MAX_CUERPO = 16 * 1024
+
+
+class Limitador_Middleware:
+    """
+    Middleware ASGI de limitación de tasa (token bucket) para las rutas de autenticación.
+
+    Primero se consume una ficha de la cubeta de la IP, sin leer el cuerpo; si se permitió,
+    se lee el formulario y se consume una ficha de la cubeta del identificador. Las solicitudes
+    rechazadas responden 429 con Retry-After antes de llegar a la base de datos o a bcrypt, y las
+    de cuerpo mayor a MAX_CUERPO responden 413.
+    """
+
+    def __init__(self, app, rutas: dict = None, limite_ip: str = None, limite_identificador: str = None):
+        self.app = app
+        self.rutas = RUTAS_LIMITADAS if rutas is None else rutas
+        self.limite_ip = Limitador_Servicio.parsear_limite(limite_ip or config.LIMITE_TASA_IP)
+        self.limite_identificador = Limitador_Servicio.parsear_limite(
+            limite_identificador or config.LIMITE_TASA_IDENTIFICADOR
+        )
+
+    async def __call__(self, scope, receive, send):
+        campo = self.rutas.get(scope.get('path')) if scope['type'] == 'http' else None
+        if campo is None or scope['method'] != 'POST':
+            await self.app(scope, receive, send)
+            return
+
+        ruta = scope['path']
+        espera = await Limitador_Servicio.consumir(f'ip:{ruta}:{_ip_cliente(scope)}', self.limite_ip)
+        if espera:
+            await _rechazar(send, espera)
+            return
+
+        cuerpo, receive = await _leer_cuerpo(scope, receive)
+        if cuerpo is None:
+            await _demasiado_grande(send)
+            return
+        valor = _campo_formulario(scope, cuerpo, campo)
+        if valor:
+            espera = await Limitador_Servicio.consumir(f'id:{ruta}:{valor}', self.limite_identificador)
+            if espera:
+                await _rechazar(send, espera)
+                return
+
+        await self.app(scope, receive, send)
+
+
+#================================= UTILIDADES ================================= #
+
+# Obtener la IP del cliente
+def _ip_cliente(scope) -> str:
+    """
+    Devuelve la IP del cliente de la conexión. Detrás de un proxy de confianza (FORWARDED_ALLOW_IPS)
+    uvicorn ya la resolvió a partir de X-Forwarded-For, así que el encabezado no se lee aquí.
+    """
+    cliente = scope.get('client')
+    return cliente[0] if cliente else 'desconocido'
+
+
+# Leer el cuerpo de la solicitud sin consumirlo para la aplicación
+async def _leer_cuerpo(scope, receive):
+    """
+    Lee el cuerpo (hasta MAX_CUERPO) y devuelve (cuerpo o None si es más grande, receive que lo repite).
+    Si Content-Length ya supera el máximo no se lee nada. Si el cliente se desconecta, el cuerpo es lo
+    recibido hasta entonces y la aplicación recibe la desconexión.
+    """
+    for nombre, valor in scope['headers']:
+        if nombre == b'content-length' and valor.isdigit() and int(valor) > MAX_CUERPO:
+            return None, receive
+
+    mensajes = deque()
+    tamano = 0
+    while True:
+        mensaje = await receive()
+        mensajes.append(mensaje)
+        if mensaje['type'] != 'http.request':
+            break
+        tamano += len(mensaje.get('body', b''))
+        if tamano > MAX_CUERPO:
+            return None, receive
+        if not mensaje.get('more_body', False):
+            break
+
+    cuerpo = b''.join(m.get('body', b'') for m in mensajes)
+
+    async def repetir():
+        if mensajes:
+            return mensajes.popleft()
+        return await receive()
+
+    return cuerpo, repetir
+
+
+# Extraer un campo del formulario (urlencoded o multipart)
+def _campo_formulario(scope, cuerpo: bytes, campo: str):
+    """
+    Devuelve el valor normalizado del campo del formulario, o None si no está.
+    """
+    tipo = b''
+    for nombre, valor in scope['headers']:
+        if nombre == b'content-type':
+            tipo = valor
+            break
+
+    if tipo.startswith(b'application/x-www-form-urlencoded'):
+        valores = parse_qs(cuerpo.decode('latin-1'), encoding='utf-8').get(campo)
+        valor = valores[0] if valores else None
+    elif tipo.startswith(b'multipart/form-data') and b'boundary=' in tipo:
+        valor = _campo_multipart(cuerpo, tipo.split(b'boundary=', 1)[1].split(b';')[0].strip(b'"'), campo)
+    else:
+        return None
+    return valor.strip().lower() if valor else None
+
+
+# Extraer un campo de un cuerpo multipart
+def _campo_multipart(cuerpo: bytes, limite: bytes, campo: str):
+    """
+    Busca la parte con name="campo" y devuelve su contenido como texto.
+    """
+    marca = f'name="{campo}"'.encode()
+    for parte in cuerpo.split(b'--' + limite):
+        cabecera, _, contenido = parte.partition(b'\r\n\r\n')
+        if marca in cabecera:
+            return contenido.removesuffix(b'\r\n').decode('utf-8', 'replace')
+    return None
+
+
+# Responder 429 con Retry-After
+async def _rechazar(send, espera: float):
+    """
+    Envía la respuesta 429 indicando cuántos segundos esperar.
+    """
+    segundos = max(math.ceil(espera), 1)
+    await _responder(
+        send, 429, {'limite': f'Demasiadas solicitudes. Intente de nuevo en {segundos} segundos.'},
+        [(b'retry-after', str(segundos).encode())],
+    )
+
+
+# Responder 413 (cuerpo mayor a MAX_CUERPO)
+async def _demasiado_grande(send):
+    await _responder(send, 413, {'cuerpo': f'El formulario no puede superar {MAX_CUERPO // 1024} KB.'})
+
+
+# Enviar una respuesta JSON con el formato de error de la API
+async def _responder(send, estado: int, detalle: dict, encabezados: list = ()):
+    cuerpo = json.dumps({'detail': detalle}, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': estado,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(cuerpo)).encode()),
+            *encabezados,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': cuerpo})
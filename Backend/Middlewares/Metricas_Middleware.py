@@ -0,0 +1,60 @@
+import time
+
+from starlette.routing import Match
+
+import config
+from Servicios.Metricas_Servicio import Metricas_Servicio
+from Servicios.Perfilador import Perfilador
+
+# Etiqueta de las solicitudes que no corresponden a ninguna ruta (evita una serie por cada URL desconocida)
+SIN_RUTA = 'sin_ruta'
+
+
+class Metricas_Middleware:
+    """
+    Middleware ASGI de métricas: latencia por ruta, estado de la respuesta y consultas SQL por solicitud.
+
+    La ruta se etiqueta con su plantilla (por ejemplo /usuarios/{usuario_id}/imagen), no con la URL,
+    para que la cantidad de series no crezca con los IDs. Si el perfilador está activo, además
+    muestrea las pilas de cada solicitud y guarda las de las lentas.
+    """
+
+    def __init__(self, app, rutas: list = None, perfilador: Perfilador = None):
+        self.app = app
+        # Rutas de la aplicación, para etiquetar las solicitudes que no llegaron al router (por ejemplo un 429)
+        self.rutas = rutas if rutas is not None else []
+        self.perfilador = perfilador if perfilador is not None else (Perfilador() if config.PERFILADOR_ACTIVO else None)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje['type'] == 'http.response.start':
+                estado = mensaje['status']
+            await send(mensaje)
+
+        solicitud, token = Metricas_Servicio.iniciar_solicitud()
+        if self.perfilador:
+            self.perfilador.iniciar(f"{scope['method']} {scope['path']}")
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = time.perf_counter() - inicio
+            Metricas_Servicio.terminar_solicitud(token)
+            Metricas_Servicio.registrar_solicitud(scope['method'], self._plantilla(scope), estado, duracion, solicitud)
+            if self.perfilador:
+                self.perfilador.terminar(duracion)
+
+    # Plantilla de la ruta de la solicitud
+    def _plantilla(self, scope) -> str:
+        ruta = scope.get('route')
+        if ruta is None:
+            # La solicitud no pasó por el router: se busca la ruta que le correspondería
+            ruta = next((r for r in self.rutas if r.matches(scope)[0] == Match.FULL), None)
+        return getattr(ruta, 'path', None) or SIN_RUTA
@@ -1,17 +1,20 @@
-from Modelos import db
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
 
-class Hobby(db.Model):
+from Modelos import Base
+
+class Hobby(Base):
     """
     Tabla para los hobbies.
     """
     __tablename__ = 'hobbies'
-    id = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(100), nullable=False, unique=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    nombre: Mapped[str] = mapped_column(String(100), unique=True)
 
-class UsuarioHobby(db.Model):
+class UsuarioHobby(Base):
     """
     Tabla de asociación entre usuarios y hobbies.
     """
     __tablename__ = 'usuario_hobbies'
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), primary_key=True)
-    hobby_id = db.Column(db.Integer, db.ForeignKey('hobbies.id'), primary_key=True)
+    usuario_id: Mapped[int] = mapped_column(ForeignKey('usuario.id'), primary_key=True)
+    hobby_id: Mapped[int] = mapped_column(ForeignKey('hobbies.id'), primary_key=True)
@@ -1,9 +1,12 @@
-from Modelos import db
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
 
-class PreguntaRecuperacion(db.Model):
+from Modelos import Base
+
+class PreguntaRecuperacion(Base):
     """
     Tabla para las preguntas de recuperación.
     """
     __tablename__ = 'preguntas_recuperacion'
-    id = db.Column(db.Integer, primary_key=True)
-    texto = db.Column(db.String(255), nullable=False, unique=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    texto: Mapped[str] = mapped_column(String(255), unique=True)
@@ -1,11 +1,16 @@
-from Modelos import db
+from typing import List, Optional
 
-class Rol(db.Model):
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from Modelos import Base
+
+class Rol(Base):
     """
     Modelo de Rol para definir diferentes roles de usuario en el sistema.
     """
     __tablename__ = 'roles'
-    id = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(50), unique=True, nullable=False)
-    descripcion = db.Column(db.String(255))
-    usuarios = db.relationship('Usuario', backref='rol', lazy=True)
\ No newline at end of file
+    id: Mapped[int] = mapped_column(primary_key=True)
+    nombre: Mapped[str] = mapped_column(String(50), unique=True)
+    descripcion: Mapped[Optional[str]] = mapped_column(String(255))
+    usuarios: Mapped[List['Usuario']] = relationship(backref='rol', lazy=True)
@@ -1,9 +1,12 @@
-from Modelos import db
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
 
-class TipoCasa(db.Model):
+from Modelos import Base
+
+class TipoCasa(Base):
     """
     Tabla para los tipos de casa.
     """
     __tablename__ = 'tipos_casa'
-    id = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(100), nullable=False, unique=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    nombre: Mapped[str] = mapped_column(String(100), unique=True)
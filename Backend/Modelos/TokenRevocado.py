@@ -0,0 +1,12 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from Modelos import Base
+
+class TokenRevocado(Base):
+    """
+    Tokens de refresco revocados (cierre de sesión o rotación) hasta su expiración.
+    """
+    __tablename__ = 'tokens_revocados'
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expira: Mapped[int] = mapped_column(index=True)  # timestamp UNIX
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from sqlalchemy import Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from Modelos import Base
+
+class Trabajo(Base):
+    """
+    Trabajo diferido de la cola persistente (miniaturas y otras tareas fuera de la solicitud).
+
+    Estados: 'pendiente' (espera a disponible_en), 'en_proceso' (reclamado por un trabajador hasta
+    bloqueado_hasta), 'completado' y 'muerto' (agotó max_intentos; queda para inspección).
+    Los tiempos son timestamps UNIX con fracción de segundo.
+    """
+    __tablename__ = 'trabajos'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    tipo: Mapped[str] = mapped_column(String(50))
+    datos: Mapped[str] = mapped_column(Text)  # argumentos de la tarea en JSON
+    estado: Mapped[str] = mapped_column(String(20), default='pendiente')
+    intentos: Mapped[int] = mapped_column(default=0)
+    max_intentos: Mapped[int]
+    creado_en: Mapped[float]
+    disponible_en: Mapped[float]
+    bloqueado_hasta: Mapped[Optional[float]]
+    trabajador: Mapped[Optional[str]] = mapped_column(String(100))
+    ultimo_error: Mapped[Optional[str]] = mapped_column(Text)
+    terminado_en: Mapped[Optional[float]]
+
+    # El trabajador busca por estado y orden de disponibilidad
+    __table_args__ = (Index('ix_trabajos_estado_disponible_en', 'estado', 'disponible_en'),)
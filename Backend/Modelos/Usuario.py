@@ -1,35 +1,51 @@
-from Modelos import db
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from Modelos import Base
 from Modelos.UsuarioTipoCasa import UsuarioTipoCasa  # <-- Agrega esta línea
 from Modelos.Hobby import Hobby  # <-- Agrega esta línea
 from Modelos.PreguntaRecuperacion import PreguntaRecuperacion  # <-- Ag
 
-class Usuario(db.Model):
+
+# Columna sensible: diferida y con error si se lee sin pedirla
+def _sensible(*args, **kwargs):
+    return mapped_column(*args, deferred=True, deferred_group='sensible', deferred_raiseload=True, **kwargs)
+
+
+class Usuario(Base):
     """
     Modelo de Usuario que representa a los usuarios del sistema.
+    Las columnas sensibles (contraseña, respuesta de recuperación, domicilio y datos de la tarjeta)
+    son diferidas: no se cargan con el objeto y leerlas sin pedirlas lanza un error en vez de hacer
+    otra consulta. Se piden explícitamente con select(Usuario.columna) o undefer_group('sensible').
     """
-    id = db.Column(db.Integer, primary_key=True)
-    rol_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=False)
-    imagen_perfil = db.Column(db.String(255), nullable=False)
-    nombre = db.Column(db.String(80), nullable=False)
-    apellidos = db.Column(db.String(120), nullable=False)
-    correo = db.Column(db.String(120), unique=True, nullable=False)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    contrasena = db.Column(db.String(120), nullable=False)
-    telefono = db.Column(db.String(20), nullable=False)
-    fecha_nacimiento = db.Column(db.Date, nullable=False)
-    hobbies = db.relationship('Hobby', secondary='usuario_hobbies', backref='usuarios')
-    domicilio = db.Column(db.String(255), nullable=False)
-    tipos_casa = db.relationship('TipoCasa', secondary='usuario_tipos_casa', backref='usuarios')
-    pregunta_recuperacion_id = db.Column(db.Integer, db.ForeignKey('preguntas_recuperacion.id'), nullable=False)
-    respuesta_recuperacion = db.Column(db.String(255), nullable=False)
-    permitir_huella = db.Column(db.Integer, default=0, nullable=False)  # 0 = no permite, 1 = sí permite
-    token_publico = db.Column(db.String(255), nullable=True)  # Token biométrico público
-    intentos_fallidos = db.Column(db.Integer, default=0, nullable=False)
-    estado_cuenta = db.Column(db.String(20), default='activo', nullable=False)  # valores: 'activo', 'bloqueado'
+    __tablename__ = 'usuario'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    rol_id: Mapped[int] = mapped_column(ForeignKey('roles.id'))
+    imagen_perfil: Mapped[str] = mapped_column(String(255))
+    nombre: Mapped[str] = mapped_column(String(80))
+    apellidos: Mapped[str] = mapped_column(String(120))
+    correo: Mapped[str] = mapped_column(String(120), unique=True)
+    username: Mapped[str] = mapped_column(String(80), unique=True)
+    contrasena: Mapped[str] = _sensible(String(120))
+    telefono: Mapped[str] = mapped_column(String(20), unique=True, index=True)
+    fecha_nacimiento: Mapped[date]
+    hobbies: Mapped[List['Hobby']] = relationship(secondary='usuario_hobbies', backref='usuarios')
+    domicilio: Mapped[str] = _sensible(String(255))
+    tipos_casa: Mapped[List['TipoCasa']] = relationship(secondary='usuario_tipos_casa', backref='usuarios')
+    pregunta_recuperacion_id: Mapped[int] = mapped_column(ForeignKey('preguntas_recuperacion.id'))
+    respuesta_recuperacion: Mapped[str] = _sensible(String(255))
+    permitir_huella: Mapped[int] = mapped_column(default=0)  # 0 = no permite, 1 = sí permite
+    token_publico: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True)  # Token biométrico público
+    intentos_fallidos: Mapped[int] = mapped_column(default=0)
+    estado_cuenta: Mapped[str] = mapped_column(String(20), default='activo')  # valores: 'activo', 'bloqueado'
 
     # Información de tarjetas de crédito asociadas al usuario
-    nombre_titular = db.Column(db.String(120), nullable=False)
-    numero_encriptado = db.Column(db.String(255), nullable=False)
-    fecha_expiracion = db.Column(db.String(7), nullable=False)  # formato MM/YYYY
-    marca = db.Column(db.String(20), nullable=False)  # Visa, Mastercard, etc.
-    ultimos_4 = db.Column(db.String(4), nullable=False)
\ No newline at end of file
+    nombre_titular: Mapped[str] = _sensible(String(120))
+    numero_encriptado: Mapped[str] = _sensible(String(255))
+    fecha_expiracion: Mapped[str] = _sensible(String(7))  # formato MM/YYYY
+    marca: Mapped[str] = mapped_column(String(20))  # Visa, Mastercard, etc.
+    ultimos_4: Mapped[str] = mapped_column(String(4))
@@ -1,9 +1,12 @@
-from Modelos import db
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
 
-class UsuarioTipoCasa(db.Model):
+from Modelos import Base
+
+class UsuarioTipoCasa(Base):
     """
     Tabla de asociación entre usuarios y tipos de casa.
     """
     __tablename__ = 'usuario_tipos_casa'
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), primary_key=True)
-    tipo_casa_id = db.Column(db.Integer, db.ForeignKey('tipos_casa.id'), primary_key=True)
+    usuario_id: Mapped[int] = mapped_column(ForeignKey('usuario.id'), primary_key=True)
+    tipo_casa_id: Mapped[int] = mapped_column(ForeignKey('tipos_casa.id'), primary_key=True)
@@ -1,6 +1,8 @@
-from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import DeclarativeBase
 
-# Inicializar la instancia de SQLAlchemy
-
-db = SQLAlchemy()
+# Base declarativa de SQLAlchemy para todos los modelos (sin Flask: la API usa sus propias sesiones)
 
+class Base(DeclarativeBase):
+    """
+    Clase base de los modelos. Base.metadata reúne todas las tablas (Alembic y create_all).
+    """
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+import anyio
+
+import config
+
+# Tamaño de los bloques leídos del archivo subido
+TAM_BLOQUE = 64 * 1024
+
+
+class ImagenDemasiadoGrandeError(Exception):
+    """
+    Se lanza cuando el archivo supera el tamaño máximo mientras se recibe.
+    """
+
+
+class Almacenamiento(ABC):
+    """
+    Interfaz de almacenamiento de imágenes direccionado por contenido.
+    Las claves tienen la forma "<sha256>.<extensión>", por lo que imágenes idénticas se guardan una sola vez.
+    """
+
+    @abstractmethod
+    async def guardar(self, bloques: AsyncIterator[bytes], extension: str, tam_max: int) -> str:
+        """
+        Guarda los bloques recibidos y devuelve la clave del archivo.
+        Lanza ImagenDemasiadoGrandeError en cuanto se supera tam_max.
+        """
+
+    @abstractmethod
+    async def escribir(self, clave: str, datos: bytes):
+        """
+        Guarda datos ya generados (por ejemplo miniaturas) bajo una clave conocida.
+        """
+
+    @abstractmethod
+    async def leer(self, clave: str) -> bytes:
+        """
+        Devuelve el contenido almacenado bajo la clave.
+        """
+
+    @abstractmethod
+    async def existe(self, clave: str) -> bool:
+        """
+        Indica si existe un archivo con la clave.
+        """
+
+    @abstractmethod
+    async def eliminar(self, clave: str):
+        """
+        Elimina el archivo de la clave (si no existe, no hace nada).
+        """
+
+    def ruta_local(self, clave: str):
+        """
+        Ruta en disco del archivo, o None si el almacenamiento no es local.
+        """
+        return None
+
+
+class AlmacenamientoLocal(Almacenamiento):
+    """
+    Almacenamiento en el sistema de archivos local. Las escrituras se hacen en el threadpool.
+    """
+
+    def __init__(self, carpeta: str):
+        self.carpeta = carpeta
+        os.makedirs(carpeta, exist_ok=True)
+
+    async def guardar(self, bloques, extension, tam_max):
+        hasher = hashlib.sha256()
+        total = 0
+        temporal = await anyio.to_thread.run_sync(
+            lambda: tempfile.NamedTemporaryFile(dir=self.carpeta, suffix='.tmp', delete=False)
+        )
+        try:
+            async for bloque in bloques:
+                total += len(bloque)
+                if total > tam_max:
+                    raise ImagenDemasiadoGrandeError()
+                hasher.update(bloque)
+                await anyio.to_thread.run_sync(temporal.write, bloque)
+            await anyio.to_thread.run_sync(temporal.close)
+            clave = f'{hasher.hexdigest()}.{extension}'
+            destino = self.ruta_local(clave)
+            # Si la misma imagen ya existe se descarta la copia temporal
+            if os.path.exists(destino):
+                os.remove(temporal.name)
+            else:
+                os.replace(temporal.name, destino)
+            return clave
+        except BaseException:
+            temporal.close()
+            if os.path.exists(temporal.name):
+                os.remove(temporal.name)
+            raise
+
+    async def escribir(self, clave, datos):
+        def escribir_archivo():
+            with tempfile.NamedTemporaryFile(dir=self.carpeta, suffix='.tmp', delete=False) as temporal:
+                temporal.write(datos)
+            os.replace(temporal.name, self.ruta_local(clave))
+        await anyio.to_thread.run_sync(escribir_archivo)
+
+    async def leer(self, clave):
+        return await anyio.Path(self.ruta_local(clave)).read_bytes()
+
+    async def existe(self, clave):
+        return os.path.exists(self.ruta_local(clave))
+
+    async def eliminar(self, clave):
+        def eliminar_archivo():
+            try:
+                os.remove(self.ruta_local(clave))
+            except FileNotFoundError:
+                pass
+        await anyio.to_thread.run_sync(eliminar_archivo)
+
+    def ruta_local(self, clave):
+        return os.path.join(self.carpeta, os.path.basename(clave))
+
+
+class AlmacenamientoMemoria(Almacenamiento):
+    """
+    Almacenamiento en memoria. Sustituye a un almacenamiento remoto (por ejemplo S3) en pruebas.
+    """
+
+    def __init__(self):
+        self.archivos = {}
+
+    async def guardar(self, bloques, extension, tam_max):
+        hasher = hashlib.sha256()
+        partes = []
+        total = 0
+        async for bloque in bloques:
+            total += len(bloque)
+            if total > tam_max:
+                raise ImagenDemasiadoGrandeError()
+            hasher.update(bloque)
+            partes.append(bloque)
+        clave = f'{hasher.hexdigest()}.{extension}'
+        self.archivos.setdefault(clave, b''.join(partes))
+        return clave
+
+    async def escribir(self, clave, datos):
+        self.archivos[clave] = datos
+
+    async def leer(self, clave):
+        return self.archivos[clave]
+
+    async def existe(self, clave):
+        return clave in self.archivos
+
+    async def eliminar(self, clave):
+        self.archivos.pop(clave, None)
+
+
+# Bloques de un UploadFile de FastAPI
+async def bloques_upload(archivo) -> AsyncIterator[bytes]:
+    """
+    Lee el archivo subido por bloques sin cargarlo completo en memoria.
+    """
+    while bloque := await archivo.read(TAM_BLOQUE):
+        yield bloque
+
+
+# Instancia configurada del almacenamiento
+_almacenamiento = None
+
+
+def obtener_almacenamiento() -> Almacenamiento:
+    """
+    Devuelve el almacenamiento configurado en ALMACENAMIENTO_IMAGENES.
+    """
+    global _almacenamiento
+    if _almacenamiento is None:
+        if config.ALMACENAMIENTO_IMAGENES == 'memoria':
+            _almacenamiento = AlmacenamientoMemoria()
+        else:
+            _almacenamiento = AlmacenamientoLocal(config.UPLOADS_DIR)
+    return _almacenamiento
@@ -0,0 +1,48 @@
+# Utilidades de archivos compartidas por los servicios que guardan claves en disco
+import os
+import tempfile
+
+
+# Crear un archivo solo si no existe
+def crear_si_no_existe(ruta: str, contenido: bytes) -> bool:
+    """
+    Escribe el contenido en un archivo temporal de la misma carpeta y lo enlaza con el nombre final.
+    El enlace falla si el archivo ya existe, así que entre varios procesos que arrancan a la vez
+    solo uno lo crea y ninguno lee un archivo a medio escribir. Devuelve True si lo creó este proceso.
+    """
+    temporal = _escribir_temporal(ruta, contenido)
+    try:
+        os.link(temporal, ruta)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(temporal)
+
+
+# Reemplazar el contenido de un archivo
+def reemplazar(ruta: str, contenido: bytes):
+    """
+    Escribe en un archivo temporal y lo renombra sobre el original: quien lea el archivo ve el
+    contenido anterior completo o el nuevo completo.
+    """
+    temporal = _escribir_temporal(ruta, contenido)
+    try:
+        os.replace(temporal, ruta)
+    except OSError:
+        os.remove(temporal)
+        raise
+
+
+# Escribir un archivo temporal junto al destino
+def _escribir_temporal(ruta: str, contenido: bytes) -> str:
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(ruta)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(temporal)
+        raise
+    return temporal
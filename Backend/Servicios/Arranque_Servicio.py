@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+
+import config
+from Base_de_Datos.db import AsyncSessionLocal, async_engine
+from Servicios.Catalogos_Servicio import Catalogos_Servicio
+from Servicios.Cifrado_Servicio import Cifrado_Servicio
+from Servicios.Hash_Servicio import Hash_Servicio
+from Servicios.Obscenidad_Servicio import Obscenidad_Servicio
+from Servicios.Similitud_Servicio import Similitud_Servicio
+from Servicios.Tarjeta_Servicio import Tarjeta_Servicio
+from Servicios.Token_Servicio import Token_Servicio
+
+
+class Arranque_Servicio:
+    # Indica si el worker terminó de precalentarse y puede recibir tráfico
+    listo = False
+
+    # Duración (ms) de cada paso del último precalentamiento
+    tiempos = {}
+
+    #================================= API PÚBLICA ================================= #
+
+    # Precalentar el worker
+    @staticmethod
+    async def precalentar():
+        """
+        Carga todo lo que la primera solicitud tendría que inicializar: procesos de bcrypt, claves
+        Fernet, filtro de palabras, rangos de BIN, secreto de tokens, conexiones del pool, lista de
+        tokens revocados, catálogos e índice de usuarios parecidos. Se ejecuta en el arranque
+        (lifespan) antes de aceptar tráfico.
+        """
+        tiempos = {}
+
+        # bcrypt primero: los procesos del pool se crean con fork antes de que existan los hilos de aiosqlite
+        inicio = time.perf_counter()
+        await Hash_Servicio.precalentar()
+        tiempos['bcrypt'] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        Cifrado_Servicio.cargar()
+        Cifrado_Servicio.desencriptar(Cifrado_Servicio.encriptar('precalentar'))
+        Obscenidad_Servicio.cargar()
+        Tarjeta_Servicio.cargar()
+        Token_Servicio.cargar()
+        tiempos['claves_y_datos'] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        await Arranque_Servicio._precalentar_conexiones(min(config.PRECALENTAR_CONEXIONES, config.DB_POOL_SIZE))
+        tiempos['conexiones'] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await Token_Servicio.sincronizar_revocados(db)
+            for nombre in Catalogos_Servicio.CATALOGOS:
+                await Catalogos_Servicio.obtener(db, nombre)
+        tiempos['revocados_y_catalogos'] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await Similitud_Servicio.cargar(db)
+        tiempos['indice_similitud'] = time.perf_counter() - inicio
+
+        Arranque_Servicio.tiempos = {paso: round(duracion * 1000, 1) for paso, duracion in tiempos.items()}
+        Arranque_Servicio.listo = True
+
+    # Verificar si el worker puede recibir tráfico
+    @staticmethod
+    async def verificar() -> dict:
+        """
+        Devuelve el estado de cada verificación de /readyz: precalentamiento terminado (y sin apagado
+        en curso), base de datos respondiendo dentro de READYZ_TIMEOUT y cola de hashing con espacio.
+        """
+        verificaciones = {
+            'precalentado': Arranque_Servicio.listo,
+            'base_de_datos': await Arranque_Servicio._base_de_datos_responde(),
+            'hash': not Hash_Servicio.saturado(),
+        }
+        return {
+            'listo': all(verificaciones.values()),
+            'verificaciones': verificaciones,
+            'precalentamiento_ms': Arranque_Servicio.tiempos,
+        }
+
+    #================================= UTILIDADES ================================= #
+
+    # Abrir conexiones del pool
+    @staticmethod
+    async def _precalentar_conexiones(cantidad: int):
+        """
+        Abre `cantidad` conexiones a la vez (aplicando los PRAGMAs) y las devuelve al pool, que las conserva.
+        """
+        conexiones = []
+        try:
+            for _ in range(cantidad):
+                conexion = await async_engine.connect()
+                conexiones.append(conexion)
+                await conexion.execute(text('SELECT 1'))
+        finally:
+            for conexion in conexiones:
+                await conexion.close()
+
+    # Comprobar la base de datos
+    @staticmethod
+    async def _base_de_datos_responde() -> bool:
+        try:
+            async with async_engine.connect() as conexion:
+                await asyncio.wait_for(conexion.execute(text('SELECT 1')), config.READYZ_TIMEOUT)
+            return True
+        except Exception:
+            return False
@@ -0,0 +1,99 @@
+import hashlib
+from typing import NamedTuple
+
+import orjson
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from Modelos.Hobby import Hobby
+from Modelos.TipoCasa import TipoCasa
+from Modelos.PreguntaRecuperacion import PreguntaRecuperacion
+
+
+class EntradaCatalogo(NamedTuple):
+    """
+    Catálogo serializado una sola vez: cuerpo JSON, ETag y conjunto de IDs válidos.
+    """
+    version: int
+    cuerpo: bytes
+    etag: str
+    ids: frozenset
+
+
+class Catalogos_Servicio:
+    # Catálogos disponibles: modelo y columnas expuestas
+    CATALOGOS = {
+        'hobbies': (Hobby, ('id', 'nombre')),
+        'tipos_casa': (TipoCasa, ('id', 'nombre')),
+        'preguntas_recuperacion': (PreguntaRecuperacion, ('id', 'texto')),
+    }
+
+    # Encabezado Cache-Control para las respuestas de catálogos
+    CACHE_CONTROL = f'public, max-age={config.CATALOGOS_MAX_AGE}'
+
+    # Caché en memoria (nombre -> EntradaCatalogo) y versión global
+    _cache = {}
+    _version = 0
+
+    #================================= API PÚBLICA ================================= #
+
+    # Obtener un catálogo desde la caché
+    @staticmethod
+    async def obtener(db: AsyncSession, nombre: str) -> EntradaCatalogo:
+        """
+        Devuelve el catálogo serializado. Solo consulta la base de datos si no está en caché.
+        """
+        entrada = Catalogos_Servicio._cache.get(nombre)
+        if entrada is not None:
+            return entrada
+
+        version = Catalogos_Servicio._version
+        modelo, columnas = Catalogos_Servicio.CATALOGOS[nombre]
+        filas = (await db.execute(
+            select(*(getattr(modelo, c) for c in columnas)).order_by(modelo.id)
+        )).all()
+        datos = [dict(zip(columnas, fila)) for fila in filas]
+        cuerpo = orjson.dumps(datos)
+        entrada = EntradaCatalogo(
+            version=version,
+            cuerpo=cuerpo,
+            etag=f'"{hashlib.sha256(cuerpo).hexdigest()[:32]}"',
+            ids=frozenset(d['id'] for d in datos),
+        )
+        # Si hubo una invalidación durante la consulta, no se guarda el resultado
+        if version == Catalogos_Servicio._version:
+            Catalogos_Servicio._cache[nombre] = entrada
+        return entrada
+
+    # IDs válidos de un catálogo
+    @staticmethod
+    async def ids(db: AsyncSession, nombre: str) -> frozenset:
+        """
+        Devuelve el conjunto de IDs existentes en el catálogo.
+        """
+        return (await Catalogos_Servicio.obtener(db, nombre)).ids
+
+    # Invalidar la caché
+    @staticmethod
+    def invalidar(nombre: str = None):
+        """
+        Descarta un catálogo (o todos) de la caché para que se vuelva a cargar.
+        """
+        Catalogos_Servicio._version += 1
+        if nombre is None:
+            Catalogos_Servicio._cache.clear()
+        else:
+            Catalogos_Servicio._cache.pop(nombre, None)
+
+
+# Invalidación automática cuando cambian filas de los catálogos
+def _registrar_invalidacion(nombre, modelo):
+    def invalidar(mapper, connection, target):
+        Catalogos_Servicio.invalidar(nombre)
+    for evento in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(modelo, evento, invalidar)
+
+
+for _nombre, (_modelo, _) in Catalogos_Servicio.CATALOGOS.items():
+    _registrar_invalidacion(_nombre, _modelo)
@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import logging
+import os
+import threading
+
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
+from sqlalchemy import select, update, bindparam
+
+import config
+from Servicios.Archivo_Utilidades import crear_si_no_existe, reemplazar
+
+logger = logging.getLogger(__name__)
+
+
+class Cifrado_Servicio:
+    # Claves cargadas al iniciar: la primera cifra, todas descifran
+    _claves = []
+    _multifernet = None
+    _lock = threading.Lock()
+
+    #================================= API PÚBLICA ================================= #
+
+    # Cargar las claves
+    @staticmethod
+    def cargar():
+        """
+        Carga las claves desde FERNET_KEYS o desde el archivo de claves (creándolo si no existe)
+        y construye el MultiFernet usado para cifrar y descifrar.
+        """
+        with Cifrado_Servicio._lock:
+            if config.FERNET_KEYS:
+                claves = [c.strip().encode() for c in config.FERNET_KEYS.split(',') if c.strip()]
+            else:
+                claves = Cifrado_Servicio._leer_archivo_claves()
+            Cifrado_Servicio._claves = [Fernet(c) for c in claves]
+            Cifrado_Servicio._multifernet = MultiFernet(Cifrado_Servicio._claves)
+
+    # Obtener el MultiFernet
+    @staticmethod
+    def obtener() -> MultiFernet:
+        """
+        Devuelve el MultiFernet, cargando las claves la primera vez.
+        """
+        if Cifrado_Servicio._multifernet is None:
+            Cifrado_Servicio.cargar()
+        return Cifrado_Servicio._multifernet
+
+    # Encriptar texto
+    @staticmethod
+    def encriptar(texto: str) -> str:
+        """
+        Encripta el texto con la clave vigente.
+        """
+        return Cifrado_Servicio.obtener().encrypt(texto.encode()).decode()
+
+    # Desencriptar texto
+    @staticmethod
+    def desencriptar(token: str) -> str:
+        """
+        Desencripta un valor cifrado con cualquiera de las claves cargadas.
+        """
+        return Cifrado_Servicio.obtener().decrypt(token.encode()).decode()
+
+    # Rotar la clave
+    @staticmethod
+    def rotar_clave():
+        """
+        Genera una clave nueva, la agrega al inicio del archivo de claves y recarga el MultiFernet
+        de este proceso. Las claves anteriores se conservan para poder descifrar los datos existentes.
+
+        Los workers en ejecución leyeron el archivo al arrancar y no ven la clave nueva hasta que se
+        reinician: el servidor debe reiniciarse antes de reencriptar, o los workers seguirán cifrando
+        con la clave anterior. Con FERNET_KEYS el archivo no se usa y la rotación se rechaza (se rota
+        agregando la clave nueva al inicio de la variable).
+        """
+        if config.FERNET_KEYS:
+            raise RuntimeError("Las claves se definen en FERNET_KEYS: agregue la clave nueva al inicio de la variable.")
+        claves = [Fernet.generate_key()] + Cifrado_Servicio._leer_archivo_claves()
+        reemplazar(config.FERNET_KEY_PATH, b'\n'.join(claves) + b'\n')
+        Cifrado_Servicio.cargar()
+
+    # Reencriptar una columna con la clave vigente
+    @staticmethod
+    async def reencriptar_columna(session_factory, columna, tamano_lote: int = 500, pausa: float = 0.0,
+                                  fallidos: list = None) -> int:
+        """
+        Recorre la tabla por lotes de clave primaria y vuelve a cifrar con la clave vigente
+        los valores de la columna que fueron cifrados con una clave anterior.
+        Cada lote se confirma en su propia transacción corta para no bloquear la tabla.
+        Sirve para cualquier columna cifrada (por ejemplo Usuario.numero_encriptado).
+        Un valor que ninguna clave descifra se registra en el log (y en `fallidos`) y se deja como está.
+        """
+        multifernet = Cifrado_Servicio.obtener()
+        vigente = Cifrado_Servicio._claves[0]
+        tabla = columna.class_.__table__
+        pk = tabla.primary_key.columns.values()[0]
+        col = tabla.c[columna.key]
+
+        actualizados = 0
+        ultimo_id = None
+        while True:
+            async with session_factory() as db:
+                consulta = select(pk, col).order_by(pk).limit(tamano_lote)
+                if ultimo_id is not None:
+                    consulta = consulta.where(pk > ultimo_id)
+                filas = (await db.execute(consulta)).all()
+                if not filas:
+                    break
+                ultimo_id = filas[-1][0]
+
+                cambios = []
+                for id_fila, valor in filas:
+                    if not valor or Cifrado_Servicio._cifrado_con(vigente, valor):
+                        continue
+                    try:
+                        cambios.append({'_id': id_fila, '_valor': multifernet.rotate(valor.encode()).decode()})
+                    except InvalidToken:
+                        logger.warning('No se pudo descifrar %s.%s de la fila %s', tabla.name, col.name, id_fila)
+                        if fallidos is not None:
+                            fallidos.append(id_fila)
+                if cambios:
+                    await db.execute(
+                        update(tabla).where(pk == bindparam('_id')).values({col.name: bindparam('_valor')}),
+                        cambios,
+                    )
+                    await db.commit()
+                    actualizados += len(cambios)
+            if pausa:
+                await asyncio.sleep(pausa)
+        return actualizados
+
+    #================================= UTILIDADES ================================= #
+
+    # Leer el archivo de claves
+    @staticmethod
+    def _leer_archivo_claves() -> list:
+        """
+        Lee las claves del archivo (una por línea). Si no existe, lo crea con una clave nueva; si
+        otro proceso lo crea al mismo tiempo, todos leen la clave del que lo creó primero.
+        """
+        if not os.path.exists(config.FERNET_KEY_PATH):
+            crear_si_no_existe(config.FERNET_KEY_PATH, Fernet.generate_key())
+        with open(config.FERNET_KEY_PATH, 'rb') as f:
+            return [linea.strip() for linea in f.read().splitlines() if linea.strip()]
+
+    # Determinar si un valor fue cifrado con una clave
+    @staticmethod
+    def _cifrado_con(fernet: Fernet, valor: str) -> bool:
+        """
+        Indica si el valor puede descifrarse con la clave dada.
+        """
+        try:
+            fernet.decrypt(valor.encode())
+            return True
+        except InvalidToken:
+            return False
+
+
+# Uso (desde la carpeta Backend):
+#   python -m Servicios.Cifrado_Servicio rotar
+#   python -m Servicios.Cifrado_Servicio reencriptar --lote 500
+if __name__ == "__main__":
+    from Base_de_Datos.db import AsyncSessionLocal, async_engine
+    from Modelos.Usuario import Usuario
+    from Modelos.Roles import Rol  # noqa: F401 (necesario para configurar los mappers)
+    from Modelos.TipoCasa import TipoCasa  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Gestión de claves Fernet")
+    parser.add_argument("accion", choices=["rotar", "reencriptar"])
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--pausa", type=float, default=0.0, help="Segundos de espera entre lotes")
+    args = parser.parse_args()
+
+    if args.accion == "rotar":
+        try:
+            Cifrado_Servicio.rotar_clave()
+        except RuntimeError as e:
+            parser.exit(1, f"{e}\n")
+        print("Clave nueva generada. Reinicie el servidor y luego ejecute 'reencriptar' para migrar los datos existentes.")
+    else:
+        fallidos = []
+
+        async def reencriptar():
+            try:
+                return await Cifrado_Servicio.reencriptar_columna(
+                    AsyncSessionLocal, Usuario.numero_encriptado, args.lote, args.pausa, fallidos
+                )
+            finally:
+                # Cierra las conexiones (y sus hilos de aiosqlite) para que el proceso pueda terminar
+                await async_engine.dispose()
+
+        total = asyncio.run(reencriptar())
+        print(f"Valores reencriptados: {total}")
+        if fallidos:
+            parser.exit(1, f"Valores que no se pudieron descifrar (se dejaron sin cambios): {len(fallidos)}\n")
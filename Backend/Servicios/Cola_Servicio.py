@@ -0,0 +1,215 @@
+import asyncio
+import random
+import time
+
+import orjson
+from sqlalchemy import and_, delete, event, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import config
+from Modelos.Trabajo import Trabajo
+from Servicios.Metricas_Servicio import Metricas_Servicio
+
+# Columnas que recibe el trabajador al reclamar un trabajo
+COLUMNAS_RECLAMADAS = (
+    Trabajo.id, Trabajo.tipo, Trabajo.datos, Trabajo.intentos, Trabajo.max_intentos,
+    Trabajo.creado_en, Trabajo.disponible_en,
+)
+
+
+class Cola_Servicio:
+    # Aviso a los trabajadores del proceso de que se encolaron trabajos (evita esperar al próximo sondeo):
+    # (bucle de eventos, asyncio.Event) del trabajador que espera
+    _aviso = None
+
+    #================================= API PÚBLICA ================================= #
+
+    # Encolar un trabajo
+    @staticmethod
+    def encolar(db, tipo: str, datos: dict = None, retraso: float = 0.0, max_intentos: int = None) -> Trabajo:
+        """
+        Agrega el trabajo a la sesión sin hacer commit: se guarda con el commit de la transacción
+        que lo encola (o se descarta con su rollback).
+        """
+        ahora = time.time()
+        trabajo = Trabajo(
+            tipo=tipo,
+            datos=orjson.dumps(datos or {}).decode(),
+            estado='pendiente',
+            intentos=0,
+            max_intentos=max_intentos or config.COLA_MAX_INTENTOS,
+            creado_en=ahora,
+            disponible_en=ahora + retraso,
+        )
+        db.add(trabajo)
+        getattr(db, 'sync_session', db).info['trabajos_encolados'] = True
+        return trabajo
+
+    # Reclamar trabajos disponibles
+    @staticmethod
+    async def reclamar(db: AsyncSession, trabajador: str, cantidad: int) -> list:
+        """
+        Marca como 'en_proceso' hasta `cantidad` trabajos pendientes y disponibles (o en proceso con
+        el bloqueo vencido, cuyo trabajador no terminó) y los devuelve. El UPDATE ... RETURNING es
+        atómico, así que dos trabajadores nunca reclaman el mismo trabajo a la vez. Los que vuelven
+        con los intentos agotados pasan directamente a 'muerto'.
+        """
+        ahora = time.time()
+        disponibles = or_(
+            and_(Trabajo.estado == 'pendiente', Trabajo.disponible_en <= ahora),
+            and_(Trabajo.estado == 'en_proceso', Trabajo.bloqueado_hasta < ahora),
+        )
+        # Lectura previa: con la cola vacía no se abre una transacción de escritura en cada sondeo
+        if await db.scalar(select(Trabajo.id).where(disponibles).limit(1)) is None:
+            return []
+
+        candidatos = select(Trabajo.id).where(disponibles).order_by(Trabajo.disponible_en).limit(cantidad)
+        filas = (await db.execute(
+            update(Trabajo)
+            .where(Trabajo.id.in_(candidatos.scalar_subquery()), disponibles)
+            .values(estado='en_proceso', intentos=Trabajo.intentos + 1, trabajador=trabajador,
+                    bloqueado_hasta=ahora + config.COLA_BLOQUEO_SEGUNDOS)
+            .returning(*COLUMNAS_RECLAMADAS)
+            .execution_options(synchronize_session=False)
+        )).all()
+
+        agotados = [fila for fila in filas if fila.intentos > fila.max_intentos]
+        if agotados:
+            await db.execute(
+                update(Trabajo).where(Trabajo.id.in_([fila.id for fila in agotados]))
+                .values(estado='muerto', terminado_en=ahora, bloqueado_hasta=None,
+                        ultimo_error='El trabajador no terminó antes de que venciera el bloqueo.')
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        for fila in agotados:
+            Metricas_Servicio.incrementar('intellihome_trabajos_total', (('tipo', fila.tipo), ('resultado', 'muerto')))
+        return sorted((fila for fila in filas if fila.intentos <= fila.max_intentos), key=lambda f: f.disponible_en)
+
+    # Marcar un trabajo como completado
+    @staticmethod
+    async def completar(db: AsyncSession, trabajo_id: int, trabajador: str):
+        """
+        Solo tiene efecto si el trabajador todavía tiene el trabajo (si su bloqueo venció y otro lo
+        retomó, el trabajo se ejecuta de nuevo: la entrega es "al menos una vez").
+        """
+        await db.execute(
+            update(Trabajo)
+            .where(Trabajo.id == trabajo_id, Trabajo.trabajador == trabajador, Trabajo.estado == 'en_proceso')
+            .values(estado='completado', terminado_en=time.time(), bloqueado_hasta=None, ultimo_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    # Registrar el fallo de un trabajo
+    @staticmethod
+    async def fallar(db: AsyncSession, trabajo, trabajador: str, error: str) -> str:
+        """
+        Reprograma el trabajo con espera exponencial o, si agotó sus intentos, lo pasa a 'muerto'.
+        Devuelve el nuevo estado ('pendiente' o 'muerto').
+        """
+        ahora = time.time()
+        if trabajo.intentos >= trabajo.max_intentos:
+            valores = {'estado': 'muerto', 'terminado_en': ahora}
+        else:
+            valores = {'estado': 'pendiente', 'disponible_en': ahora + Cola_Servicio.espera(trabajo.intentos)}
+        await db.execute(
+            update(Trabajo)
+            .where(Trabajo.id == trabajo.id, Trabajo.trabajador == trabajador, Trabajo.estado == 'en_proceso')
+            .values(bloqueado_hasta=None, ultimo_error=error[:2000], **valores)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return valores['estado']
+
+    # Espera antes de un reintento
+    @staticmethod
+    def espera(intentos: int) -> float:
+        """
+        Espera exponencial (COLA_ESPERA_BASE * 2^(intentos-1), hasta COLA_ESPERA_MAX) con jitter
+        entre la mitad y el total, para que los trabajos que fallaron juntos no reintenten juntos.
+        """
+        tope = min(config.COLA_ESPERA_MAX, config.COLA_ESPERA_BASE * 2 ** (intentos - 1))
+        return tope * random.uniform(0.5, 1.0)
+
+    # Estado de la cola
+    @staticmethod
+    async def profundidad(db: AsyncSession) -> dict:
+        """
+        Devuelve la cantidad de trabajos por estado y la antigüedad (segundos) del trabajo disponible
+        más antiguo que todavía nadie reclamó.
+        """
+        ahora = time.time()
+        conteos = dict((await db.execute(select(Trabajo.estado, func.count()).group_by(Trabajo.estado))).all())
+        mas_antiguo = await db.scalar(
+            select(func.min(Trabajo.disponible_en))
+            .where(Trabajo.estado == 'pendiente', Trabajo.disponible_en <= ahora)
+        )
+        return {
+            **{estado: conteos.get(estado, 0) for estado in ('pendiente', 'en_proceso', 'completado', 'muerto')},
+            'antiguedad': ahora - mas_antiguo if mas_antiguo is not None else 0.0,
+        }
+
+    # Volver a encolar los trabajos muertos
+    @staticmethod
+    async def reintentar_muertos(db: AsyncSession, tipo: str = None) -> int:
+        """
+        Devuelve los trabajos muertos (de un tipo o todos) a 'pendiente' con los intentos en cero.
+        """
+        consulta = update(Trabajo).where(Trabajo.estado == 'muerto')
+        if tipo:
+            consulta = consulta.where(Trabajo.tipo == tipo)
+        resultado = await db.execute(
+            consulta.values(estado='pendiente', intentos=0, disponible_en=time.time(), terminado_en=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return resultado.rowcount
+
+    # Eliminar los trabajos completados antiguos
+    @staticmethod
+    async def purgar(db: AsyncSession) -> int:
+        resultado = await db.execute(
+            delete(Trabajo)
+            .where(Trabajo.estado == 'completado', Trabajo.terminado_en < time.time() - config.COLA_RETENCION_SEGUNDOS)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return resultado.rowcount
+
+    # Avisar a los trabajadores del proceso
+    @staticmethod
+    def avisar():
+        """
+        Puede llamarse desde cualquier hilo (el commit de una sesión síncrona, por ejemplo): el aviso
+        se entrega en el bucle de eventos donde espera el trabajador.
+        """
+        if Cola_Servicio._aviso is not None:
+            bucle, aviso = Cola_Servicio._aviso
+            if not bucle.is_closed():
+                bucle.call_soon_threadsafe(aviso.set)
+
+    # Esperar un aviso o el intervalo de sondeo
+    @staticmethod
+    async def esperar_aviso(intervalo: float):
+        bucle = asyncio.get_running_loop()
+        if Cola_Servicio._aviso is None or Cola_Servicio._aviso[0] is not bucle:
+            Cola_Servicio._aviso = (bucle, asyncio.Event())
+        aviso = Cola_Servicio._aviso[1]
+        try:
+            await asyncio.wait_for(aviso.wait(), intervalo)
+        except asyncio.TimeoutError:
+            pass
+        aviso.clear()
+
+# Despertar a los trabajadores cuando se confirma una transacción que encoló trabajos
+@event.listens_for(Session, 'after_commit')
+def _avisar_encolados(sesion):
+    if sesion.info.pop('trabajos_encolados', False):
+        Cola_Servicio.avisar()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_aviso(sesion):
+    sesion.info.pop('trabajos_encolados', None)
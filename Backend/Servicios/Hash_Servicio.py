@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+import config
+from Servicios.Metricas_Servicio import Metricas_Servicio
+
+logger = logging.getLogger(__name__)
+
+# Contexto de hashing usado dentro de los procesos del pool
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Funciones ejecutadas en los procesos del pool (deben ser de nivel de módulo)
+def _hashear(contrasena: str):
+    """
+    Genera el hash bcrypt de la contraseña y mide cuánto tardó.
+    """
+    inicio = time.perf_counter()
+    resultado = pwd_context.hash(contrasena)
+    return resultado, time.perf_counter() - inicio
+
+
+def _verificar(contrasena_plana: str, contrasena_hash: str):
+    """
+    Verifica la contraseña contra el hash y mide cuánto tardó.
+    """
+    inicio = time.perf_counter()
+    resultado = pwd_context.verify(contrasena_plana, contrasena_hash)
+    return resultado, time.perf_counter() - inicio
+
+
+def _precalentar():
+    """
+    Carga el backend de bcrypt en el proceso (passlib lo detecta y prueba en el primer uso).
+    """
+    pwd_context.handler('bcrypt').get_backend()
+    return os.getpid()
+
+
+class ColaHashLlenaError(Exception):
+    """
+    Se lanza cuando la cola del servicio de hashing alcanzó su límite.
+    """
+
+
+class Hash_Servicio:
+    # Pool de procesos para bcrypt (se crea al primer uso)
+    _pool = None
+    _lock = threading.Lock()
+
+    # Operaciones en curso (ejecutándose o esperando un proceso libre)
+    _en_curso = 0
+
+    # Métricas acumuladas (segundos)
+    _metricas = {
+        'operaciones': 0,
+        'rechazadas': 0,
+        'espera_total': 0.0,
+        'espera_max': 0.0,
+        'hash_total': 0.0,
+        'hash_max': 0.0,
+    }
+
+    #================================= API PÚBLICA ================================= #
+
+    # Hash de contraseña
+    @staticmethod
+    async def hash(contrasena: str) -> str:
+        """
+        Genera el hash de la contraseña en el pool de procesos.
+        """
+        return await Hash_Servicio._ejecutar(_hashear, contrasena)
+
+    # Verificación de contraseña
+    @staticmethod
+    async def verificar(contrasena_plana: str, contrasena_hash: str) -> bool:
+        """
+        Verifica la contraseña contra el hash en el pool de procesos.
+        """
+        return await Hash_Servicio._ejecutar(_verificar, contrasena_plana, contrasena_hash)
+
+    # Hash de un lote de contraseñas
+    @staticmethod
+    async def hash_lote(contrasenas: list) -> list:
+        """
+        Genera los hashes de un lote de contraseñas repartiéndolo por partes entre los procesos del pool.
+        Pensado para herramientas de importación: no pasa por el límite de cola de las solicitudes HTTP.
+        """
+        if not contrasenas:
+            return []
+        pool = Hash_Servicio._obtener_pool()
+        parte = max(1, len(contrasenas) // (config.HASH_WORKERS * 4))
+        loop = asyncio.get_running_loop()
+        resultados = await loop.run_in_executor(
+            None, lambda: list(pool.map(_hashear, contrasenas, chunksize=parte))
+        )
+        for _, duracion_hash in resultados:
+            Hash_Servicio._registrar(0.0, duracion_hash, en_cola=False)
+        return [resultado for resultado, _ in resultados]
+
+    # Precalentar el pool
+    @staticmethod
+    async def precalentar() -> int:
+        """
+        Crea los procesos del pool y carga bcrypt en cada uno, para que el primer login no pague
+        el arranque de los procesos. Devuelve la cantidad de procesos listos.
+        """
+        pool = Hash_Servicio._obtener_pool()
+        loop = asyncio.get_running_loop()
+        # Se envían todas las tareas a la vez: el pool crea un proceso nuevo mientras no haya uno libre
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(pool, _precalentar) for _ in range(config.HASH_WORKERS)
+        ))
+        return len(set(pids))
+
+    # Saturación de la cola
+    @staticmethod
+    def saturado() -> bool:
+        """
+        Indica si la cola de hashing está llena (las nuevas operaciones recibirían 503).
+        """
+        with Hash_Servicio._lock:
+            return Hash_Servicio._en_curso >= config.HASH_WORKERS + config.HASH_MAX_COLA
+
+    # Métricas del servicio
+    @staticmethod
+    def metricas() -> dict:
+        """
+        Devuelve una copia de las métricas de espera en cola vs. tiempo de hashing.
+        """
+        with Hash_Servicio._lock:
+            metricas = dict(Hash_Servicio._metricas)
+            metricas['en_curso'] = Hash_Servicio._en_curso
+        operaciones = metricas['operaciones']
+        metricas['espera_promedio'] = metricas['espera_total'] / operaciones if operaciones else 0.0
+        metricas['hash_promedio'] = metricas['hash_total'] / operaciones if operaciones else 0.0
+        return metricas
+
+    # Cierre del pool
+    @staticmethod
+    def cerrar():
+        """
+        Detiene el pool de procesos. Se llama al apagar la aplicación.
+        """
+        with Hash_Servicio._lock:
+            pool, Hash_Servicio._pool = Hash_Servicio._pool, None
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    #================================= UTILIDADES ================================= #
+
+    # Obtener (o crear) el pool de procesos
+    @staticmethod
+    def _obtener_pool() -> ProcessPoolExecutor:
+        """
+        Crea el pool de procesos al primer uso con la cantidad configurada de workers.
+        """
+        with Hash_Servicio._lock:
+            if Hash_Servicio._pool is None:
+                Hash_Servicio._pool = ProcessPoolExecutor(max_workers=config.HASH_WORKERS)
+            return Hash_Servicio._pool
+
+    # Reemplazar un pool roto
+    @staticmethod
+    def _reemplazar_pool(roto: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """
+        Descarta el pool si sigue siendo el vigente (otra operación pudo reemplazarlo ya) y devuelve
+        el pool con el que reintentar.
+        """
+        with Hash_Servicio._lock:
+            if Hash_Servicio._pool is roto:
+                Hash_Servicio._pool = None
+        roto.shutdown(wait=False, cancel_futures=True)
+        return Hash_Servicio._obtener_pool()
+
+    # Reservar un lugar en la cola
+    @staticmethod
+    def _reservar():
+        """
+        Reserva un lugar en la cola o lanza ColaHashLlenaError si está llena.
+        """
+        with Hash_Servicio._lock:
+            if Hash_Servicio._en_curso >= config.HASH_WORKERS + config.HASH_MAX_COLA:
+                Hash_Servicio._metricas['rechazadas'] += 1
+                Metricas_Servicio.incrementar('intellihome_hash_rechazadas_total', ())
+                raise ColaHashLlenaError('El servicio de autenticación está saturado. Intente de nuevo.')
+            Hash_Servicio._en_curso += 1
+            Metricas_Servicio.fijar('intellihome_hash_en_curso', (), Hash_Servicio._en_curso)
+
+    # Ejecutar una función en el pool midiendo espera y tiempo de hashing
+    @staticmethod
+    async def _ejecutar(funcion, *args):
+        """
+        Ejecuta la función en el pool y registra el tiempo en cola y el tiempo de hashing.
+        Si un proceso del pool murió (por ejemplo, por falta de memoria), el pool queda roto: se
+        crea uno nuevo y se reintenta una vez; si vuelve a fallar se responde como cola llena (503).
+        """
+        pool = Hash_Servicio._obtener_pool()
+        Hash_Servicio._reservar()
+        inicio = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                resultado, duracion_hash = await loop.run_in_executor(pool, funcion, *args)
+            except BrokenProcessPool:
+                logger.warning('El pool de hashing se rompió; se crea uno nuevo')
+                pool = Hash_Servicio._reemplazar_pool(pool)
+                try:
+                    resultado, duracion_hash = await loop.run_in_executor(pool, funcion, *args)
+                except BrokenProcessPool:
+                    raise ColaHashLlenaError('El servicio de autenticación no está disponible. Intente de nuevo.')
+        finally:
+            with Hash_Servicio._lock:
+                Hash_Servicio._en_curso -= 1
+                Metricas_Servicio.fijar('intellihome_hash_en_curso', (), Hash_Servicio._en_curso)
+        espera = max(time.perf_counter() - inicio - duracion_hash, 0.0)
+        Hash_Servicio._registrar(espera, duracion_hash)
+        return resultado
+
+    # Registrar métricas de una operación
+    @staticmethod
+    def _registrar(espera: float, duracion_hash: float, en_cola: bool = True):
+        """
+        Acumula las métricas de una operación completada.
+        """
+        with Hash_Servicio._lock:
+            metricas = Hash_Servicio._metricas
+            metricas['operaciones'] += 1
+            metricas['espera_total'] += espera
+            metricas['espera_max'] = max(metricas['espera_max'], espera)
+            metricas['hash_total'] += duracion_hash
+            metricas['hash_max'] = max(metricas['hash_max'], duracion_hash)
+        # Histogramas para /metrics (las operaciones por lote no pasan por la cola)
+        if en_cola:
+            Metricas_Servicio.observar('intellihome_hash_espera_segundos', (), espera)
+        Metricas_Servicio.observar('intellihome_hash_segundos', (), duracion_hash)
+
+
+# Las series sin etiquetas del pool se exportan en cero desde el arranque
+Metricas_Servicio.fijar('intellihome_hash_en_curso', (), 0)
+Metricas_Servicio.incrementar('intellihome_hash_rechazadas_total', (), 0)
@@ -0,0 +1,14 @@
+# Utilidades HTTP compartidas por los controladores
+
+# Comparación de ETag con If-None-Match
+def coincide_etag(if_none_match: str, etag: str) -> bool:
+    """
+    Determina si el encabezado If-None-Match incluye el ETag actual.
+    """
+    if not if_none_match:
+        return False
+    for valor in if_none_match.split(','):
+        valor = valor.strip()
+        if valor == '*' or valor.removeprefix('W/') == etag:
+            return True
+    return False
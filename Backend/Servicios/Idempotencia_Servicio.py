@@ -0,0 +1,212 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import time
+from abc import ABC, abstractmethod
+
+import orjson
+
+import config
+
+
+class HuellaCuerpo:
+    """
+    SHA-256 del cuerpo de una solicitud, calculado por fragmentos a medida que llega.
+
+    En multipart se omite el delimitador: el cliente genera uno nuevo en cada reintento, pero el
+    contenido de las partes es el mismo, así que dos envíos de los mismos datos tienen la misma huella.
+    """
+
+    def __init__(self, delimitador: bytes = b''):
+        self.sha = hashlib.sha256()
+        self.delimitador = delimitador
+        self.pendiente = b''
+
+    def actualizar(self, datos: bytes):
+        if not self.delimitador:
+            self.sha.update(datos)
+            return
+        datos = (self.pendiente + datos).replace(self.delimitador, b'')
+        # Se retiene el final por si el delimitador quedó partido entre dos fragmentos
+        corte = max(len(datos) - len(self.delimitador) + 1, 0)
+        self.sha.update(datos[:corte])
+        self.pendiente = datos[corte:]
+
+    def resultado(self) -> str:
+        self.sha.update(self.pendiente)
+        self.pendiente = b''
+        return self.sha.hexdigest()
+
+
+class AlmacenIdempotencia(ABC):
+    """
+    Interfaz de almacén de respuestas por clave de idempotencia.
+
+    Un registro es {'estado': 'en_curso'} mientras la primera solicitud se procesa, o
+    {'estado': 'completa', 'huella', 'status', 'headers', 'cuerpo'} con la respuesta guardada.
+    """
+
+    @abstractmethod
+    async def reservar(self, clave: str, ttl: float):
+        """
+        Crea el registro 'en_curso' si la clave no existe. Devuelve None si se reservó o el registro existente.
+        """
+
+    @abstractmethod
+    async def guardar(self, clave: str, registro: dict, ttl: float):
+        """
+        Guarda la respuesta completa y despierta a las solicitudes que esperaban la clave.
+        """
+
+    @abstractmethod
+    async def liberar(self, clave: str):
+        """
+        Elimina la reserva (la solicitud falló y un reintento debe volver a procesarse).
+        """
+
+    @abstractmethod
+    async def esperar(self, clave: str, limite: float):
+        """
+        Espera hasta `limite` segundos a que la clave deje de estar 'en_curso'.
+        """
+
+
+class AlmacenIdempotenciaMemoria(AlmacenIdempotencia):
+    """
+    Almacén en memoria del proceso (un solo worker). Las solicitudes duplicadas esperan en un
+    asyncio.Event de la clave, sin sondear.
+    """
+
+    def __init__(self, max_claves: int = None):
+        # clave -> (momento de expiración, registro)
+        self.registros = {}
+        self.eventos = {}
+        self.max_claves = max_claves or config.IDEMPOTENCIA_MAX_CLAVES
+
+    async def reservar(self, clave, ttl):
+        ahora = time.monotonic()
+        actual = self.registros.get(clave)
+        if actual is not None and actual[0] > ahora:
+            return actual[1]
+        if len(self.registros) >= self.max_claves:
+            self._purgar(ahora)
+        # Una reserva vencida pudo dejar solicitudes esperando: se despiertan antes de reemplazarla
+        self._despertar(clave)
+        self.registros[clave] = (ahora + ttl, {'estado': 'en_curso'})
+        self.eventos[clave] = asyncio.Event()
+        return None
+
+    async def guardar(self, clave, registro, ttl):
+        self.registros[clave] = (time.monotonic() + ttl, registro)
+        self._despertar(clave)
+
+    async def liberar(self, clave):
+        self.registros.pop(clave, None)
+        self._despertar(clave)
+
+    async def esperar(self, clave, limite):
+        evento = self.eventos.get(clave)
+        if evento is not None:
+            try:
+                await asyncio.wait_for(evento.wait(), limite)
+            except asyncio.TimeoutError:
+                pass
+
+    def _despertar(self, clave: str):
+        evento = self.eventos.pop(clave, None)
+        if evento is not None:
+            evento.set()
+
+    def _purgar(self, ahora: float):
+        """
+        Descarta los registros vencidos; si aun así se está en el máximo, descarta la mitad más antigua.
+        """
+        registros = {clave: registro for clave, registro in self.registros.items() if registro[0] > ahora}
+        if len(registros) >= self.max_claves:
+            registros = dict(itertools.islice(registros.items(), len(registros) // 2, None))
+        self.registros = registros
+
+
+class AlmacenIdempotenciaRedis(AlmacenIdempotencia):
+    """
+    Almacén compartido en Redis. La reserva es un SET NX atómico, así que entre varios workers solo
+    uno procesa la clave; los demás sondean hasta que aparece la respuesta.
+    """
+
+    # Intervalos (segundos) entre consultas mientras se espera una clave en curso
+    SONDEO_MIN = 0.02
+    SONDEO_MAX = 0.25
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("ALMACEN_CONTADORES=redis requiere el paquete 'redis' (pip install redis).")
+        self.cliente = redis.from_url(url)
+
+    async def reservar(self, clave, ttl):
+        if await self.cliente.set(clave, _serializar({'estado': 'en_curso'}), nx=True, px=int(ttl * 1000)):
+            return None
+        valor = await self.cliente.get(clave)
+        # Si la reserva venció entre el SET y el GET, se intenta de nuevo en la siguiente vuelta
+        return _deserializar(valor) if valor is not None else {'estado': 'en_curso'}
+
+    async def guardar(self, clave, registro, ttl):
+        await self.cliente.set(clave, _serializar(registro), px=int(ttl * 1000))
+
+    async def liberar(self, clave):
+        await self.cliente.delete(clave)
+
+    async def esperar(self, clave, limite):
+        fin = time.monotonic() + limite
+        intervalo = self.SONDEO_MIN
+        while time.monotonic() < fin:
+            valor = await self.cliente.get(clave)
+            if valor is None or _deserializar(valor)['estado'] != 'en_curso':
+                return
+            await asyncio.sleep(min(intervalo, max(fin - time.monotonic(), 0)))
+            intervalo = min(intervalo * 2, self.SONDEO_MAX)
+
+
+class Idempotencia_Servicio:
+    # Almacén configurado (se crea al primer uso)
+    _almacen = None
+
+    # Obtener el almacén configurado
+    @staticmethod
+    def almacen() -> AlmacenIdempotencia:
+        """
+        Devuelve el almacén definido en ALMACEN_CONTADORES.
+        """
+        if Idempotencia_Servicio._almacen is None:
+            if config.ALMACEN_CONTADORES == 'redis':
+                Idempotencia_Servicio._almacen = AlmacenIdempotenciaRedis(config.REDIS_URL)
+            else:
+                Idempotencia_Servicio._almacen = AlmacenIdempotenciaMemoria()
+        return Idempotencia_Servicio._almacen
+
+    # Decidir si una respuesta se guarda
+    @staticmethod
+    def se_guarda(status: int) -> bool:
+        """
+        Se guardan las respuestas definitivas (2xx y 4xx). Los errores del servidor, 408 y 429 son
+        transitorios: se libera la clave para que el reintento se procese de nuevo.
+        """
+        return status < 500 and status not in (408, 429)
+
+
+#================================= UTILIDADES ================================= #
+
+# Serializar un registro para Redis (el cuerpo va en base64)
+def _serializar(registro: dict) -> bytes:
+    if 'cuerpo' in registro:
+        registro = {**registro, 'cuerpo': base64.b64encode(registro['cuerpo']).decode()}
+    return orjson.dumps(registro)
+
+
+def _deserializar(valor: bytes) -> dict:
+    registro = orjson.loads(valor)
+    if 'cuerpo' in registro:
+        registro['cuerpo'] = base64.b64decode(registro['cuerpo'])
+    return registro
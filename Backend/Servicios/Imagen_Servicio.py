@@ -0,0 +1,132 @@
+import io
+
+import anyio
+from PIL import Image, ImageOps
+
+import config
+from Servicios.Almacenamiento_Servicio import obtener_almacenamiento
+
+# Pillow también se niega a decodificar imágenes con más del doble de este límite
+Image.MAX_IMAGE_PIXELS = config.IMAGEN_MAX_PIXELES
+
+
+# La imagen supera la cantidad máxima de píxeles
+class ImagenDemasiadosPixelesError(Exception):
+    pass
+
+
+class Imagen_Servicio:
+    # Firmas (magic bytes) de los formatos permitidos
+    FIRMAS = {
+        b'\x89PNG\r\n\x1a\n': 'png',
+        b'\xff\xd8\xff': 'jpg',
+        b'GIF87a': 'gif',
+        b'GIF89a': 'gif',
+    }
+
+    # Tipos MIME por extensión almacenada
+    TIPOS_MIME = {
+        'png': 'image/png',
+        'jpg': 'image/jpeg',
+        'gif': 'image/gif',
+        'webp': 'image/webp',
+    }
+
+    # Bytes necesarios para identificar el formato
+    TAM_CABECERA = 16
+
+    # Formato y calidad de las miniaturas
+    FORMATO_MINIATURA = 'webp'
+    CALIDAD_MINIATURA = 80
+
+    #================================= API PÚBLICA ================================= #
+
+    # Detectar el formato real de la imagen
+    @staticmethod
+    def detectar_formato(cabecera: bytes):
+        """
+        Devuelve el formato según los magic bytes ('png', 'jpg' o 'gif'), o None si no es una imagen permitida.
+        """
+        for firma, formato in Imagen_Servicio.FIRMAS.items():
+            if cabecera.startswith(firma):
+                return formato
+        return None
+
+    # Comprobar las dimensiones de una imagen subida
+    @staticmethod
+    def comprobar_dimensiones(archivo) -> bool:
+        """
+        Lee solo la cabecera de la imagen (sin decodificar los píxeles). Devuelve False si Pillow no
+        la reconoce y lanza ImagenDemasiadosPixelesError si supera IMAGEN_MAX_PIXELES.
+        """
+        try:
+            with Image.open(archivo) as imagen:
+                Imagen_Servicio._comprobar_pixeles(imagen)
+            return True
+        except Image.DecompressionBombError:
+            raise ImagenDemasiadosPixelesError()
+        except (OSError, SyntaxError, ValueError):
+            return False
+        finally:
+            archivo.seek(0)
+
+    # Clave de una miniatura
+    @staticmethod
+    def clave_miniatura(clave_original: str, tamano: int) -> str:
+        """
+        Construye la clave de la miniatura a partir de la clave (hash) de la imagen original.
+        """
+        base = clave_original.rsplit('.', 1)[0]
+        return f'{base}_{tamano}.{Imagen_Servicio.FORMATO_MINIATURA}'
+
+    # Generar las miniaturas de una imagen
+    @staticmethod
+    async def generar_miniaturas(clave_original: str, tamanos=None):
+        """
+        Genera las miniaturas cuadradas de la imagen sin metadatos EXIF.
+        Las que ya existen no se vuelven a generar.
+        """
+        almacenamiento = obtener_almacenamiento()
+        pendientes = [
+            t for t in (tamanos or config.TAMANOS_MINIATURA)
+            if not await almacenamiento.existe(Imagen_Servicio.clave_miniatura(clave_original, t))
+        ]
+        if not pendientes:
+            return
+        original = await almacenamiento.leer(clave_original)
+        miniaturas = await anyio.to_thread.run_sync(Imagen_Servicio._redimensionar, original, pendientes)
+        for tamano, datos in miniaturas.items():
+            await almacenamiento.escribir(Imagen_Servicio.clave_miniatura(clave_original, tamano), datos)
+
+    #================================= UTILIDADES ================================= #
+
+    # Redimensionar (se ejecuta en el threadpool)
+    @staticmethod
+    def _redimensionar(original: bytes, tamanos) -> dict:
+        """
+        Decodifica la imagen una sola vez y devuelve {tamaño: bytes} para cada miniatura.
+        La orientación EXIF se aplica a los píxeles y los metadatos se descartan al recodificar.
+        Las dimensiones se comprueban antes de decodificar (imágenes subidas antes del límite).
+        """
+        try:
+            imagen = Image.open(io.BytesIO(original))
+        except Image.DecompressionBombError:
+            raise ImagenDemasiadosPixelesError()
+        with imagen:
+            Imagen_Servicio._comprobar_pixeles(imagen)
+            imagen = ImageOps.exif_transpose(imagen).convert('RGB')
+            miniaturas = {}
+            for tamano in tamanos:
+                salida = io.BytesIO()
+                ImageOps.fit(imagen, (tamano, tamano), Image.Resampling.LANCZOS).save(
+                    salida, Imagen_Servicio.FORMATO_MINIATURA, quality=Imagen_Servicio.CALIDAD_MINIATURA
+                )
+                miniaturas[tamano] = salida.getvalue()
+        return miniaturas
+
+    # Rechazar imágenes con demasiados píxeles
+    @staticmethod
+    def _comprobar_pixeles(imagen):
+        ancho, alto = imagen.size
+        if ancho * alto > config.IMAGEN_MAX_PIXELES:
+            raise ImagenDemasiadosPixelesError()
@@ -0,0 +1,132 @@
+import itertools
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+import config
+
+
+class AlmacenIntentos(ABC):
+    """
+    Interfaz de almacén de intentos con ventana deslizante.
+    """
+
+    @abstractmethod
+    async def registrar(self, clave: str, ventana: int) -> int:
+        """
+        Registra un intento y devuelve cuántos hay dentro de la ventana (incluido este).
+        """
+
+    @abstractmethod
+    async def reiniciar(self, clave: str):
+        """
+        Elimina los intentos registrados para la clave.
+        """
+
+
+class AlmacenIntentosMemoria(AlmacenIntentos):
+    """
+    Almacén en memoria del proceso. Sirve para un solo worker y como sustituto local de Redis en pruebas.
+    """
+
+    def __init__(self, max_claves: int = None):
+        # clave -> marcas de tiempo de los intentos dentro de la ventana
+        self.intentos = {}
+        self.max_claves = max_claves or config.INTENTOS_MAX_CLAVES
+
+    async def registrar(self, clave, ventana):
+        ahora = time.monotonic()
+        marcas = self.intentos.get(clave)
+        if marcas is None:
+            if len(self.intentos) >= self.max_claves:
+                self._purgar(ahora, ventana)
+            marcas = self.intentos[clave] = deque()
+        marcas.append(ahora)
+        while marcas[0] <= ahora - ventana:
+            marcas.popleft()
+        return len(marcas)
+
+    async def reiniciar(self, clave):
+        self.intentos.pop(clave, None)
+
+    def _purgar(self, ahora: float, ventana: int):
+        """
+        Descarta las claves cuyo último intento ya salió de la ventana. Si aun así se está en el
+        máximo, descarta la mitad más antigua para que la purga no se repita en cada clave nueva.
+        """
+        intentos = {clave: marcas for clave, marcas in self.intentos.items() if marcas[-1] > ahora - ventana}
+        if len(intentos) >= self.max_claves:
+            intentos = dict(itertools.islice(intentos.items(), len(intentos) // 2, None))
+        self.intentos = intentos
+
+
+class AlmacenIntentosRedis(AlmacenIntentos):
+    """
+    Almacén compartido en Redis (conjunto ordenado por clave). El conteo es atómico,
+    por lo que el límite se respeta con exactitud entre varios workers.
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("ALMACEN_CONTADORES=redis requiere el paquete 'redis' (pip install redis).")
+        self.cliente = redis.from_url(url)
+
+    async def registrar(self, clave, ventana):
+        ahora = time.time()
+        async with self.cliente.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(clave, 0, ahora - ventana)
+            pipe.zadd(clave, {f'{ahora}:{secrets.token_hex(8)}': ahora})
+            pipe.zcard(clave)
+            pipe.expire(clave, ventana)
+            resultados = await pipe.execute()
+        return resultados[2]
+
+    async def reiniciar(self, clave):
+        await self.cliente.delete(clave)
+
+
+class Intentos_Servicio:
+    # Almacén configurado (se crea al primer uso)
+    _almacen = None
+
+    # Obtener el almacén configurado
+    @staticmethod
+    def almacen() -> AlmacenIntentos:
+        """
+        Devuelve el almacén definido en ALMACEN_CONTADORES.
+        """
+        if Intentos_Servicio._almacen is None:
+            if config.ALMACEN_CONTADORES == 'redis':
+                Intentos_Servicio._almacen = AlmacenIntentosRedis(config.REDIS_URL)
+            else:
+                Intentos_Servicio._almacen = AlmacenIntentosMemoria()
+        return Intentos_Servicio._almacen
+
+    # Determinar si el almacén ve los fallos de todos los workers
+    @staticmethod
+    def exacto() -> bool:
+        """
+        Redis es compartido; la memoria solo cuenta los fallos de su proceso, así que es exacta
+        únicamente con un solo proceso (API_PROCESOS=1, el valor de python main.py; servidor.py lo
+        fija en la cantidad de workers). Si no es exacto, el login cuenta los fallos en la base de datos.
+        """
+        return config.ALMACEN_CONTADORES == 'redis' or config.API_PROCESOS == 1
+
+    # Registrar un login fallido
+    @staticmethod
+    async def registrar_fallo(usuario_id: int) -> int:
+        """
+        Registra un intento fallido del usuario y devuelve los fallos dentro de la ventana.
+        """
+        return await Intentos_Servicio.almacen().registrar(f'login:{usuario_id}', config.INTENTOS_VENTANA_SEGUNDOS)
+
+    # Reiniciar los intentos de un usuario
+    @staticmethod
+    async def reiniciar(usuario_id: int):
+        """
+        Olvida los intentos fallidos del usuario (login exitoso, bloqueo o restablecimiento).
+        """
+        await Intentos_Servicio.almacen().reiniciar(f'login:{usuario_id}')
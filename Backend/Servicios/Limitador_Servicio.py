@@ -0,0 +1,143 @@
+import itertools
+import time
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+import config
+
+
+class Limite(NamedTuple):
+    """
+    Presupuesto de una cubeta: ráfaga máxima y segundos en que se rellena por completo.
+    """
+    capacidad: int
+    periodo: float
+
+    @property
+    def tasa(self) -> float:
+        return self.capacidad / self.periodo
+
+
+class AlmacenCubetas(ABC):
+    """
+    Interfaz de almacén de cubetas (token bucket).
+    """
+
+    @abstractmethod
+    async def consumir(self, clave: str, limite: Limite) -> float:
+        """
+        Consume una ficha de la cubeta. Devuelve 0 si se permitió o los segundos a esperar si no.
+        """
+
+
+class AlmacenCubetasMemoria(AlmacenCubetas):
+    """
+    Cubetas en memoria del proceso (un solo worker). Cada consulta es O(1).
+    """
+
+    def __init__(self, max_claves: int = None):
+        # clave -> (fichas, última actualización, momento en que vuelve a estar llena)
+        self.cubetas = {}
+        self.max_claves = max_claves or config.LIMITE_TASA_MAX_CLAVES
+
+    async def consumir(self, clave, limite):
+        ahora = time.monotonic()
+        cubeta = self.cubetas.get(clave)
+        if cubeta is None:
+            fichas = limite.capacidad
+            if len(self.cubetas) >= self.max_claves:
+                self._purgar(ahora)
+        else:
+            fichas = min(limite.capacidad, cubeta[0] + (ahora - cubeta[1]) * limite.tasa)
+
+        espera = 0.0
+        if fichas >= 1:
+            fichas -= 1
+        else:
+            espera = (1 - fichas) / limite.tasa
+        self.cubetas[clave] = (fichas, ahora, ahora + (limite.capacidad - fichas) / limite.tasa)
+        return espera
+
+    def _purgar(self, ahora: float):
+        """
+        Descarta las cubetas que ya se rellenaron (equivalen a una cubeta nueva). Si aun así
+        se está en el máximo (muchas claves distintas a la vez), descarta la mitad más antigua
+        para que la purga no se repita en cada clave nueva.
+        """
+        cubetas = {clave: cubeta for clave, cubeta in self.cubetas.items() if cubeta[2] > ahora}
+        if len(cubetas) >= self.max_claves:
+            cubetas = dict(itertools.islice(cubetas.items(), len(cubetas) // 2, None))
+        self.cubetas = cubetas
+
+
+class AlmacenCubetasRedis(AlmacenCubetas):
+    """
+    Cubetas compartidas en Redis. El rellenado y el consumo se hacen en un script Lua atómico.
+    """
+
+    SCRIPT = """
+    local capacidad = tonumber(ARGV[1])
+    local periodo = tonumber(ARGV[2])
+    local ahora = tonumber(ARGV[3])
+    local tasa = capacidad / periodo
+    local datos = redis.call('HMGET', KEYS[1], 'f', 'u')
+    local fichas = tonumber(datos[1]) or capacidad
+    local ultima = tonumber(datos[2]) or ahora
+    fichas = math.min(capacidad, fichas + math.max(ahora - ultima, 0) * tasa)
+    local espera = 0
+    if fichas >= 1 then
+        fichas = fichas - 1
+    else
+        espera = (1 - fichas) / tasa
+    end
+    redis.call('HSET', KEYS[1], 'f', fichas, 'u', ahora)
+    redis.call('EXPIRE', KEYS[1], math.ceil(periodo))
+    return tostring(espera)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("ALMACEN_CONTADORES=redis requiere el paquete 'redis' (pip install redis).")
+        self.cliente = redis.from_url(url)
+        self.script = self.cliente.register_script(self.SCRIPT)
+
+    async def consumir(self, clave, limite):
+        espera = await self.script(keys=[clave], args=[limite.capacidad, limite.periodo, time.time()])
+        return float(espera)
+
+
+class Limitador_Servicio:
+    # Almacén configurado (se crea al primer uso)
+    _almacen = None
+
+    # Convertir "capacidad/segundos" en un Limite
+    @staticmethod
+    def parsear_limite(texto: str) -> Limite:
+        """
+        Convierte un límite de configuración ("30/60") en un Limite.
+        """
+        capacidad, _, periodo = texto.partition('/')
+        return Limite(int(capacidad), float(periodo))
+
+    # Obtener el almacén configurado
+    @staticmethod
+    def almacen() -> AlmacenCubetas:
+        """
+        Devuelve el almacén definido en ALMACEN_CONTADORES.
+        """
+        if Limitador_Servicio._almacen is None:
+            if config.ALMACEN_CONTADORES == 'redis':
+                Limitador_Servicio._almacen = AlmacenCubetasRedis(config.REDIS_URL)
+            else:
+                Limitador_Servicio._almacen = AlmacenCubetasMemoria()
+        return Limitador_Servicio._almacen
+
+    # Consumir una ficha
+    @staticmethod
+    async def consumir(clave: str, limite: Limite) -> float:
+        """
+        Consume una ficha de la cubeta de la clave. Devuelve 0 si se permitió o los segundos a esperar.
+        """
+        return await Limitador_Servicio.almacen().consumir(clave, limite)
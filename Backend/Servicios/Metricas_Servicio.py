@@ -0,0 +1,323 @@
+import asyncio
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+import config
+from Servicios.Archivo_Utilidades import reemplazar
+
+# Límites (segundos) de los buckets de los histogramas de duración
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Límites de los buckets de la cantidad de consultas SQL por solicitud
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+# Operaciones SQL que se distinguen en las métricas (las demás se agrupan como OTRA)
+OPERACIONES_SQL = frozenset(('SELECT', 'INSERT', 'UPDATE', 'DELETE'))
+
+# Métricas exportadas: nombre -> (tipo, ayuda, buckets de los histogramas)
+METRICAS = {
+    'intellihome_solicitudes_total': ('counter', 'Solicitudes HTTP atendidas por ruta, método y estado.', None),
+    'intellihome_solicitud_segundos': ('histogram', 'Latencia de las solicitudes HTTP por ruta.', BUCKETS_SEGUNDOS),
+    'intellihome_solicitud_consultas_sql': ('histogram', 'Consultas SQL ejecutadas por solicitud.', BUCKETS_CONSULTAS),
+    'intellihome_sql_segundos': ('histogram', 'Duración de las consultas SQL por operación.', BUCKETS_SEGUNDOS),
+    'intellihome_span_segundos': ('histogram', 'Duración de los tramos medidos con trace().', BUCKETS_SEGUNDOS),
+    'intellihome_hash_espera_segundos': ('histogram', 'Espera en la cola del pool de hashing.', BUCKETS_SEGUNDOS),
+    'intellihome_hash_segundos': ('histogram', 'Duración de cada hash o verificación bcrypt.', BUCKETS_SEGUNDOS),
+    'intellihome_hash_en_curso': ('gauge', 'Operaciones de hashing ejecutándose o en cola.', None),
+    'intellihome_hash_rechazadas_total': ('counter', 'Operaciones de hashing rechazadas por cola llena.', None),
+    'intellihome_idempotencia_total': ('counter', 'Solicitudes con Idempotency-Key por resultado.', None),
+    'intellihome_trabajos_total': ('counter', 'Trabajos de la cola terminados por tipo y resultado.', None),
+    'intellihome_trabajo_espera_segundos': ('histogram', 'Tiempo desde que un trabajo está disponible hasta que se ejecuta.', BUCKETS_SEGUNDOS),
+    'intellihome_trabajo_segundos': ('histogram', 'Duración de la ejecución de cada trabajo.', BUCKETS_SEGUNDOS),
+    'intellihome_trabajo_latencia_segundos': ('histogram', 'Tiempo desde que se encola un trabajo hasta que se completa.', BUCKETS_SEGUNDOS),
+}
+
+# Datos de la solicitud en curso (la comparten el middleware, trace() y los eventos del engine)
+_solicitud_actual = contextvars.ContextVar('solicitud_actual', default=None)
+
+
+class DatosSolicitud:
+    """
+    Lo que se acumula durante una solicitud: consultas SQL, tiempo en SQL, tramos y muestras del perfilador.
+    """
+    __slots__ = ('consultas', 'tiempo_sql', 'spans', 'muestras')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.spans = []
+        self.muestras = None
+
+
+class Histograma:
+    """
+    Histograma acumulativo al estilo Prometheus (conteo por bucket, suma y total).
+    """
+    __slots__ = ('limites', 'conteos', 'suma', 'total')
+
+    def __init__(self, limites: tuple):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        # bisect_left: el valor cuenta en el primer bucket con límite >= valor (semántica "le")
+        self.conteos[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class Metricas_Servicio:
+    # Series registradas: (nombre, etiquetas) -> Histograma o valor del contador o gauge
+    _series = {}
+    _lock = threading.Lock()
+
+    # Archivo de series del proceso: (pid, ruta)
+    _archivo = None
+
+    #================================= API PÚBLICA ================================= #
+
+    # Registrar una observación en un histograma
+    @staticmethod
+    def observar(nombre: str, etiquetas: tuple, valor: float):
+        """
+        Agrega el valor al histograma `nombre` con las etiquetas dadas (tupla de pares (clave, valor)).
+        """
+        clave = (nombre, etiquetas)
+        with Metricas_Servicio._lock:
+            histograma = Metricas_Servicio._series.get(clave)
+            if histograma is None:
+                histograma = Metricas_Servicio._series[clave] = Histograma(METRICAS[nombre][2])
+            histograma.observar(valor)
+
+    # Incrementar un contador
+    @staticmethod
+    def incrementar(nombre: str, etiquetas: tuple, cantidad: float = 1):
+        clave = (nombre, etiquetas)
+        with Metricas_Servicio._lock:
+            Metricas_Servicio._series[clave] = Metricas_Servicio._series.get(clave, 0) + cantidad
+
+    # Fijar el valor de un gauge
+    @staticmethod
+    def fijar(nombre: str, etiquetas: tuple, valor: float):
+        with Metricas_Servicio._lock:
+            Metricas_Servicio._series[(nombre, etiquetas)] = valor
+
+    # Registrar una solicitud terminada
+    @staticmethod
+    def registrar_solicitud(metodo: str, ruta: str, estado: int, duracion: float, solicitud: DatosSolicitud):
+        """
+        Registra la latencia, el estado y la cantidad de consultas SQL de una solicitud HTTP.
+        """
+        etiquetas = (('ruta', ruta), ('metodo', metodo))
+        Metricas_Servicio.incrementar('intellihome_solicitudes_total', etiquetas + (('estado', str(estado)),))
+        Metricas_Servicio.observar('intellihome_solicitud_segundos', etiquetas, duracion)
+        Metricas_Servicio.observar('intellihome_solicitud_consultas_sql', etiquetas, solicitud.consultas)
+
+    # Iniciar los datos de una solicitud
+    @staticmethod
+    def iniciar_solicitud():
+        """
+        Crea los datos de la solicitud en curso. Devuelve (datos, token para terminar_solicitud).
+        """
+        solicitud = DatosSolicitud()
+        return solicitud, _solicitud_actual.set(solicitud)
+
+    # Terminar los datos de una solicitud
+    @staticmethod
+    def terminar_solicitud(token):
+        _solicitud_actual.reset(token)
+
+    # Medir las consultas de un engine
+    @staticmethod
+    def instrumentar_engine(engine):
+        """
+        Registra eventos en el engine (síncrono; para uno asíncrono se pasa engine.sync_engine) que miden
+        la duración de cada consulta por operación y la suman a la solicitud en curso.
+        """
+        @event.listens_for(engine, 'before_cursor_execute')
+        def antes_de_consulta(conexion, cursor, sql, parametros, contexto, executemany):
+            conexion.info['inicio_consulta'] = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def despues_de_consulta(conexion, cursor, sql, parametros, contexto, executemany):
+            duracion = time.perf_counter() - conexion.info.pop('inicio_consulta', time.perf_counter())
+            operacion = sql[:8].lstrip().split(' ', 1)[0].upper()
+            operacion = operacion if operacion in OPERACIONES_SQL else 'OTRA'
+            Metricas_Servicio.observar('intellihome_sql_segundos', (('operacion', operacion),), duracion)
+            solicitud = _solicitud_actual.get()
+            if solicitud is not None:
+                solicitud.consultas += 1
+                solicitud.tiempo_sql += duracion
+
+    # Guardar las series de este proceso (varios workers)
+    @staticmethod
+    def guardar_proceso():
+        """
+        Escribe las series del proceso en METRICAS_DIR/<pid>-<inicio>.json para que el worker que
+        atienda /metrics las sume a las suyas. Los archivos de los workers que ya terminaron se
+        conservan: sus contadores siguen sumando (un contador no debe bajar cuando se recicla un
+        worker); el momento de inicio evita que un worker nuevo con un pid reutilizado los pise.
+        """
+        reemplazar(Metricas_Servicio._ruta_proceso(), json.dumps(Metricas_Servicio._instantanea()).encode())
+
+    # Tarea periódica de guardado
+    @staticmethod
+    async def tarea_guardado():
+        """
+        Guarda las series del proceso cada METRICAS_GUARDADO_SEGUNDOS (solo con METRICAS_DIR).
+        """
+        while True:
+            await asyncio.sleep(config.METRICAS_GUARDADO_SEGUNDOS)
+            await asyncio.to_thread(Metricas_Servicio.guardar_proceso)
+
+    # Exportar en formato de texto de Prometheus
+    @staticmethod
+    def exportar(valores: dict = None) -> str:
+        """
+        Devuelve todas las series en el formato de exposición de Prometheus (text/plain 0.0.4).
+        Con METRICAS_DIR suma las de todos los workers (las de los demás, con hasta
+        METRICAS_GUARDADO_SEGUNDOS de atraso). `valores` agrega métricas instantáneas del proceso:
+        nombre -> (tipo, ayuda, valor).
+        """
+        if config.METRICAS_DIR:
+            Metricas_Servicio.guardar_proceso()
+            series = _combinar(Metricas_Servicio._leer_procesos())
+        else:
+            series = Metricas_Servicio._instantanea()
+        por_nombre = {}
+        for nombre, etiquetas, serie in sorted(series, key=lambda s: (s[0], s[1])):
+            por_nombre.setdefault(nombre, []).append((etiquetas, serie))
+
+        lineas = []
+        for nombre, (tipo, ayuda, limites) in METRICAS.items():
+            lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}']
+            for etiquetas, serie in por_nombre.get(nombre, ()):
+                if tipo != 'histogram':
+                    lineas.append(f'{nombre}{_etiquetas(etiquetas)} {_numero(serie)}')
+                    continue
+                conteos, suma, total = serie
+                acumulado = 0
+                for limite, conteo in zip((*limites, '+Inf'), conteos):
+                    acumulado += conteo
+                    lineas.append(f'{nombre}_bucket{_etiquetas(etiquetas + (("le", str(limite)),))} {acumulado}')
+                lineas.append(f'{nombre}_sum{_etiquetas(etiquetas)} {_numero(suma)}')
+                lineas.append(f'{nombre}_count{_etiquetas(etiquetas)} {total}')
+        for nombre, (tipo, ayuda, valor) in (valores or {}).items():
+            lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}', f'{nombre} {_numero(valor)}']
+        return '\n'.join(lineas) + '\n'
+
+    # Reiniciar las series (benchmarks)
+    @staticmethod
+    def reiniciar():
+        with Metricas_Servicio._lock:
+            Metricas_Servicio._series.clear()
+
+    #================================= UTILIDADES ================================= #
+
+    # Copia de las series del proceso
+    @staticmethod
+    def _instantanea() -> list:
+        """
+        Devuelve [(nombre, etiquetas, valor)], donde el valor de un histograma es (conteos, suma, total).
+        """
+        with Metricas_Servicio._lock:
+            return [
+                (nombre, etiquetas, serie if not isinstance(serie, Histograma)
+                 else (list(serie.conteos), serie.suma, serie.total))
+                for (nombre, etiquetas), serie in Metricas_Servicio._series.items()
+            ]
+
+    # Archivo de series de este proceso
+    @staticmethod
+    def _ruta_proceso() -> str:
+        """
+        Se elige en el primer guardado de cada proceso (los workers se crean con fork, así que el
+        valor heredado del proceso principal se descarta si el pid cambió).
+        """
+        pid = os.getpid()
+        if Metricas_Servicio._archivo is None or Metricas_Servicio._archivo[0] != pid:
+            Metricas_Servicio._archivo = (pid, os.path.join(config.METRICAS_DIR, f'{pid}-{time.time_ns()}.json'))
+        return Metricas_Servicio._archivo[1]
+
+    # Leer las series guardadas por todos los workers
+    @staticmethod
+    def _leer_procesos() -> list:
+        """
+        Los gauges de un archivo que no se actualizó en tres intervalos de guardado son de un worker
+        que ya terminó y se descartan; sus contadores e histogramas se conservan.
+        """
+        procesos = []
+        limite = time.time() - 3 * config.METRICAS_GUARDADO_SEGUNDOS
+        for ruta in glob.glob(os.path.join(config.METRICAS_DIR, '*.json')):
+            with open(ruta, 'rb') as f:
+                series = json.loads(f.read())
+            if os.path.getmtime(ruta) < limite:
+                series = [serie for serie in series if METRICAS[serie[0]][0] != 'gauge']
+            procesos.append(series)
+        return procesos
+
+
+# Medir un tramo de código
+@contextmanager
+def trace(nombre: str):
+    """
+    Mide la duración del bloque (por ejemplo `with trace("bcrypt_verify"):`), la registra en
+    intellihome_span_segundos y la agrega a los tramos de la solicitud en curso.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        Metricas_Servicio.observar('intellihome_span_segundos', (('span', nombre),), duracion)
+        solicitud = _solicitud_actual.get()
+        if solicitud is not None:
+            solicitud.spans.append((nombre, duracion))
+
+
+#================================= UTILIDADES ================================= #
+
+# Sumar las series de varios procesos
+def _combinar(procesos: list) -> list:
+    """
+    Suma los contadores y, bucket por bucket, los histogramas con el mismo nombre y etiquetas.
+    """
+    combinadas = {}
+    for series in procesos:
+        for nombre, etiquetas, serie in series:
+            clave = (nombre, tuple(tuple(par) for par in etiquetas))
+            actual = combinadas.get(clave)
+            if not isinstance(serie, list):
+                combinadas[clave] = (actual or 0) + serie
+            elif actual is None:
+                combinadas[clave] = (list(serie[0]), serie[1], serie[2])
+            else:
+                combinadas[clave] = ([a + b for a, b in zip(actual[0], serie[0])], actual[1] + serie[1], actual[2] + serie[2])
+    return [(nombre, etiquetas, serie) for (nombre, etiquetas), serie in combinadas.items()]
+
+
+# Formatear las etiquetas de una serie
+def _etiquetas(etiquetas: tuple) -> str:
+    if not etiquetas:
+        return ''
+    return '{' + ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas) + '}'
+
+
+# Escapar el valor de una etiqueta (barra invertida, comillas y saltos de línea)
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Formatear un número (enteros sin decimales)
+def _numero(valor) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
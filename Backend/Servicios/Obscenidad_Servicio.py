@@ -0,0 +1,143 @@
+import unicodedata
+from collections import deque
+
+import config
+
+# Sustituciones de leetspeak aplicadas antes de comparar
+LEETSPEAK = str.maketrans({
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's',
+    '7': 't', '8': 'b', '@': 'a', '$': 's', '!': 'i',
+})
+
+# Ñ descompuesta por NFKD (n + tilde combinante), se vuelve a componer al normalizar
+N_DESCOMPUESTA = unicodedata.normalize('NFKD', 'ñ')
+
+# Separador entre campos (ninguna palabra lo contiene, así que ninguna coincidencia cruza campos)
+SEPARADOR = '\x00'
+
+
+class FiltroObscenidad:
+    """
+    Autómata de Aho-Corasick construido una sola vez a partir de la lista de palabras.
+
+    El texto se normaliza (minúsculas, sin tildes, leetspeak) y se comprime en secuencias de
+    (letra, repeticiones): el autómata recorre las letras sin repetir, por lo que "puuuta" coincide
+    con "puta", y luego se verifica que cada letra aparezca al menos tantas veces seguidas como
+    en la palabra original, por lo que "pera" no coincide con "perra".
+    """
+
+    def __init__(self, palabras):
+        self._transiciones = [{}]
+        self._fallo = [0]
+        self._salidas = [[]]
+        for palabra in palabras:
+            letras, repeticiones = FiltroObscenidad._comprimir(FiltroObscenidad.normalizar(palabra))
+            if letras:
+                self._insertar(letras, repeticiones)
+        self._construir_fallos()
+
+    # Normalizar texto
+    @staticmethod
+    def normalizar(texto: str) -> str:
+        """
+        Pasa a minúsculas, quita tildes, aplica leetspeak y descarta lo que no sea letra o espacio.
+        La ñ se conserva: es otra letra, no una n con tilde ("coño" no debe coincidir con "Conocido").
+        """
+        texto = unicodedata.normalize('NFKD', texto.lower().translate(LEETSPEAK)).replace(N_DESCOMPUESTA, 'ñ')
+        return ''.join(c for c in texto if c.isalpha() or c.isspace())
+
+    # Buscar palabras no permitidas en varios campos
+    def campos_con_coincidencias(self, campos: dict) -> set:
+        """
+        Recorre todos los campos en una sola pasada y devuelve los nombres de los campos que
+        contienen alguna palabra no permitida.
+        """
+        nombres = list(campos)
+        letras, repeticiones, indice_campo = [], [], []
+        for i, nombre in enumerate(nombres):
+            l, r = FiltroObscenidad._comprimir(FiltroObscenidad.normalizar(campos[nombre] or ''))
+            letras += l + [SEPARADOR]
+            repeticiones += r + [1]
+            indice_campo += [i] * (len(l) + 1)
+
+        encontrados = set()
+        estado = 0
+        for posicion, letra in enumerate(letras):
+            while estado and letra not in self._transiciones[estado]:
+                estado = self._fallo[estado]
+            estado = self._transiciones[estado].get(letra, 0)
+            for requeridas in self._salidas[estado]:
+                inicio = posicion - len(requeridas) + 1
+                if all(repeticiones[inicio + k] >= n for k, n in enumerate(requeridas)):
+                    encontrados.add(nombres[indice_campo[posicion]])
+                    break
+        return encontrados
+
+    #================================= UTILIDADES ================================= #
+
+    # Comprimir letras repetidas
+    @staticmethod
+    def _comprimir(texto: str):
+        """
+        Convierte "puuta" en (['p', 'u', 't', 'a'], [1, 2, 1, 1]).
+        """
+        letras, repeticiones = [], []
+        for c in texto:
+            if letras and letras[-1] == c:
+                repeticiones[-1] += 1
+            else:
+                letras.append(c)
+                repeticiones.append(1)
+        return letras, repeticiones
+
+    # Insertar una palabra en el trie
+    def _insertar(self, letras, repeticiones):
+        estado = 0
+        for letra in letras:
+            siguiente = self._transiciones[estado].get(letra)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[estado][letra] = siguiente
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append([])
+            estado = siguiente
+        self._salidas[estado].append(tuple(repeticiones))
+
+    # Construir los enlaces de fallo (recorrido en anchura)
+    def _construir_fallos(self):
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for letra, siguiente in self._transiciones[estado].items():
+                fallo = self._fallo[estado]
+                while fallo and letra not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                self._fallo[siguiente] = self._transiciones[fallo].get(letra, 0)
+                self._salidas[siguiente] += self._salidas[self._fallo[siguiente]]
+                cola.append(siguiente)
+
+
+class Obscenidad_Servicio:
+    # Filtro compilado (se construye al iniciar la aplicación)
+    _filtro = None
+
+    # Cargar la lista de palabras y compilar el filtro
+    @staticmethod
+    def cargar(ruta: str = None):
+        """
+        Lee el archivo de palabras (una por línea, # para comentarios) y compila el autómata.
+        """
+        with open(ruta or config.PALABRAS_OBSCENAS_PATH, encoding='utf-8') as f:
+            palabras = [linea.strip() for linea in f if linea.strip() and not linea.startswith('#')]
+        Obscenidad_Servicio._filtro = FiltroObscenidad(palabras)
+
+    # Obtener el filtro compilado
+    @staticmethod
+    def obtener() -> FiltroObscenidad:
+        """
+        Devuelve el filtro, compilándolo la primera vez si aún no se cargó.
+        """
+        if Obscenidad_Servicio._filtro is None:
+            Obscenidad_Servicio.cargar()
+        return Obscenidad_Servicio._filtro
@@ -0,0 +1,134 @@
+import asyncio
+import collections
+import os
+import re
+import sys
+import threading
+import time
+
+import config
+
+# Profundidad máxima que se recorre en una pila (evita ciclos y pilas patológicas)
+MAX_PROFUNDIDAD = 200
+
+
+class Perfilador:
+    """
+    Perfilador por muestreo (tiempo real) de las solicitudes en curso.
+
+    Un hilo toma cada `intervalo` segundos la pila de cada solicitud activa: la cadena de corrutinas
+    que esperan (cr_await) y, si la solicitud es la que está ejecutando el event loop en ese momento,
+    los marcos síncronos por debajo. Así una solicitud que espera a bcrypt aparece como
+    `...;_ejecutar;<espera Future>` y una que gasta CPU muestra la función que lo hace.
+    Las solicitudes que superan `umbral` segundos se guardan en formato "collapsed stacks"
+    (una línea `marco;marco;marco cantidad`), que aceptan flamegraph.pl, speedscope e inferno.
+    """
+
+    def __init__(self, intervalo: float = None, umbral: float = None, carpeta: str = None, max_archivos: int = None):
+        self.intervalo = intervalo or config.PERFILADOR_INTERVALO_MS / 1000
+        self.umbral = config.PERFILADOR_UMBRAL_MS / 1000 if umbral is None else umbral
+        self.carpeta = carpeta or config.PERFILADOR_DIR
+        self.max_archivos = max_archivos or config.PERFILADOR_MAX_ARCHIVOS
+        # Tarea asyncio -> (etiqueta de la solicitud, contador de pilas)
+        self._activas = {}
+        self._hilo = None
+        self._hilo_loop = None
+
+    # Empezar a muestrear la solicitud de la tarea actual
+    def iniciar(self, etiqueta: str) -> collections.Counter:
+        """
+        Registra la tarea actual y devuelve el contador donde se acumulan sus muestras.
+        """
+        if self._hilo is None:
+            self._hilo_loop = threading.get_ident()
+            self._hilo = threading.Thread(target=self._muestrear, name='perfilador', daemon=True)
+            self._hilo.start()
+        muestras = collections.Counter()
+        self._activas[asyncio.current_task()] = (etiqueta, muestras)
+        return muestras
+
+    # Terminar el muestreo de la solicitud de la tarea actual
+    def terminar(self, duracion: float):
+        """
+        Deja de muestrear la tarea actual y, si la solicitud fue lenta, guarda sus pilas.
+        Devuelve la ruta del archivo escrito o None.
+        """
+        etiqueta, muestras = self._activas.pop(asyncio.current_task(), (None, None))
+        if not muestras or duracion < self.umbral:
+            return None
+        return self._guardar(etiqueta, muestras, duracion)
+
+    #================================= UTILIDADES ================================= #
+
+    # Bucle del hilo de muestreo
+    def _muestrear(self):
+        while True:
+            time.sleep(self.intervalo)
+            if not self._activas:
+                continue
+            marco_hilo = sys._current_frames().get(self._hilo_loop)
+            try:
+                activas = list(self._activas.items())
+            except RuntimeError:
+                # El diccionario cambió mientras se copiaba; se toma la siguiente muestra
+                continue
+            for tarea, (etiqueta, muestras) in activas:
+                muestras[etiqueta + ';' + _pila_tarea(tarea, marco_hilo)] += 1
+
+    # Guardar las pilas de una solicitud lenta
+    def _guardar(self, etiqueta: str, muestras: collections.Counter, duracion: float) -> str:
+        os.makedirs(self.carpeta, exist_ok=True)
+        nombre = re.sub(r'[^A-Za-z0-9_.-]+', '_', etiqueta).strip('_')
+        ruta = os.path.join(
+            self.carpeta, f'{time.strftime("%Y%m%d-%H%M%S")}_{nombre}_{round(duracion * 1000)}ms.folded'
+        )
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.writelines(f'{pila} {cantidad}\n' for pila, cantidad in muestras.most_common())
+        # Se conservan solo los archivos más recientes
+        archivos = sorted(f for f in os.listdir(self.carpeta) if f.endswith('.folded'))
+        for viejo in archivos[:-self.max_archivos]:
+            os.remove(os.path.join(self.carpeta, viejo))
+        return ruta
+
+
+# Pila de una tarea asyncio en formato collapsed (raíz primero)
+def _pila_tarea(tarea, marco_hilo) -> str:
+    """
+    Recorre la cadena de corrutinas de la tarea. Si la última corrutina se está ejecutando en el hilo
+    del event loop, agrega los marcos síncronos que están por debajo de ella.
+    """
+    marcos = []
+    ultimo_marco = None
+    objeto = tarea.get_coro()
+    while objeto is not None and len(marcos) < MAX_PROFUNDIDAD:
+        marco = getattr(objeto, 'cr_frame', None) or getattr(objeto, 'gi_frame', None) or getattr(objeto, 'ag_frame', None)
+        if marco is None:
+            # Un Future u otro objeto esperable: la tarea está suspendida esperándolo
+            marcos.append(f'<espera {type(objeto).__name__}>')
+            break
+        marcos.append(_nombre_marco(marco))
+        ultimo_marco = marco
+        objeto = getattr(objeto, 'cr_await', None) or getattr(objeto, 'gi_yieldfrom', None) or getattr(objeto, 'ag_await', None)
+    else:
+        if ultimo_marco is not None:
+            marcos += _marcos_debajo(marco_hilo, ultimo_marco)
+    return ';'.join(marcos)
+
+
+# Marcos síncronos del hilo que están por debajo de un marco dado
+def _marcos_debajo(marco_hilo, marco_corrutina) -> list:
+    debajo = []
+    marco = marco_hilo
+    while marco is not None and len(debajo) < MAX_PROFUNDIDAD:
+        if marco is marco_corrutina:
+            return [_nombre_marco(m) for m in reversed(debajo)]
+        debajo.append(marco)
+        marco = marco.f_back
+    # La corrutina no se está ejecutando en este momento
+    return []
+
+
+# Nombre de un marco para el flamegraph
+def _nombre_marco(marco) -> str:
+    codigo = marco.f_code
+    return f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{marco.f_lineno})'
@@ -0,0 +1,139 @@
+import re
+from datetime import date
+
+from Servicios.Obscenidad_Servicio import Obscenidad_Servicio
+from Servicios.Tarjeta_Servicio import Tarjeta_Servicio
+
+
+class Regla:
+    """
+    Regla de validación de un campo: predicado ya compilado y mensaje de error si no se cumple.
+    """
+    __slots__ = ('prueba', 'mensaje')
+
+    def __init__(self, prueba, mensaje: str):
+        self.prueba = prueba
+        self.mensaje = mensaje
+
+
+#================================= TIPOS DE REGLA ================================= #
+
+# El valor debe coincidir completo con la expresión regular
+def patron(expresion: str, mensaje: str, flags: int = 0) -> Regla:
+    coincide = re.compile(expresion, flags).fullmatch
+    return Regla(lambda valor: valor is not None and coincide(str(valor)) is not None, mensaje)
+
+
+# El valor no puede estar vacío (ni contener solo espacios, si se indica)
+def requerido(mensaje: str, ignorar_espacios: bool = False) -> Regla:
+    if ignorar_espacios:
+        return Regla(lambda valor: bool(valor and valor.strip()), mensaje)
+    return Regla(bool, mensaje)
+
+
+# Fecha YYYY-MM-DD (acepta lo mismo que strptime('%Y-%m-%d'), sin su costo)
+_FECHA_ISO = re.compile(r'(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])').fullmatch
+
+
+def convertir_fecha_iso(valor):
+    """
+    Devuelve la fecha como date, o None si no tiene el formato YYYY-MM-DD o no existe (por ejemplo 2001-02-29).
+    """
+    partes = _FECHA_ISO(valor) if isinstance(valor, str) else None
+    if partes is None:
+        return None
+    try:
+        return date(int(partes[1]), int(partes[2]), int(partes[3]))
+    except ValueError:
+        return None
+
+
+def fecha_iso(mensaje: str) -> Regla:
+    return Regla(lambda valor: convertir_fecha_iso(valor) is not None, mensaje)
+
+
+# Una fecha MM/YYYY (ya validada con su patrón) debe tener un año válido
+def anio_valido(mensaje: str) -> Regla:
+    return Regla(lambda valor: int(valor[3:]) > 0, mensaje)
+
+
+# Una fecha MM/YYYY (ya validada) no puede ser de un mes anterior al actual
+def mes_vigente(mensaje: str) -> Regla:
+    def prueba(valor):
+        hoy = date.today()
+        anio, mes = int(valor[3:]), int(valor[:2])
+        return (anio, mes) >= (hoy.year, hoy.month)
+    return Regla(prueba, mensaje)
+
+
+# El valor no puede contener palabras no permitidas
+def sin_palabras_obscenas(mensaje: str) -> Regla:
+    return Regla(lambda valor: not Obscenidad_Servicio.obtener().campos_con_coincidencias({'valor': valor or ''}), mensaje)
+
+
+#================================= MOTOR ================================= #
+
+class MotorReglas:
+    """
+    Conjunto declarativo de reglas por campo. Las expresiones se compilan una sola vez al construirlo.
+    Por cada campo se reporta solo la primera regla que falla (en el orden declarado).
+    """
+
+    def __init__(self, esquema: dict, opcionales: tuple = ()):
+        self.esquema = {campo: tuple(reglas) for campo, reglas in esquema.items()}
+        # Campos que solo se validan si vienen con valor
+        self.opcionales = frozenset(opcionales)
+
+    # Validar los campos presentes en los datos
+    def validar(self, datos: dict, errores: dict = None) -> dict:
+        """
+        Valida los campos de `datos` que tienen reglas (los demás se ignoran) y agrega los errores.
+        """
+        errores = {} if errores is None else errores
+        for campo, valor in datos.items():
+            reglas = self.esquema.get(campo)
+            if reglas is None or (not valor and campo in self.opcionales):
+                continue
+            for regla in reglas:
+                if not regla.prueba(valor):
+                    errores[campo] = regla.mensaje
+                    break
+        return errores
+
+
+# Reglas de los campos del registro que no dependen de la base de datos
+MENSAJE_CONTRASENA = 'La contraseña debe tener al menos 8 caracteres y ser alfanumérica.'
+MENSAJE_PALABRAS = 'El valor contiene palabras no permitidas.'
+
+REGLAS_REGISTRO = MotorReglas({
+    'contrasena': (
+        # Al menos 8 caracteres, una letra y un dígito
+        patron(r'(?=.*[A-Za-z])(?=.*\d).{8,}', MENSAJE_CONTRASENA, re.DOTALL),
+    ),
+    'nombre': (sin_palabras_obscenas(MENSAJE_PALABRAS),),
+    'apellidos': (sin_palabras_obscenas(MENSAJE_PALABRAS),),
+    'username': (sin_palabras_obscenas(MENSAJE_PALABRAS),),
+    'telefono': (
+        patron(r'\d+', 'El teléfono debe contener solo caracteres numéricos.'),
+    ),
+    'fecha_nacimiento': (
+        requerido('La fecha de nacimiento es obligatoria.'),
+        fecha_iso('El formato de la fecha debe ser YYYY-MM-DD.'),
+    ),
+    'respuesta_recuperacion': (
+        requerido('La respuesta de recuperación es obligatoria.'),
+    ),
+    'nombre_titular': (
+        requerido('El nombre del titular es obligatorio.', ignorar_espacios=True),
+    ),
+    'numero_tarjeta': (
+        patron(r'[0-9]{12,19}', 'El número de tarjeta debe tener entre 12 y 19 dígitos numéricos.'),
+        Regla(Tarjeta_Servicio.luhn, 'El número de tarjeta no es válido.'),
+        Regla(Tarjeta_Servicio.longitud_valida, 'La cantidad de dígitos no corresponde a la marca de la tarjeta.'),
+    ),
+    'fecha_expiracion': (
+        patron(r'(0[1-9]|1[0-2])/\d{4}', 'La fecha de expiración debe tener formato MM/YYYY.'),
+        anio_valido('La fecha de expiración no es válida.'),
+        mes_vigente('La fecha de expiración debe ser futura.'),
+    ),
+})
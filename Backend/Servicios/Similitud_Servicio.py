@@ -0,0 +1,280 @@
+import asyncio
+import logging
+
+from sqlalchemy import String, cast, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from Modelos.Usuario import Usuario
+from Modelos.Hobby import UsuarioHobby
+from Modelos.UsuarioTipoCasa import UsuarioTipoCasa
+
+logger = logging.getLogger(__name__)
+
+# Características de cada usuario: (tipo, id) por cada hobby y cada tipo de casa
+CONSULTA_CARACTERISTICAS = union_all(
+    select(UsuarioHobby.usuario_id, literal('hobby').label('tipo'), UsuarioHobby.hobby_id.label('identificador')),
+    select(UsuarioTipoCasa.usuario_id, literal('tipo_casa'), UsuarioTipoCasa.tipo_casa_id),
+).subquery()
+
+
+class IndiceBitmap:
+    """
+    Índice invertido de características (hobbies y tipos de casa) con un bitmap de usuarios por
+    característica: un entero de Python donde el bit i corresponde al usuario con id i. Los ids son
+    consecutivos, así que el bitmap sin comprimir ya es la representación compacta (1M usuarios =
+    125 KB por característica) y AND/OR/XOR recorren palabras de 64 bits en C.
+
+    Además guarda un bitmap por cantidad de características (para el denominador de Jaccard sin
+    guardar el conjunto de cada usuario) y el de los usuarios presentes: los ya agregados, incluso
+    los que no tienen características (no tienen similares, pero no hace falta volver a leerlos).
+    """
+
+    def __init__(self):
+        self.caracteristicas = {}
+        self.por_tamano = {}
+        self.presentes = 0
+
+    # Agregar un usuario
+    def agregar(self, usuario_id: int, caracteristicas: set):
+        """
+        No hace nada si el usuario ya está (el registro local y la sincronización pueden agregarlo dos veces).
+        """
+        bit = 1 << usuario_id
+        if self.presentes & bit:
+            return
+        for clave in caracteristicas:
+            self.caracteristicas[clave] = self.caracteristicas.get(clave, 0) | bit
+        if caracteristicas:
+            self.por_tamano[len(caracteristicas)] = self.por_tamano.get(len(caracteristicas), 0) | bit
+        self.presentes |= bit
+
+    # Características de un usuario
+    def caracteristicas_de(self, usuario_id: int) -> list:
+        return [clave for clave, bitmap in self.caracteristicas.items() if (bitmap >> usuario_id) & 1]
+
+    # Usuarios más parecidos
+    def similares(self, usuario_id: int, k: int) -> list:
+        """
+        Devuelve hasta `k` tuplas (usuario_id, en_comun, jaccard) ordenadas por Jaccard descendente y
+        luego por id. Solo usuarios con al menos una característica en común.
+
+        Las coincidencias de cada usuario se cuentan en paralelo con un contador por planos de bits
+        (sumar un bitmap = una cascada de XOR/AND con acarreo), así que el costo depende de la cantidad
+        de características del usuario y no de la cantidad de usuarios candidatos. Jaccard con i
+        coincidencias y t características es i / (s + t - i): se recorren los pares (i, t) de mayor a
+        menor puntaje intersecando "exactamente i coincidencias" con "t características" hasta juntar k.
+        """
+        propias = self.caracteristicas_de(usuario_id)
+        if not propias:
+            return []
+        planos = []
+        candidatos = 0
+        for clave in propias:
+            acarreo = self.caracteristicas[clave]
+            candidatos |= acarreo
+            for j in range(len(planos)):
+                if not acarreo:
+                    break
+                planos[j], acarreo = planos[j] ^ acarreo, planos[j] & acarreo
+            if acarreo:
+                planos.append(acarreo)
+        candidatos &= ~(1 << usuario_id)
+
+        s = len(propias)
+        puntajes = {}
+        for i in range(1, s + 1):
+            for t in self.por_tamano:
+                if t >= i:
+                    puntajes.setdefault(i / (s + t - i), []).append((i, t))
+
+        exactos = {}
+        resultado = []
+        for puntaje in sorted(puntajes, reverse=True):
+            # Los pares con el mismo puntaje se unen para desempatar por id
+            grupo = {}
+            for i, t in puntajes[puntaje]:
+                if i not in exactos:
+                    exactos[i] = self._exactamente(planos, candidatos, i)
+                celda = exactos[i] & self.por_tamano[t]
+                if celda:
+                    grupo[i] = grupo.get(i, 0) | celda
+            ordenados = []
+            for i, bitmap in grupo.items():
+                ordenados.extend((uid, i) for uid in _primeros_bits(bitmap, k - len(resultado)))
+            for uid, i in sorted(ordenados)[:k - len(resultado)]:
+                resultado.append((uid, i, puntaje))
+            if len(resultado) >= k:
+                break
+        return resultado
+
+    # Usuarios con exactamente i coincidencias
+    @staticmethod
+    def _exactamente(planos: list, candidatos: int, i: int) -> int:
+        bitmap = candidatos
+        for j, plano in enumerate(planos):
+            bitmap &= plano if (i >> j) & 1 else ~plano
+        return bitmap
+
+
+class ConstructorIndice:
+    """
+    Construye un IndiceBitmap característica por característica. Llena un bytearray por
+    característica (un bit por usuario hasta `maximo_id`) y convierte cada uno en entero al final,
+    en lugar de crear un entero nuevo por cada bit.
+    """
+
+    def __init__(self, maximo_id: int):
+        self.tamano = (maximo_id >> 3) + 1
+        self.bytes_caracteristicas = {}
+        self.conteos = bytearray(maximo_id + 1)
+
+    # Agregar los usuarios de una característica
+    def agregar(self, clave: tuple, usuarios_ids):
+        datos = self.bytes_caracteristicas.setdefault(clave, bytearray(self.tamano))
+        conteos = self.conteos
+        for usuario_id in usuarios_ids:
+            datos[usuario_id >> 3] |= 1 << (usuario_id & 7)
+            conteos[usuario_id] += 1
+
+    # Obtener el índice
+    def terminar(self) -> IndiceBitmap:
+        bytes_tamanos = {}
+        for usuario_id, conteo in enumerate(self.conteos):
+            if conteo:
+                datos = bytes_tamanos.get(conteo)
+                if datos is None:
+                    datos = bytes_tamanos[conteo] = bytearray(self.tamano)
+                datos[usuario_id >> 3] |= 1 << (usuario_id & 7)
+
+        indice = IndiceBitmap()
+        indice.caracteristicas = {clave: int.from_bytes(datos, 'little') for clave, datos in self.bytes_caracteristicas.items()}
+        indice.por_tamano = {conteo: int.from_bytes(datos, 'little') for conteo, datos in bytes_tamanos.items()}
+        for bitmap in indice.por_tamano.values():
+            indice.presentes |= bitmap
+        return indice
+
+
+class Similitud_Servicio:
+    # Índice en memoria de cada worker (se reemplaza completo al reconstruirlo)
+    _indice = IndiceBitmap()
+
+    # Último usuario leído de la base de datos (los posteriores se cargan al sincronizar)
+    _ultimo_id = 0
+
+    #================================= API PÚBLICA ================================= #
+
+    # Construir el índice desde la base de datos
+    @staticmethod
+    async def cargar(db: AsyncSession):
+        """
+        Lee las asociaciones hasta el último usuario existente y reemplaza el índice. Se ejecuta en
+        el arranque (Arranque_Servicio.precalentar). La base de datos agrupa los ids de cada hobby y
+        tipo de casa en una sola cadena "1,5,9": una fila por característica en lugar de una por
+        asociación (con 1M de usuarios, segundos menos de arranque).
+        """
+        maximo_id = await db.scalar(select(func.max(Usuario.id))) or 0
+        constructor = ConstructorIndice(maximo_id)
+        for tipo, tabla, columna in (('hobby', UsuarioHobby, UsuarioHobby.hobby_id),
+                                     ('tipo_casa', UsuarioTipoCasa, UsuarioTipoCasa.tipo_casa_id)):
+            filas = await db.execute(
+                select(columna, func.aggregate_strings(cast(tabla.usuario_id, String), ','))
+                .where(tabla.usuario_id <= maximo_id).group_by(columna)
+            )
+            for identificador, usuarios_ids in filas:
+                constructor.agregar((tipo, identificador), map(int, usuarios_ids.split(',')))
+        Similitud_Servicio._indice = constructor.terminar()
+        Similitud_Servicio._ultimo_id = maximo_id
+
+    # Agregar un usuario recién registrado
+    @staticmethod
+    def agregar(usuario_id: int, hobbies_ids: list, tipos_casa_ids: list):
+        """
+        Actualiza el índice del worker que atendió el registro; los demás lo cargan al sincronizar.
+        """
+        Similitud_Servicio._indice.agregar(
+            usuario_id, {('hobby', h) for h in hobbies_ids} | {('tipo_casa', t) for t in tipos_casa_ids}
+        )
+
+    # Cargar los usuarios registrados desde la última lectura
+    @staticmethod
+    async def sincronizar(db: AsyncSession):
+        """
+        Lee las características de los usuarios con id mayor al último leído menos
+        SIMILITUD_MARGEN_IDS. Con escritores concurrentes (PostgreSQL) un id menor puede confirmarse
+        después de uno mayor: el margen lo vuelve a leer en las sincronizaciones siguientes, y los
+        usuarios que ya están en el índice se ignoran. Solo se agregan los usuarios leídos.
+        """
+        desde = max(Similitud_Servicio._ultimo_id - config.SIMILITUD_MARGEN_IDS, 0)
+        filas = (await db.execute(
+            select(CONSULTA_CARACTERISTICAS).where(CONSULTA_CARACTERISTICAS.c.usuario_id > desde)
+        )).all()
+        nuevos = {}
+        for usuario_id, tipo, identificador in filas:
+            nuevos.setdefault(usuario_id, set()).add((tipo, identificador))
+        for usuario_id, caracteristicas in sorted(nuevos.items()):
+            Similitud_Servicio._indice.agregar(usuario_id, caracteristicas)
+        if nuevos:
+            Similitud_Servicio._ultimo_id = max(Similitud_Servicio._ultimo_id, max(nuevos))
+
+    # Cargar un usuario que no está en el índice
+    @staticmethod
+    async def _cargar_usuario(db: AsyncSession, usuario_id: int):
+        """
+        Lee las características de un solo usuario y lo agrega al índice. Si no tiene ninguna queda
+        presente igual (no vuelve a consultarse).
+        """
+        filas = await db.execute(
+            select(CONSULTA_CARACTERISTICAS.c.tipo, CONSULTA_CARACTERISTICAS.c.identificador)
+            .where(CONSULTA_CARACTERISTICAS.c.usuario_id == usuario_id)
+        )
+        Similitud_Servicio._indice.agregar(usuario_id, set(map(tuple, filas)))
+
+    # Tarea periódica de sincronización
+    @staticmethod
+    async def tarea_sincronizacion(session_factory):
+        """
+        Incorpora cada SIMILITUD_SINCRONIZACION segundos los usuarios registrados por otros workers
+        o por la importación masiva. Un error se registra y se reintenta en la siguiente vuelta.
+        """
+        while True:
+            await asyncio.sleep(config.SIMILITUD_SINCRONIZACION)
+            try:
+                async with session_factory() as db:
+                    await Similitud_Servicio.sincronizar(db)
+            except Exception:
+                logger.exception('No se pudo sincronizar el índice de usuarios parecidos')
+
+    # Usuarios con hobbies y tipos de casa parecidos
+    @staticmethod
+    async def similares(db: AsyncSession, usuario_id: int, k: int):
+        """
+        Devuelve los k usuarios con mayor índice de Jaccard sobre hobbies y tipos de casa.
+        Si el usuario todavía no está en el índice (lo registró otro worker y aún no se sincronizó)
+        se leen solo sus características; los demás usuarios nuevos llegan con la sincronización.
+        """
+        if not (Similitud_Servicio._indice.presentes >> usuario_id) & 1:
+            await Similitud_Servicio._cargar_usuario(db, usuario_id)
+        encontrados = Similitud_Servicio._indice.similares(usuario_id, k)
+        if not encontrados:
+            return {'usuarios': []}
+        nombres = dict((await db.execute(
+            select(Usuario.id, Usuario.username).where(Usuario.id.in_([uid for uid, _, _ in encontrados]))
+        )).all())
+        return {'usuarios': [
+            {'id': uid, 'username': nombres[uid], 'en_comun': en_comun, 'similitud': round(jaccard, 4)}
+            for uid, en_comun, jaccard in encontrados if uid in nombres
+        ]}
+
+
+#================================= UTILIDADES ================================= #
+
+
+# Posiciones de los primeros bits encendidos (ids de usuario en orden)
+def _primeros_bits(bitmap: int, cantidad: int) -> list:
+    posiciones = []
+    while bitmap and len(posiciones) < cantidad:
+        bajo = bitmap & -bitmap
+        posiciones.append(bajo.bit_length() - 1)
+        bitmap ^= bajo
+    return posiciones
@@ -0,0 +1,9 @@
+from Servicios.Imagen_Servicio import Imagen_Servicio
+
+# Tareas que ejecuta el trabajador de la cola: tipo de trabajo -> función asíncrona.
+# La función recibe los datos del trabajo como argumentos con nombre y debe poder repetirse sin
+# efectos duplicados (la entrega es "al menos una vez": un trabajo interrumpido se vuelve a ejecutar).
+TAREAS = {
+    # Miniaturas de la imagen de perfil (las que ya existen no se regeneran)
+    'miniaturas': Imagen_Servicio.generar_miniaturas,
+}
@@ -0,0 +1,117 @@
+import bisect
+import csv
+from typing import NamedTuple
+
+import config
+
+# Cantidad de dígitos del prefijo con que se comparan los rangos (los BIN actuales tienen hasta 8)
+DIGITOS_BIN = 8
+
+# Dígito -> suma de los dígitos de su doble (paso de Luhn)
+_DOBLE_LUHN = str.maketrans('0123456789', '0246813579')
+
+
+class RangoBIN(NamedTuple):
+    """
+    Rango inclusivo de prefijos (normalizados a DIGITOS_BIN dígitos) de una marca de tarjeta.
+    """
+    inicio: int
+    fin: int
+    marca: str
+    longitudes: frozenset
+
+
+class IndiceBIN:
+    """
+    Rangos de BIN ordenados por inicio. Cada búsqueda es un bisect (O(log n)) sobre los inicios,
+    por lo que la tabla puede crecer a miles de rangos sin afectar el registro.
+    """
+
+    def __init__(self, rangos):
+        rangos = sorted(rangos)
+        for anterior, actual in zip(rangos, rangos[1:]):
+            if actual.inicio <= anterior.fin:
+                raise ValueError(f'Rangos de BIN solapados: {anterior} y {actual}')
+        self._inicios = [r.inicio for r in rangos]
+        self._rangos = rangos
+
+    def __len__(self):
+        return len(self._rangos)
+
+    # Crear un rango a partir de prefijos de cualquier largo
+    @staticmethod
+    def rango(inicio: str, fin: str, marca: str, longitudes) -> RangoBIN:
+        """
+        Normaliza los prefijos: el inicio se completa con 0 y el fin con 9 (por ejemplo 51-55 -> 51000000-55999999).
+        """
+        return RangoBIN(
+            int(inicio.ljust(DIGITOS_BIN, '0')), int(fin.ljust(DIGITOS_BIN, '9')), marca, frozenset(longitudes)
+        )
+
+    # Buscar el rango de un número de tarjeta
+    def buscar(self, numero: str):
+        """
+        Devuelve el RangoBIN que contiene el prefijo del número, o None si no pertenece a ninguno.
+        """
+        prefijo = int(numero[:DIGITOS_BIN].ljust(DIGITOS_BIN, '0'))
+        i = bisect.bisect_right(self._inicios, prefijo) - 1
+        if i >= 0 and prefijo <= self._rangos[i].fin:
+            return self._rangos[i]
+        return None
+
+
+class Tarjeta_Servicio:
+    # Índice de rangos (se construye al iniciar la aplicación)
+    _indice = None
+
+    # Cargar los rangos de BIN
+    @staticmethod
+    def cargar(ruta: str = None):
+        """
+        Lee el archivo de rangos (inicio,fin,marca,longitudes; # para comentarios) y construye el índice.
+        """
+        with open(ruta or config.RANGOS_BIN_PATH, encoding='utf-8', newline='') as f:
+            filas = csv.reader(linea for linea in f if linea.strip() and not linea.startswith('#'))
+            rangos = [
+                IndiceBIN.rango(inicio.strip(), fin.strip(), marca.strip(), (int(l) for l in longitudes.split('|')))
+                for inicio, fin, marca, longitudes in filas
+            ]
+        Tarjeta_Servicio._indice = IndiceBIN(rangos)
+
+    # Obtener el índice
+    @staticmethod
+    def obtener() -> IndiceBIN:
+        """
+        Devuelve el índice, construyéndolo la primera vez si aún no se cargó.
+        """
+        if Tarjeta_Servicio._indice is None:
+            Tarjeta_Servicio.cargar()
+        return Tarjeta_Servicio._indice
+
+    # Marca de la tarjeta
+    @staticmethod
+    def marca(numero_tarjeta: str) -> str:
+        """
+        Devuelve la marca según el rango de BIN del número, o 'Desconocida'.
+        """
+        rango = Tarjeta_Servicio.obtener().buscar(numero_tarjeta)
+        return rango.marca if rango else 'Desconocida'
+
+    # Longitud válida para la marca
+    @staticmethod
+    def longitud_valida(numero_tarjeta: str) -> bool:
+        """
+        Indica si la cantidad de dígitos corresponde a la marca (las marcas desconocidas se aceptan).
+        """
+        rango = Tarjeta_Servicio.obtener().buscar(numero_tarjeta)
+        return rango is None or len(numero_tarjeta) in rango.longitudes
+
+    # Dígito verificador (algoritmo de Luhn)
+    @staticmethod
+    def luhn(numero_tarjeta: str) -> bool:
+        """
+        Verifica el dígito de control del número (solo dígitos ASCII).
+        """
+        invertido = numero_tarjeta[::-1]
+        total = sum(map(int, invertido[0::2])) + sum(map(int, invertido[1::2].translate(_DOBLE_LUHN)))
+        return total % 10 == 0
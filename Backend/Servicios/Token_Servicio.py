@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from Servicios.Archivo_Utilidades import crear_si_no_existe
+from Modelos.TokenRevocado import TokenRevocado
+
+logger = logging.getLogger(__name__)
+
+
+class TokenInvalidoError(Exception):
+    """
+    Se lanza cuando un token no tiene firma válida, expiró, es de otro tipo o fue revocado.
+    """
+
+
+# Codificación base64 URL sin relleno
+def _b64(datos: bytes) -> str:
+    return base64.urlsafe_b64encode(datos).rstrip(b'=').decode()
+
+
+def _b64_decodificar(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+
+class Token_Servicio:
+    # Secreto HMAC (se carga al iniciar)
+    _secreto = None
+
+    # Lista de revocación en memoria: identificador de sesión -> expiración
+    _revocados = {}
+
+    #================================= API PÚBLICA ================================= #
+
+    # Cargar el secreto de firma
+    @staticmethod
+    def cargar():
+        """
+        Carga el secreto desde TOKEN_SECRETO o desde el archivo de secreto (creándolo si no existe).
+        Todos los workers deben compartir el mismo secreto: si varios crean el archivo al mismo
+        tiempo, solo uno lo escribe y todos leen ese.
+        """
+        if config.TOKEN_SECRETO:
+            Token_Servicio._secreto = config.TOKEN_SECRETO.encode()
+            return
+        if not os.path.exists(config.TOKEN_SECRETO_PATH):
+            crear_si_no_existe(config.TOKEN_SECRETO_PATH, secrets.token_hex(32).encode())
+        with open(config.TOKEN_SECRETO_PATH) as f:
+            Token_Servicio._secreto = f.read().strip().encode()
+
+    # Emitir un par de tokens (acceso + refresco)
+    @staticmethod
+    def emitir(usuario: dict) -> dict:
+        """
+        Emite un token de acceso de corta duración y un token de refresco para el usuario.
+        Ambos comparten el identificador de sesión, de modo que revocar el refresco invalida el acceso.
+        """
+        ahora = int(time.time())
+        sesion = secrets.token_hex(16)
+        vigencia_acceso = config.TOKEN_ACCESO_MINUTOS * 60
+        acceso = Token_Servicio._firmar({
+            'typ': 'acceso',
+            'sub': usuario['id'],
+            'username': usuario['username'],
+            'rol_id': usuario['rol_id'],
+            'sid': sesion,
+            'exp': ahora + vigencia_acceso,
+        })
+        refresco = Token_Servicio._firmar({
+            'typ': 'refresco',
+            'sub': usuario['id'],
+            'sid': sesion,
+            'exp': ahora + config.TOKEN_REFRESCO_DIAS * 24 * 3600,
+        })
+        return {
+            'access_token': acceso,
+            'refresh_token': refresco,
+            'token_type': 'bearer',
+            'expires_in': vigencia_acceso,
+        }
+
+    # Verificar un token sin consultar la base de datos
+    @staticmethod
+    def verificar(token: str, tipo: str) -> dict:
+        """
+        Verifica firma, tipo, expiración y revocación (en memoria) y devuelve los datos del token.
+        """
+        try:
+            cuerpo, firma = token.split('.')
+            esperada = hmac.new(Token_Servicio._obtener_secreto(), cuerpo.encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(esperada, _b64_decodificar(firma)):
+                raise TokenInvalidoError('Token inválido.')
+            datos = json.loads(_b64_decodificar(cuerpo))
+        except (ValueError, TypeError):
+            raise TokenInvalidoError('Token inválido.')
+        if datos.get('typ') != tipo:
+            raise TokenInvalidoError('Tipo de token incorrecto.')
+        if datos.get('exp', 0) < time.time():
+            raise TokenInvalidoError('El token expiró.')
+        if datos.get('sid') in Token_Servicio._revocados:
+            raise TokenInvalidoError('La sesión fue cerrada.')
+        return datos
+
+    # Revocar una sesión
+    @staticmethod
+    async def revocar(db: AsyncSession, datos: dict) -> bool:
+        """
+        Registra la sesión del token como revocada hasta su expiración y confirma la transacción.
+        Devuelve False si ya estaba revocada: la sesión es la clave primaria, así que de dos refrescos
+        simultáneos con el mismo token (en este u otro worker) solo uno logra insertarla.
+        """
+        try:
+            await db.execute(insert(TokenRevocado).values(jti=datos['sid'], expira=datos['exp']))
+            await db.commit()
+            revocada = True
+        except IntegrityError:
+            await db.rollback()
+            revocada = False
+        Token_Servicio._revocados[datos['sid']] = datos['exp']
+        return revocada
+
+    # Sincronizar la lista de revocación con la base de datos
+    @staticmethod
+    async def sincronizar_revocados(db: AsyncSession):
+        """
+        Elimina las revocaciones expiradas y recarga en memoria las vigentes.
+        """
+        ahora = int(time.time())
+        await db.execute(delete(TokenRevocado).where(TokenRevocado.expira < ahora))
+        await db.commit()
+        filas = (await db.execute(select(TokenRevocado.jti, TokenRevocado.expira))).all()
+        Token_Servicio._revocados = dict(filas)
+
+    # Tarea periódica de sincronización
+    @staticmethod
+    async def tarea_sincronizacion(session_factory):
+        """
+        Sincroniza la lista de revocación cada TOKEN_REVOCADOS_SINCRONIZACION segundos.
+        Un error (base de datos bloqueada, conexión caída) se registra y se reintenta en la siguiente
+        vuelta: si la tarea terminara, este worker dejaría de ver las revocaciones de los demás.
+        """
+        while True:
+            await asyncio.sleep(config.TOKEN_REVOCADOS_SINCRONIZACION)
+            try:
+                async with session_factory() as db:
+                    await Token_Servicio.sincronizar_revocados(db)
+            except Exception:
+                logger.exception('No se pudo sincronizar la lista de tokens revocados')
+
+    #================================= UTILIDADES ================================= #
+
+    # Obtener el secreto (cargándolo si hace falta)
+    @staticmethod
+    def _obtener_secreto() -> bytes:
+        if Token_Servicio._secreto is None:
+            Token_Servicio.cargar()
+        return Token_Servicio._secreto
+
+    # Firmar los datos del token
+    @staticmethod
+    def _firmar(datos: dict) -> str:
+        """
+        Serializa los datos y les agrega la firma HMAC-SHA256: <datos>.<firma> en base64 URL.
+        """
+        cuerpo = _b64(json.dumps(datos, separators=(',', ':')).encode())
+        firma = hmac.new(Token_Servicio._obtener_secreto(), cuerpo.encode(), hashlib.sha256).digest()
+        return f'{cuerpo}.{_b64(firma)}'
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+
+import orjson
+
+import config
+from Base_de_Datos.db import AsyncSessionLocal
+from Servicios.Cola_Servicio import Cola_Servicio
+from Servicios.Metricas_Servicio import Metricas_Servicio
+from Servicios.Tareas import TAREAS
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántos segundos se eliminan los trabajos completados que superaron la retención
+INTERVALO_PURGA = 3600
+
+
+class Trabajador:
+    """
+    Trabajador de la cola persistente.
+
+    Reclama trabajos mientras tenga lugar (hasta `concurrencia` a la vez), ejecuta cada uno con un
+    límite de COLA_BLOQUEO_SEGUNDOS (así nunca sigue corriendo después de que otro trabajador pueda
+    retomarlo) y registra el resultado: completado, reintento con espera exponencial o muerto.
+    Con la cola vacía espera el aviso de un encolado en el mismo proceso o el intervalo de sondeo
+    (los encolados de otros procesos se ven en el siguiente sondeo).
+    """
+
+    def __init__(self, sesiones=None, tareas: dict = None, nombre: str = None,
+                 concurrencia: int = None, intervalo: float = None):
+        self.sesiones = sesiones or AsyncSessionLocal
+        self.tareas = TAREAS if tareas is None else tareas
+        self.nombre = nombre or f'{socket.gethostname()}:{os.getpid()}'
+        self.concurrencia = concurrencia or config.COLA_CONCURRENCIA
+        self.intervalo = intervalo or config.COLA_INTERVALO
+        self._activo = False
+        self._en_curso = set()
+
+    # Bucle principal
+    async def ejecutar(self):
+        self._activo = True
+        ultima_purga = 0.0
+        while self._activo:
+            libres = self.concurrencia - len(self._en_curso)
+            trabajos = []
+            try:
+                if libres > 0:
+                    async with self.sesiones() as db:
+                        trabajos = await Cola_Servicio.reclamar(db, self.nombre, libres)
+                if time.monotonic() - ultima_purga > INTERVALO_PURGA:
+                    async with self.sesiones() as db:
+                        await Cola_Servicio.purgar(db)
+                    ultima_purga = time.monotonic()
+            except Exception:
+                # La base de datos puede estar ocupada o caída: se reintenta en el siguiente sondeo
+                logger.exception('No se pudieron reclamar trabajos')
+
+            for trabajo in trabajos:
+                tarea = asyncio.create_task(self._procesar(trabajo))
+                self._en_curso.add(tarea)
+                tarea.add_done_callback(self._en_curso.discard)
+
+            if libres == 0:
+                # Sin lugar: esperar a que termine alguno
+                await asyncio.wait(self._en_curso, timeout=self.intervalo, return_when=asyncio.FIRST_COMPLETED)
+            elif len(trabajos) < libres:
+                # La cola quedó vacía
+                await Cola_Servicio.esperar_aviso(self.intervalo)
+
+    # Detener el trabajador
+    async def detener(self, espera: float = 10.0):
+        """
+        Deja de reclamar trabajos y espera hasta `espera` segundos a los que están en curso. Los que
+        no terminan se cancelan y quedan 'en_proceso' hasta que venza su bloqueo y otro los retome.
+        """
+        self._activo = False
+        Cola_Servicio.avisar()
+        if self._en_curso:
+            _, pendientes = await asyncio.wait(self._en_curso, timeout=espera)
+            for tarea in pendientes:
+                tarea.cancel()
+
+    # Ejecutar un trabajo y registrar el resultado
+    async def _procesar(self, trabajo):
+        inicio = time.time()
+        etiqueta = (('tipo', trabajo.tipo),)
+        Metricas_Servicio.observar('intellihome_trabajo_espera_segundos', etiqueta, max(inicio - trabajo.disponible_en, 0.0))
+        try:
+            funcion = self.tareas.get(trabajo.tipo)
+            if funcion is None:
+                raise LookupError(f'Tipo de trabajo desconocido: {trabajo.tipo}')
+            await asyncio.wait_for(funcion(**orjson.loads(trabajo.datos)), config.COLA_BLOQUEO_SEGUNDOS)
+        except Exception as e:
+            resultado = 'reintento'
+            try:
+                async with self.sesiones() as db:
+                    if await Cola_Servicio.fallar(db, trabajo, self.nombre, f'{type(e).__name__}: {e}') == 'muerto':
+                        resultado = 'muerto'
+            except Exception:
+                logger.exception('No se pudo registrar el fallo del trabajo %s', trabajo.id)
+            logger.warning('Trabajo %s (%s) falló en el intento %s: %s', trabajo.id, trabajo.tipo, trabajo.intentos, e)
+        else:
+            resultado = 'completado'
+            try:
+                async with self.sesiones() as db:
+                    await Cola_Servicio.completar(db, trabajo.id, self.nombre)
+            except Exception:
+                # Queda 'en_proceso' y se repetirá cuando venza el bloqueo
+                logger.exception('No se pudo marcar como completado el trabajo %s', trabajo.id)
+            Metricas_Servicio.observar('intellihome_trabajo_latencia_segundos', etiqueta, time.time() - trabajo.creado_en)
+        Metricas_Servicio.observar('intellihome_trabajo_segundos', etiqueta, time.time() - inicio)
+        Metricas_Servicio.incrementar('intellihome_trabajos_total', etiqueta + (('resultado', resultado),))
@@ -1,43 +1,66 @@
-from passlib.context import CryptContext
-import os
 import re
-from cryptography.fernet import Fernet
 
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy import case, insert, select, update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+import config
 from Modelos.Usuario import Usuario
-from Modelos.Hobby import Hobby
-from Modelos.TipoCasa import TipoCasa
+from Modelos.Hobby import UsuarioHobby
+from Modelos.UsuarioTipoCasa import UsuarioTipoCasa
 from Modelos.PreguntaRecuperacion import PreguntaRecuperacion
+from Servicios.Catalogos_Servicio import Catalogos_Servicio
+from Servicios.Cifrado_Servicio import Cifrado_Servicio
+from Servicios.Hash_Servicio import Hash_Servicio, ColaHashLlenaError
+from Servicios.Almacenamiento_Servicio import obtener_almacenamiento, bloques_upload, ImagenDemasiadoGrandeError
+from Servicios.Imagen_Servicio import Imagen_Servicio, ImagenDemasiadosPixelesError
+from Servicios.Obscenidad_Servicio import Obscenidad_Servicio
+from Servicios.Token_Servicio import Token_Servicio, TokenInvalidoError
+from Servicios.Intentos_Servicio import Intentos_Servicio
+from Servicios.Tarjeta_Servicio import Tarjeta_Servicio
+from Servicios.Cola_Servicio import Cola_Servicio
+from Servicios.Similitud_Servicio import Similitud_Servicio
+from Servicios.Metricas_Servicio import trace
+from Esquemas.Usuario_Esquemas import UsuarioSesion
+from Servicios.Reglas_Validacion import REGLAS_REGISTRO, convertir_fecha_iso
 
 class Usuario_Servicio:
-    # Password hashing context
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-    # Ruta para la clave de encriptación
-    KEY_PATH = os.path.join(os.getcwd(), 'clave_fernet.key')
-
-    # Diccionario de palabras obscenas
-    PALABRAS_OBSCENAS = {'sexo', 'puta', 'puto',
-                        'mierda', 'coño', 'cabron',
-                        'pendejo', 'picha', 'marica',
-                        'pinga','verga', 'maricon',
-                        'nazi', 'fuck', 'nigga', 'fucker'
-                        'perra',
-                        }
-    
     # Diccionario de extensiones permitidas para imágenes
     EXTENSIONES_PERMITIDAS = {'png', 'jpg', 'jpeg', 'gif'}
 
+    # Mensajes para los campos que deben ser únicos
+    MENSAJES_UNICIDAD = {
+        'correo': 'El correo ya está registrado.',
+        'username': 'El nombre de usuario ya está registrado.',
+        'telefono': 'El teléfono ya está registrado.',
+    }
+
+    # Columnas de una violación de unicidad en el mensaje del motor: "UNIQUE constraint failed:
+    # usuario.correo, ..." (SQLite) o el nombre del índice único ("ix_usuario_telefono")
+    PATRON_UNICIDAD = re.compile(r'UNIQUE constraint failed: ([\w., ]+)|\bix_usuario_(\w+)')
+
     # Tamaño máximo permitido para imágenes
     TAM_MAX_IMAGEN = 1 * 1024 * 1024  # 1 MB
+    MENSAJE_TAM_IMAGEN = 'La imagen excede el tamaño máximo de 1 MB.'
+    MENSAJE_PIXELES_IMAGEN = f'La imagen excede las dimensiones máximas ({config.IMAGEN_MAX_PIXELES} píxeles).'
+
+    # Proyecciones de las rutas de autenticación: cada una lee solo las columnas que usa
+    # Datos de la sesión (campos de UsuarioSesion)
+    CONSULTA_SESION = select(*(getattr(Usuario, campo) for campo in UsuarioSesion.model_fields))
+    # Login: datos de la sesión + hash de la contraseña + intentos guardados
+    CONSULTA_LOGIN = CONSULTA_SESION.add_columns(Usuario.contrasena, Usuario.intentos_fallidos)
+    # Recuperación: la pregunta del usuario en una sola consulta (JOIN)
+    CONSULTA_PREGUNTA = select(PreguntaRecuperacion.id, PreguntaRecuperacion.texto) \
+        .join(Usuario, Usuario.pregunta_recuperacion_id == PreguntaRecuperacion.id)
+    # Restablecimiento: solo la respuesta a comparar
+    CONSULTA_RESTABLECER = select(Usuario.id, Usuario.respuesta_recuperacion)
 
     #================================= Lógica Endpoints ================================= #
 
     # Registro de usuario
     @staticmethod
-    def registrar_usuario(
-        db: Session,
+    async def registrar_usuario(
+        db: AsyncSession,
         nombre: str,
         apellidos: str,
         username: str,
@@ -60,27 +83,32 @@ class Usuario_Servicio:
         errores = {}
         usuario = None
         try:
-            Usuario_Servicio._validar_unicidad(db, correo, username, telefono, errores)
-            Usuario_Servicio._validar_contrasena_registro(contrasena, errores)
-            Usuario_Servicio._validar_nombres_obscenos(nombre, apellidos, username, errores)
-            Usuario_Servicio._validar_telefono(telefono, errores)
-            hobbies = Usuario_Servicio._validar_hobbies(db, hobbies_ids, errores)
-            tipos_casa = Usuario_Servicio._validar_tipos_casa(db, tipos_casa_ids, errores)
-            Usuario_Servicio._validar_pregunta_recuperacion(db, pregunta_recuperacion_id, errores)
-            Usuario_Servicio._validar_respuesta_recuperacion(respuesta_recuperacion, errores)
-            Usuario_Servicio._validar_imagen(imagen_perfil, errores)
-            fecha_nacimiento_date = Usuario_Servicio._validar_fecha_nacimiento(fecha_nacimiento, errores)
-            Usuario_Servicio._validar_tarjeta(numero_tarjeta, fecha_expiracion, nombre_titular, errores)
-
-            # Calcular marca y últimos 4 dígitos
-            marca, ultimos_4 = Usuario_Servicio._calcular_marca_y_ultimos4(numero_tarjeta)
+            with trace('registro_validaciones'):
+                await Usuario_Servicio._validar_unicidad(db, correo, username, telefono, errores)
+                Usuario_Servicio._validar_contrasena_registro(contrasena, errores)
+                Usuario_Servicio._validar_nombres_obscenos(nombre, apellidos, username, errores)
+                Usuario_Servicio._validar_telefono(telefono, errores)
+                hobbies = await Usuario_Servicio._validar_hobbies(db, hobbies_ids, errores)
+                tipos_casa = await Usuario_Servicio._validar_tipos_casa(db, tipos_casa_ids, errores)
+                await Usuario_Servicio._validar_pregunta_recuperacion(db, pregunta_recuperacion_id, errores)
+                Usuario_Servicio._validar_respuesta_recuperacion(respuesta_recuperacion, errores)
+                formato_imagen = Usuario_Servicio._validar_imagen(imagen_perfil, errores)
+                fecha_nacimiento_date = Usuario_Servicio._validar_fecha_nacimiento(fecha_nacimiento, errores)
+                Usuario_Servicio._validar_tarjeta(numero_tarjeta, fecha_expiracion, nombre_titular, errores)
 
             if errores:
                 return {'errores': errores}
 
-            imagen_path = Usuario_Servicio._guardar_imagen(imagen_perfil)
+            # Calcular marca y últimos 4 dígitos (el número ya es válido)
+            marca, ultimos_4 = Usuario_Servicio._calcular_marca_y_ultimos4(numero_tarjeta)
+
+            with trace('guardar_imagen'):
+                imagen_path = await Usuario_Servicio._guardar_imagen(imagen_perfil, formato_imagen, errores)
+            if errores:
+                return {'errores': errores}
             rol_id = 2
-            hashed_password = Usuario_Servicio.pwd_context.hash(contrasena)
+            with trace('bcrypt_hash'):
+                hashed_password = await Hash_Servicio.hash(contrasena)
             # Encriptar el número de tarjeta antes de guardarlo
             numero_encriptado = Usuario_Servicio._encriptar_tarjeta(numero_tarjeta) if numero_tarjeta else None
             usuario = Usuario(
@@ -94,8 +122,6 @@ class Usuario_Servicio:
                 domicilio=domicilio,
                 contrasena=hashed_password,
                 rol_id=rol_id,
-                hobbies=hobbies,
-                tipos_casa=tipos_casa,
                 pregunta_recuperacion_id=pregunta_recuperacion_id,
                 respuesta_recuperacion=respuesta_recuperacion,
                 permitir_huella=permitir_huella,
@@ -106,18 +132,34 @@ class Usuario_Servicio:
                 ultimos_4=ultimos_4,
                 token_publico=token_publico
             )
-            db.add(usuario)
-            db.commit()
+            with trace('registro_insert'):
+                db.add(usuario)
+                await db.flush()
+                # Asociaciones con hobbies y tipos de casa (IDs ya validados contra el catálogo)
+                db.add_all([UsuarioHobby(usuario_id=usuario.id, hobby_id=h) for h in hobbies])
+                db.add_all([UsuarioTipoCasa(usuario_id=usuario.id, tipo_casa_id=t) for t in tipos_casa])
+                # Las miniaturas las genera el trabajador de la cola; el trabajo se guarda en el mismo commit
+                Usuario_Servicio.encolar(db, 'miniaturas', clave_original=imagen_path)
+                await db.commit()
+            Similitud_Servicio.agregar(usuario.id, hobbies, tipos_casa)
             return {'mensaje': 'Usuario registrado exitosamente'}
+        except IntegrityError as e:
+            # Otro registro con los mismos datos se insertó entre la validación y el commit
+            await db.rollback()
+            return {'errores': Usuario_Servicio._errores_integridad(e)}
+        except ColaHashLlenaError:
+            # Se propaga para que la aplicación responda 503
+            await db.rollback()
+            raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             return {'errores': {'internal': f'Error interno: {str(e)}'}}
         finally:
-            db.close()
+            await db.close()
     
     # Login de usuario
     @staticmethod
-    def login_usuario(db: Session, identificador: str, contrasena: str):
+    async def login_usuario(db: AsyncSession, identificador: str, contrasena: str):
         """
         Permite iniciar sesión usando nombre de usuario, correo o teléfono y contraseña.
         """
@@ -126,7 +168,10 @@ class Usuario_Servicio:
 
         try:
             # Buscar usuario por nombre de usuario, correo o teléfono
-            usuario = Usuario_Servicio._validar_identificador(db, identificador, errores)
+            with trace('buscar_identificador'):
+                usuario = await Usuario_Servicio._validar_identificador(
+                    db, identificador, errores, Usuario_Servicio.CONSULTA_LOGIN
+                )
             
             if errores:
                 return {'errores': errores}
@@ -136,43 +181,64 @@ class Usuario_Servicio:
                 errores['cuenta'] = 'La cuenta está bloqueada. Contacte al administrador.'
                 return {'errores': errores}
             
-            validacion_contrasena = Usuario_Servicio._validar_contrasena_login(contrasena, usuario.contrasena)
+            with trace('bcrypt_verify'):
+                validacion_contrasena = await Usuario_Servicio._validar_contrasena_login(contrasena, usuario.contrasena)
 
             # validar si la contraseña es correcta
             if not validacion_contrasena:
-                # Incrementar intentos fallidos
-                usuario.intentos_fallidos += 1
-                # Bloquear cuenta si supera 3 intentos
-                if usuario.intentos_fallidos >= 3:
-                    usuario.estado_cuenta = 'bloqueado'
-                db.commit()
+                if Intentos_Servicio.exacto():
+                    # Los fallos se cuentan fuera de la base de datos (sumando los que ya estaban guardados)
+                    intentos = usuario.intentos_fallidos + await Intentos_Servicio.registrar_fallo(usuario.id)
+                    # Solo se escribe al alcanzar el límite: se bloquea la cuenta
+                    if intentos >= config.INTENTOS_MAX:
+                        with trace('bloqueo_commit'):
+                            await db.execute(
+                                update(Usuario).where(Usuario.id == usuario.id)
+                                .values(intentos_fallidos=intentos, estado_cuenta='bloqueado')
+                            )
+                            await db.commit()
+                        await Intentos_Servicio.reiniciar(usuario.id)
+                else:
+                    # Varios workers sin almacén compartido: la base de datos es el contador. El incremento
+                    # y el bloqueo son una sola sentencia, así que los fallos de todos los workers suman
+                    with trace('fallo_commit'):
+                        await db.execute(
+                            update(Usuario).where(Usuario.id == usuario.id).values(
+                                intentos_fallidos=Usuario.intentos_fallidos + 1,
+                                estado_cuenta=case(
+                                    (Usuario.intentos_fallidos + 1 >= config.INTENTOS_MAX, 'bloqueado'),
+                                    else_=Usuario.estado_cuenta,
+                                ),
+                            )
+                        )
+                        await db.commit()
                 errores['contrasena'] = 'Contraseña incorrecta.'
 
                 return {'errores': errores}
             
-            # Resetear intentos fallidos si login exitoso
-            usuario.intentos_fallidos = 0
-            db.commit()
-            # Puedes retornar solo los datos necesarios
-            return {
-                "id": usuario.id,
-                "username": usuario.username,
-                "correo": usuario.correo,
-                "telefono": usuario.telefono,
-                "nombre": usuario.nombre,
-                "apellidos": usuario.apellidos,
-                "rol_id": usuario.rol_id,
-                "estado_cuenta": usuario.estado_cuenta
-            }
+            # Resetear intentos fallidos si login exitoso (sin escribir si ya estaban en 0)
+            await Intentos_Servicio.reiniciar(usuario.id)
+            if usuario.intentos_fallidos:
+                await db.execute(update(Usuario).where(Usuario.id == usuario.id).values(intentos_fallidos=0))
+                await db.commit()
+            datos = Usuario_Servicio._datos_sesion(usuario)
+            # Tokens de sesión para no tener que reenviar la contraseña
+            with trace('emitir_tokens'):
+                tokens = Token_Servicio.emitir(datos)
+            return {**datos, **tokens}
+        except ColaHashLlenaError:
+            # Se propaga para que la aplicación responda 503
+            await db.rollback()
+            raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             return {'errores': {'internal': f'Error interno: {str(e)}'}}
         finally:
-            db.close()
+            await db.close()
 
     # Obtención de la pregunta de recuperación de contraseña
     @staticmethod
-    def obtener_pregunta_recuperacion(db: Session, identificador: str):
+    async def obtener_pregunta_recuperacion(db: AsyncSession, identificador: str):
         """
         Permite obtener la pregunta de recuperación de contraseña usando nombre de usuario, correo o teléfono.
         """
@@ -180,14 +246,13 @@ class Usuario_Servicio:
         usuario = None
 
         try:
-            # Buscar usuario por nombre de usuario, correo o teléfono
-            usuario = Usuario_Servicio._validar_identificador(db, identificador, errores)
+            # Buscar la pregunta de recuperación del usuario (nombre de usuario, correo o teléfono)
+            PreguntaRecuperacion_inf = await Usuario_Servicio._validar_identificador(
+                db, identificador, errores, Usuario_Servicio.CONSULTA_PREGUNTA
+            )
             
             if errores:
                 return {'errores': errores}
-
-            #Se obtiene la información de la pregunta de recuperación asociada al usuario
-            PreguntaRecuperacion_inf = db.query(PreguntaRecuperacion).filter_by(id=usuario.pregunta_recuperacion_id).first()
             
             return {
                 "identificador": identificador,
@@ -195,14 +260,14 @@ class Usuario_Servicio:
                 "pregunta": PreguntaRecuperacion_inf.texto
             }
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             return {'errores': {'internal': f'Error interno: {str(e)}'}}
         finally:
-            db.close()
+            await db.close()
 
     # Restablecimiento de contraseña
     @staticmethod
-    def restablecer_contrasena(db: Session, identificador: str, nueva_contrasena: str, respuesta_recuperacion: str):
+    async def restablecer_contrasena(db: AsyncSession, identificador: str, nueva_contrasena: str, respuesta_recuperacion: str):
         """
         Permite restablecer la contraseña si la respuesta de recuperación es correcta.
         """
@@ -212,7 +277,9 @@ class Usuario_Servicio:
 
         try:
             # Buscar usuario por nombre de usuario, correo o teléfono
-            usuario = Usuario_Servicio._validar_identificador(db, identificador, errores)
+            usuario = await Usuario_Servicio._validar_identificador(
+                db, identificador, errores, Usuario_Servicio.CONSULTA_RESTABLECER
+            )
             
             if errores:
                 return {'errores': errores}
@@ -228,36 +295,249 @@ class Usuario_Servicio:
                 return {'errores': errores}
             
             # Se encripta la nueva contraseña y se actualiza
-            hashed_password = Usuario_Servicio.pwd_context.hash(nueva_contrasena)
-            usuario.contrasena = hashed_password
-
-            # Resetear intentos fallidos y estado de cuenta
-            usuario.intentos_fallidos = 0
-            usuario.estado_cuenta = 'activo'
+            with trace('bcrypt_hash'):
+                hashed_password = await Hash_Servicio.hash(nueva_contrasena)
 
-            db.commit()
+            # Se actualiza la contraseña y se resetean los intentos fallidos y el estado de cuenta
+            await db.execute(
+                update(Usuario).where(Usuario.id == usuario.id)
+                .values(contrasena=hashed_password, intentos_fallidos=0, estado_cuenta='activo')
+            )
+            await db.commit()
+            await Intentos_Servicio.reiniciar(usuario.id)
             return {'mensaje': 'Contraseña restablecida exitosamente'}
         
+        except ColaHashLlenaError:
+            # Se propaga para que la aplicación responda 503
+            await db.rollback()
+            raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             return {'errores': {'internal': f'Error interno: {str(e)}'}}
         finally:
-            db.close()
+            await db.close()
 
-    #================================= VALIDACIONES ================================= #
+    # Refresco de la sesión
+    @staticmethod
+    async def refrescar_sesion(db: AsyncSession, refresh_token: str):
+        """
+        Emite un nuevo par de tokens a partir de un token de refresco válido y revoca el anterior (rotación).
+        Los tokens nuevos solo se emiten si este refresco fue el que revocó la sesión: un token de
+        refresco ya usado (o usado dos veces a la vez) se rechaza.
+        """
+        errores = {}
+        try:
+            datos_token = Token_Servicio.verificar(refresh_token, 'refresco')
+            usuario = (await db.execute(
+                select(Usuario.id, Usuario.username, Usuario.rol_id, Usuario.estado_cuenta).filter_by(id=datos_token['sub'])
+            )).first()
+            if not usuario:
+                errores['token'] = 'El usuario del token no existe.'
+                return {'errores': errores}
+            if usuario.estado_cuenta == 'bloqueado':
+                errores['cuenta'] = 'La cuenta está bloqueada. Contacte al administrador.'
+                return {'errores': errores}
+            if not await Token_Servicio.revocar(db, datos_token):
+                errores['token'] = 'La sesión fue cerrada.'
+                return {'errores': errores}
+            return Token_Servicio.emitir(usuario._asdict())
+        except TokenInvalidoError as e:
+            errores['token'] = str(e)
+            return {'errores': errores}
+        except Exception as e:
+            await db.rollback()
+            return {'errores': {'internal': f'Error interno: {str(e)}'}}
+        finally:
+            await db.close()
 
-    # Validación de unicidad de correo y username
+    # Cierre de sesión
+    @staticmethod
+    async def cerrar_sesion(db: AsyncSession, refresh_token: str):
+        """
+        Revoca la sesión del token de refresco (y con ella los tokens de acceso emitidos junto a él).
+        """
+        try:
+            datos_token = Token_Servicio.verificar(refresh_token, 'refresco')
+            # Si ya estaba cerrada (otro cierre o un refresco) el resultado es el mismo
+            await Token_Servicio.revocar(db, datos_token)
+            return {'mensaje': 'Sesión cerrada exitosamente'}
+        except TokenInvalidoError as e:
+            return {'errores': {'token': str(e)}}
+        except Exception as e:
+            await db.rollback()
+            return {'errores': {'internal': f'Error interno: {str(e)}'}}
+        finally:
+            await db.close()
+
+    # Validación de campos del formulario de registro
+    @staticmethod
+    def validar_campos(campos: dict):
+        """
+        Valida los campos recibidos con las reglas del registro que no dependen de la base de datos
+        (la unicidad y los catálogos se comprueban al registrar). Los campos sin reglas se ignoran.
+        """
+        errores = REGLAS_REGISTRO.validar(campos)
+        return {'valido': not errores, 'errores': errores}
+
+    # Obtención de la imagen de perfil (miniatura)
+    @staticmethod
+    async def obtener_imagen(db: AsyncSession, usuario_id: int, tamano: int = None):
+        """
+        Devuelve la clave de almacenamiento de la miniatura del tamaño pedido (generándola si aún no
+        existe), o de la más grande si no se pide tamaño. El original subido no se sirve nunca: conserva
+        los metadatos EXIF (ubicación GPS incluida) y las miniaturas se recodifican sin ellos.
+        """
+        errores = {}
+        try:
+            clave = await db.scalar(select(Usuario.imagen_perfil).filter_by(id=usuario_id))
+            if not clave:
+                errores['usuario'] = 'No existe el usuario o no tiene imagen de perfil.'
+                return {'errores': errores}
+            if tamano is None:
+                tamano = max(config.TAMANOS_MINIATURA)
+            if tamano not in config.TAMANOS_MINIATURA:
+                errores['size'] = f'Tamaño no disponible. Permitidos: {", ".join(map(str, config.TAMANOS_MINIATURA))}.'
+                return {'errores': errores}
+            clave_miniatura = Imagen_Servicio.clave_miniatura(clave, tamano)
+            if not await obtener_almacenamiento().existe(clave_miniatura):
+                await Imagen_Servicio.generar_miniaturas(clave, [tamano])
+            return {'clave': clave_miniatura}
+        except Exception as e:
+            return {'errores': {'internal': f'Error interno: {str(e)}'}}
+        finally:
+            await db.close()
+
+    # Encolar un trabajo para el trabajador de la cola
     @staticmethod
-    def _validar_unicidad(db, correo, username, telefono, errores):
+    def encolar(db: AsyncSession, tipo: str, **datos):
         """
-        Verifica que el correo y el nombre de usuario sean únicos en la base de datos.
+        El trabajo (un tipo de Servicios/Tareas.py) se guarda con el commit de la transacción en curso:
+        si el registro se confirma, el trabajo también; si se revierte, el trabajo se descarta.
         """
-        if db.query(Usuario).filter_by(correo=correo).first():
-            errores['correo'] = 'El correo ya está registrado.'
-        if db.query(Usuario).filter_by(username=username).first():
-            errores['username'] = 'El nombre de usuario ya está registrado.'
-        if db.query(Usuario).filter_by(telefono=telefono).first():
-            errores['telefono'] = 'El teléfono ya está registrado.'
+        return Cola_Servicio.encolar(db, tipo, datos)
+
+    #================================= IMPORTACIÓN MASIVA ================================= #
+
+    # Registro de un lote de usuarios
+    @staticmethod
+    async def registrar_lote(db: AsyncSession, registros: list) -> list:
+        """
+        Registra un lote de usuarios con las mismas validaciones que registrar_usuario.
+        Las contraseñas se hashean en paralelo en el pool y los usuarios válidos se insertan
+        con una sola sentencia (executemany) y un solo commit. Las imágenes de los registros que la
+        base de datos rechaza se eliminan si ningún usuario las usa.
+        Devuelve un diccionario de errores por registro (vacío si el registro se insertó).
+        """
+        if not registros:
+            return []
+        errores_lote, valores_lote = await Usuario_Servicio.validar_lote(db, registros)
+
+        # Guardar las imágenes de los registros válidos
+        for registro, errores, valores in zip(registros, errores_lote, valores_lote):
+            if not errores:
+                valores['imagen_perfil'] = await Usuario_Servicio._guardar_imagen(
+                    registro['imagen_perfil'], valores['formato_imagen'], errores
+                )
+
+        validos = [i for i, errores in enumerate(errores_lote) if not errores]
+        hashes = await Hash_Servicio.hash_lote([registros[i]['contrasena'] for i in validos])
+        filas = [
+            Usuario_Servicio._fila_usuario(registros[i], valores_lote[i], hashed_password)
+            for i, hashed_password in zip(validos, hashes)
+        ]
+
+        try:
+            await Usuario_Servicio._insertar_usuarios(db, filas, [valores_lote[i] for i in validos])
+            await db.commit()
+        except IntegrityError:
+            # Algún registro choca con otro insertado después de la validación: se reintenta uno por uno
+            await db.rollback()
+            for i, fila in zip(validos, filas):
+                try:
+                    async with db.begin_nested():
+                        await Usuario_Servicio._insertar_usuarios(db, [fila], [valores_lote[i]])
+                except IntegrityError as e:
+                    errores_lote[i] = Usuario_Servicio._errores_integridad(e)
+            await db.commit()
+            await Usuario_Servicio._descartar_imagenes(
+                db, {valores_lote[i]['imagen_perfil'] for i in validos if errores_lote[i]}
+            )
+        return errores_lote
+
+    # Validación de un lote de registros
+    @staticmethod
+    async def validar_lote(db: AsyncSession, registros: list):
+        """
+        Aplica a cada registro los validadores del registro de usuario. La unicidad se comprueba
+        con una sola consulta para todo el lote (también entre registros del mismo lote).
+        Devuelve (errores por registro, valores normalizados por registro).
+        """
+        errores_lote = [{} for _ in registros]
+        valores_lote = []
+        await Usuario_Servicio._validar_unicidad_lote(db, registros, errores_lote)
+        for registro, errores in zip(registros, errores_lote):
+            Usuario_Servicio._validar_contrasena_registro(registro['contrasena'], errores)
+            Usuario_Servicio._validar_nombres_obscenos(registro['nombre'], registro['apellidos'], registro['username'], errores)
+            Usuario_Servicio._validar_telefono(registro['telefono'], errores)
+            hobbies = await Usuario_Servicio._validar_hobbies(db, registro['hobbies_ids'], errores)
+            tipos_casa = await Usuario_Servicio._validar_tipos_casa(db, registro['tipos_casa_ids'], errores)
+            await Usuario_Servicio._validar_pregunta_recuperacion(db, registro['pregunta_recuperacion_id'], errores)
+            Usuario_Servicio._validar_respuesta_recuperacion(registro['respuesta_recuperacion'], errores)
+            formato_imagen = Usuario_Servicio._validar_imagen(registro['imagen_perfil'], errores)
+            fecha_nacimiento_date = Usuario_Servicio._validar_fecha_nacimiento(registro['fecha_nacimiento'], errores)
+            Usuario_Servicio._validar_tarjeta(registro['numero_tarjeta'], registro['fecha_expiracion'], registro['nombre_titular'], errores)
+            valores_lote.append({
+                'hobbies': hobbies,
+                'tipos_casa': tipos_casa,
+                'formato_imagen': formato_imagen,
+                'fecha_nacimiento': fecha_nacimiento_date,
+            })
+        return errores_lote, valores_lote
+
+    #================================= VALIDACIONES ================================= #
+
+    # Validación de unicidad de correo y username
+    @staticmethod
+    async def _validar_unicidad(db, correo, username, telefono, errores):
+        """
+        Verifica que el correo, el nombre de usuario y el teléfono sean únicos con una sola consulta.
+        La restricción UNIQUE de la base de datos cubre los registros concurrentes.
+        """
+        valores = {'correo': correo, 'username': username, 'telefono': telefono}
+        filas = (await db.execute(
+            select(Usuario.correo, Usuario.username, Usuario.telefono).where(or_(
+                Usuario.correo == correo,
+                Usuario.username == username,
+                Usuario.telefono == telefono,
+            ))
+        )).all()
+        for fila in filas:
+            for campo, valor in valores.items():
+                if getattr(fila, campo) == valor:
+                    errores[campo] = Usuario_Servicio.MENSAJES_UNICIDAD[campo]
+
+    # Validación de unicidad de un lote
+    @staticmethod
+    async def _validar_unicidad_lote(db, registros, errores_lote):
+        """
+        Verifica la unicidad de correo, username y teléfono de todo el lote con una sola consulta.
+        Un valor repetido dentro del lote se reporta en los registros posteriores al primero.
+        """
+        campos = ('correo', 'username', 'telefono')
+        valores = {campo: {r[campo] for r in registros} for campo in campos}
+        filas = (await db.execute(
+            select(Usuario.correo, Usuario.username, Usuario.telefono).where(or_(
+                Usuario.correo.in_(valores['correo']),
+                Usuario.username.in_(valores['username']),
+                Usuario.telefono.in_(valores['telefono']),
+            ))
+        )).all()
+        ocupados = {campo: {getattr(fila, campo) for fila in filas} for campo in campos}
+        for registro, errores in zip(registros, errores_lote):
+            for campo in campos:
+                if registro[campo] in ocupados[campo]:
+                    errores[campo] = Usuario_Servicio.MENSAJES_UNICIDAD[campo]
+                ocupados[campo].add(registro[campo])
 
     # Validación de contraseña (registro)
     @staticmethod
@@ -265,55 +545,51 @@ class Usuario_Servicio:
         """
         Verifica que la contraseña cumpla con los requisitos mínimos.
         """
-        if len(contrasena) < 8 or not re.search(r'[A-Za-z]', contrasena) or not re.search(r'\d', contrasena):
-            errores['contrasena'] = 'La contraseña debe tener al menos 8 caracteres y ser alfanumérica.'
+        REGLAS_REGISTRO.validar({'contrasena': contrasena}, errores)
 
     # Validación de nombres obscenos
     @staticmethod
     def _validar_nombres_obscenos(nombre, apellidos, username, errores):
         """
         Verifica que el nombre, apellidos y username no contengan palabras obscenas.
+        Los tres campos se revisan en una sola pasada del filtro compilado.
         """
-        for campo, valor in [('nombre', nombre), ('apellidos', apellidos), ('username', username)]:
-            if any(pal in valor.lower() for pal in Usuario_Servicio.PALABRAS_OBSCENAS):
-                errores[campo] = 'El valor contiene palabras no permitidas.'
+        campos = {'nombre': nombre, 'apellidos': apellidos, 'username': username}
+        for campo in Obscenidad_Servicio.obtener().campos_con_coincidencias(campos):
+            errores[campo] = 'El valor contiene palabras no permitidas.'
 
     # Validación de hobbies
     @staticmethod
-    def _validar_hobbies(db, hobbies_ids, errores):
+    async def _validar_hobbies(db, hobbies_ids, errores):
         """
-        Verifica que los hobbies proporcionados existan en la base de datos.
+        Verifica que los hobbies proporcionados existan en el catálogo y devuelve sus IDs sin repetir.
         """
-        hobbies = []
-        if hobbies_ids:
-            hobbies = db.query(Hobby).filter(Hobby.id.in_(hobbies_ids)).all()
-            if len(hobbies) != len(hobbies_ids):
-                errores['hobbies'] = 'Uno o más hobbies no existen.'
+        hobbies = list(dict.fromkeys(hobbies_ids or []))
+        if hobbies and not set(hobbies) <= await Catalogos_Servicio.ids(db, 'hobbies'):
+            errores['hobbies'] = 'Uno o más hobbies no existen.'
         return hobbies
 
     # Validación de tipos de casa
     @staticmethod
-    def _validar_tipos_casa(db, tipos_casa_ids, errores):
+    async def _validar_tipos_casa(db, tipos_casa_ids, errores):
         """
-        Verifica que los tipos de casa proporcionados existan en la base de datos.
+        Verifica que los tipos de casa proporcionados existan en el catálogo y devuelve sus IDs sin repetir.
         """
-        tipos_casa = []
-        if tipos_casa_ids:
-            tipos_casa = db.query(TipoCasa).filter(TipoCasa.id.in_(tipos_casa_ids)).all()
-            if len(tipos_casa) != len(tipos_casa_ids):
-                errores['tipos_casa'] = 'Uno o más tipos de casa no existen.'
+        tipos_casa = list(dict.fromkeys(tipos_casa_ids or []))
+        if tipos_casa and not set(tipos_casa) <= await Catalogos_Servicio.ids(db, 'tipos_casa'):
+            errores['tipos_casa'] = 'Uno o más tipos de casa no existen.'
         return tipos_casa
 
     # Validación de pregunta de recuperación
     @staticmethod
-    def _validar_pregunta_recuperacion(db, pregunta_recuperacion_id, errores):
+    async def _validar_pregunta_recuperacion(db, pregunta_recuperacion_id, errores):
         """
-        Determina si la pregunta de recuperación existe en la base de datos.
+        Determina si la pregunta de recuperación existe en el catálogo.
         """
-        pregunta = db.query(PreguntaRecuperacion).filter_by(id=pregunta_recuperacion_id).first()
-        if not pregunta:
+        existe = pregunta_recuperacion_id in await Catalogos_Servicio.ids(db, 'preguntas_recuperacion')
+        if not existe:
             errores['pregunta_recuperacion'] = 'La pregunta de recuperación no existe.'
-        return pregunta
+        return existe
 
     # Validación de respuesta de recuperación
     @staticmethod
@@ -321,29 +597,35 @@ class Usuario_Servicio:
         """
         Verifica que la respuesta de recuperación no esté vacía.
         """
-        if not respuesta_recuperacion:
-            errores['respuesta_recuperacion'] = 'La respuesta de recuperación es obligatoria.'
+        REGLAS_REGISTRO.validar({'respuesta_recuperacion': respuesta_recuperacion}, errores)
 
     # Validación de imagen de perfil
     @staticmethod
     def _validar_imagen(imagen_perfil, errores):
         """
         Verifica que la imagen de perfil cumpla con los requisitos de formato y tamaño.
+        El formato se determina por el contenido (magic bytes) y no solo por la extensión, y las
+        dimensiones por la cabecera, antes de que se decodifique ningún píxel.
+        Devuelve el formato detectado.
         """
-        imagen_path = None
         if not imagen_perfil:
             errores['imagen_perfil'] = 'La imagen de perfil es obligatoria.'
-            return imagen_path
+            return None
         filename = imagen_perfil.filename
         ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
-        if ext not in Usuario_Servicio.EXTENSIONES_PERMITIDAS:
-            errores['imagen_perfil'] = 'Formato de imagen inválido. Permitidos: PNG, JPG, JPEG, GIF.'
-        imagen_perfil.file.seek(0, os.SEEK_END)
-        size = imagen_perfil.file.tell()
+        cabecera = imagen_perfil.file.read(Imagen_Servicio.TAM_CABECERA)
         imagen_perfil.file.seek(0)
-        if size > Usuario_Servicio.TAM_MAX_IMAGEN:
-            errores['imagen_perfil'] = 'La imagen excede el tamaño máximo de 1 MB.'
-        return imagen_path
+        formato = Imagen_Servicio.detectar_formato(cabecera)
+        try:
+            if (ext not in Usuario_Servicio.EXTENSIONES_PERMITIDAS or formato is None
+                    or not Imagen_Servicio.comprobar_dimensiones(imagen_perfil.file)):
+                errores['imagen_perfil'] = 'Formato de imagen inválido. Permitidos: PNG, JPG, JPEG, GIF.'
+        except ImagenDemasiadosPixelesError:
+            errores['imagen_perfil'] = Usuario_Servicio.MENSAJE_PIXELES_IMAGEN
+        # Si el tamaño ya se conoce se rechaza de inmediato; si no, se controla al guardar
+        if imagen_perfil.size is not None and imagen_perfil.size > Usuario_Servicio.TAM_MAX_IMAGEN:
+            errores['imagen_perfil'] = Usuario_Servicio.MENSAJE_TAM_IMAGEN
+        return formato
     
     # Validación de teléfono (registro)
     @staticmethod
@@ -351,24 +633,18 @@ class Usuario_Servicio:
         """
         Verifica que el teléfono contenga solo caracteres numéricos.
         """
-        if telefono is None or not str(telefono).isdigit():
-            errores['telefono'] = 'El teléfono debe contener solo caracteres numéricos.'
+        REGLAS_REGISTRO.validar({'telefono': telefono}, errores)
 
     
     # Validación de fecha de nacimiento
     @staticmethod
     def _validar_fecha_nacimiento(fecha_nacimiento, errores):
         """
-        Verifica que la fecha de nacimiento tenga el formato correcto YYYY-MM-DD.
+        Verifica que la fecha de nacimiento venga y tenga el formato YYYY-MM-DD, y la devuelve como date.
         """
-        from datetime import datetime
-        fecha_nacimiento_date = None
-        if fecha_nacimiento:
-            try:
-                fecha_nacimiento_date = datetime.strptime(fecha_nacimiento, '%Y-%m-%d').date()
-            except Exception:
-                errores['fecha_nacimiento'] = 'El formato de la fecha debe ser YYYY-MM-DD.'
-        return fecha_nacimiento_date
+        if 'fecha_nacimiento' in REGLAS_REGISTRO.validar({'fecha_nacimiento': fecha_nacimiento}, errores):
+            return None
+        return convertir_fecha_iso(fecha_nacimiento)
 
     # Validación de tarjeta de crédito
     @staticmethod
@@ -376,148 +652,214 @@ class Usuario_Servicio:
         """
         Determina si los datos de la tarjeta de crédito son válidos.
         """
-        # Validar nombre del titular
-        if not nombre_titular or not nombre_titular.strip():
-            errores['nombre_titular'] = 'El nombre del titular es obligatorio.'
-        # Validar número de tarjeta (debe ser 16 dígitos numéricos)
-        if not numero_tarjeta or not numero_tarjeta.isdigit() or len(numero_tarjeta) != 16:
-            errores['numero_tarjeta'] = 'El número de tarjeta debe tener 16 dígitos numéricos.'
-        # Validar fecha de expiración (formato MM/YYYY y fecha futura)
-        import re, datetime
-        if not fecha_expiracion or not re.match(r'^(0[1-9]|1[0-2])/\d{4}$', fecha_expiracion):
-            errores['fecha_expiracion'] = 'La fecha de expiración debe tener formato MM/YYYY.'
-        else:
-            mes, anio = fecha_expiracion.split('/')
-            try:
-                exp_date = datetime.date(int(anio), int(mes), 1)
-                today = datetime.date.today().replace(day=1)
-                if exp_date < today:
-                    errores['fecha_expiracion'] = 'La fecha de expiración debe ser futura.'
-            except Exception:
-                errores['fecha_expiracion'] = 'La fecha de expiración no es válida.'
-    
+        REGLAS_REGISTRO.validar({
+            'nombre_titular': nombre_titular,
+            'numero_tarjeta': numero_tarjeta,
+            'fecha_expiracion': fecha_expiracion,
+        }, errores)
+
     #validación de identificador (correo, telefono o nombre de usuario)  (login)
     @staticmethod
-    def _validar_identificador(db, identificador, errores):
+    async def _validar_identificador(db, identificador, errores, consulta):
         """
-        Verifica si el identificador (correo, teléfono o nombre de usuario) existe en la base de datos de usuarios.
+        Verifica si el identificador (correo, teléfono o nombre de usuario) existe en la base de datos de usuarios
+        y devuelve la fila de la consulta de proyección indicada (solo las columnas que usa cada endpoint).
         Si no existe, agrega un error en el diccionario de errores.
         """
-        usuario = db.query(Usuario).filter(
-            (Usuario.username == identificador) |
-            (Usuario.correo == identificador) |
-            (Usuario.telefono == identificador)
-        ).first()
+        # Cada consulta filtra por una sola columna indexada
+        campo = Usuario_Servicio._clasificar_identificador(identificador)
+        usuario = (await db.execute(consulta.where(getattr(Usuario, campo) == identificador).limit(1))).first()
+        # Un nombre de usuario también puede contener '@' o ser numérico
+        if not usuario and campo != 'username':
+            usuario = (await db.execute(consulta.where(Usuario.username == identificador).limit(1))).first()
         if not usuario:
             errores['identificador'] = 'El identificador (correo, teléfono o nombre de usuario) no está asociado a ningún usuario.'
         return usuario
 
+    # Clasificación del identificador (login)
+    @staticmethod
+    def _clasificar_identificador(identificador):
+        """
+        Determina a qué columna corresponde el identificador: correo si contiene '@',
+        teléfono si es numérico y nombre de usuario en cualquier otro caso.
+        """
+        if '@' in identificador:
+            return 'correo'
+        if identificador.isdigit():
+            return 'telefono'
+        return 'username'
+
     # Validación de contraseña
     @staticmethod
-    def _validar_contrasena_login(contrasena_plana: str, contrasena_hash: str) -> bool:
+    async def _validar_contrasena_login(contrasena_plana: str, contrasena_hash: str) -> bool:
         """
         Verifica si la contraseña plana coincide con el hash almacenado.
         """
 
-        # Se encripta la contraseña plana y se compara con el hash almacenado        
-        validacion = Usuario_Servicio.pwd_context.verify(contrasena_plana, contrasena_hash)
+        # Se compara la contraseña plana con el hash almacenado en el pool de hashing
+        validacion = await Hash_Servicio.verificar(contrasena_plana, contrasena_hash)
 
         return validacion
 
     #================================= UTILIDADES ================================= #
 
+    # Traducir un IntegrityError a errores por campo
+    @staticmethod
+    def _errores_integridad(error: IntegrityError) -> dict:
+        """
+        Determina qué campos únicos provocaron el IntegrityError a partir del mensaje del motor
+        (por ejemplo "UNIQUE constraint failed: usuario.correo" o "ix_usuario_telefono"). Las demás
+        restricciones (NOT NULL, CHECK, claves foráneas) se reportan con un error genérico.
+        """
+        coincidencia = Usuario_Servicio.PATRON_UNICIDAD.search(str(error.orig))
+        if coincidencia is None:
+            return {'internal': 'Los datos no cumplen las restricciones de la base de datos.'}
+        if coincidencia[1]:
+            columnas = {columna.strip().rsplit('.', 1)[-1] for columna in coincidencia[1].split(',')}
+        else:
+            columnas = {coincidencia[2]}
+        errores = {
+            campo: texto for campo, texto in Usuario_Servicio.MENSAJES_UNICIDAD.items()
+            if campo in columnas
+        }
+        return errores or {'internal': 'Los datos entran en conflicto con un registro existente.'}
+
+    # Datos del usuario para la respuesta de inicio de sesión
+    @staticmethod
+    def _datos_sesion(usuario) -> dict:
+        """
+        Devuelve los campos de UsuarioSesion tomados del usuario (fila de CONSULTA_SESION u objeto Usuario).
+        """
+        return {campo: getattr(usuario, campo) for campo in UsuarioSesion.model_fields}
+
+    # Armar la fila de un usuario importado
+    @staticmethod
+    def _fila_usuario(registro: dict, valores: dict, hashed_password: str) -> dict:
+        """
+        Devuelve los valores de columna de un registro ya validado (importación masiva).
+        """
+        marca, ultimos_4 = Usuario_Servicio._calcular_marca_y_ultimos4(registro['numero_tarjeta'])
+        return {
+            'imagen_perfil': valores['imagen_perfil'],
+            'nombre': registro['nombre'],
+            'apellidos': registro['apellidos'],
+            'username': registro['username'],
+            'correo': registro['correo'],
+            'telefono': registro['telefono'],
+            'fecha_nacimiento': valores['fecha_nacimiento'],
+            'domicilio': registro['domicilio'],
+            'contrasena': hashed_password,
+            'rol_id': 2,
+            'pregunta_recuperacion_id': registro['pregunta_recuperacion_id'],
+            'respuesta_recuperacion': registro['respuesta_recuperacion'],
+            'permitir_huella': registro['permitir_huella'],
+            'nombre_titular': registro['nombre_titular'],
+            'numero_encriptado': Usuario_Servicio._encriptar_tarjeta(registro['numero_tarjeta']),
+            'fecha_expiracion': registro['fecha_expiracion'],
+            'marca': marca,
+            'ultimos_4': ultimos_4,
+            'token_publico': registro['token_publico'],
+            'intentos_fallidos': 0,
+            'estado_cuenta': 'activo',
+        }
+
+    # Insertar usuarios y sus asociaciones en bloque
+    @staticmethod
+    async def _insertar_usuarios(db, filas: list, valores_lote: list):
+        """
+        Inserta los usuarios con un executemany (RETURNING id en el mismo orden de las filas)
+        y luego sus asociaciones con hobbies y tipos de casa.
+        """
+        if not filas:
+            return
+        ids = (await db.scalars(
+            insert(Usuario).returning(Usuario.id, sort_by_parameter_order=True), filas
+        )).all()
+        hobbies = [{'usuario_id': i, 'hobby_id': h} for i, v in zip(ids, valores_lote) for h in v['hobbies']]
+        tipos_casa = [{'usuario_id': i, 'tipo_casa_id': t} for i, v in zip(ids, valores_lote) for t in v['tipos_casa']]
+        if hobbies:
+            await db.execute(insert(UsuarioHobby), hobbies)
+        if tipos_casa:
+            await db.execute(insert(UsuarioTipoCasa), tipos_casa)
+
+    # Eliminar imágenes guardadas para registros rechazados
+    @staticmethod
+    async def _descartar_imagenes(db, claves: set):
+        """
+        Las claves son el hash del contenido: otro usuario puede tener la misma imagen, así que solo
+        se eliminan las que ninguna fila de usuario referencia.
+        """
+        if not claves:
+            return
+        en_uso = set((await db.scalars(select(Usuario.imagen_perfil).where(Usuario.imagen_perfil.in_(claves)))).all())
+        almacenamiento = obtener_almacenamiento()
+        for clave in claves - en_uso:
+            await almacenamiento.eliminar(clave)
+
     # Calcular marca y últimos 4 dígitos de la tarjeta
     @staticmethod
     def _calcular_marca_y_ultimos4(numero_tarjeta):
         """
-        Determina la marca de la tarjeta y obtiene los últimos 4 dígitos.
+        Determina la marca de la tarjeta (por su rango de BIN) y obtiene los últimos 4 dígitos.
         """
-        # Determinar marca por el prefijo
-        if numero_tarjeta.startswith('4'):
-            marca = 'Visa'
-        elif numero_tarjeta.startswith(('51', '52', '53', '54', '55')):
-            marca = 'Mastercard'
-        elif numero_tarjeta.startswith('34') or numero_tarjeta.startswith('37'):
-            marca = 'American Express'
-        else:
-            marca = 'Desconocida'
+        marca = Tarjeta_Servicio.marca(numero_tarjeta)
         ultimos_4 = numero_tarjeta[-4:] if numero_tarjeta and len(numero_tarjeta) >= 4 else ''
         return marca, ultimos_4
 
     # Validación de contraseña
     @staticmethod
-    def verificar_contrasena(contrasena_plana: str, contrasena_hash: str) -> bool:
+    async def verificar_contrasena(contrasena_plana: str, contrasena_hash: str) -> bool:
         """
         Verifica si la contraseña plana coincide con el hash almacenado.
         """
-        return Usuario_Servicio.pwd_context.verify(contrasena_plana, contrasena_hash)
+        return await Hash_Servicio.verificar(contrasena_plana, contrasena_hash)
     
-    # Encriptación de tarjeta de crédito
-    @staticmethod
-    def _get_fernet():
-        """
-        Obtiene el objeto Fernet usando una clave persistente en disco.
-        Si la clave no existe, la crea y la guarda.
-        """
-        if not os.path.exists(Usuario_Servicio.KEY_PATH):
-            key = Fernet.generate_key()
-            with open(Usuario_Servicio.KEY_PATH, 'wb') as f:
-                f.write(key)
-        else:
-            with open(Usuario_Servicio.KEY_PATH, 'rb') as f:
-                key = f.read()
-        return Fernet(key)
-
     # Encriptar número de tarjeta
     @staticmethod
     def _encriptar_tarjeta(numero_tarjeta: str) -> str:
         """
-        Encripta el número de tarjeta usando Fernet.
+        Encripta el número de tarjeta con la clave Fernet vigente.
         """
-        fernet = Usuario_Servicio._get_fernet()
-        return fernet.encrypt(numero_tarjeta.encode()).decode()
+        return Cifrado_Servicio.encriptar(numero_tarjeta)
     
     # Guardar imagen de perfil
     @staticmethod
-    def _guardar_imagen(imagen_perfil):
+    async def _guardar_imagen(imagen_perfil, formato, errores):
         """
-        Guarda la imagen de perfil en el sistema de archivos y devuelve la ruta.
+        Guarda la imagen de perfil por bloques en el almacenamiento configurado y devuelve su clave
+        (hash del contenido + formato real). Si se supera el tamaño máximo, agrega el error y no guarda nada.
         """
-        if imagen_perfil:
-            uploads_dir = os.path.join(os.getcwd(), 'uploads')
-            os.makedirs(uploads_dir, exist_ok=True)
-            imagen_path = os.path.join(uploads_dir, imagen_perfil.filename)
-            with open(imagen_path, "wb") as buffer:
-                buffer.write(imagen_perfil.file.read())
-            return imagen_path
-        return None
+        if not imagen_perfil:
+            return None
+        try:
+            return await obtener_almacenamiento().guardar(
+                bloques_upload(imagen_perfil), formato, Usuario_Servicio.TAM_MAX_IMAGEN
+            )
+        except ImagenDemasiadoGrandeError:
+            errores['imagen_perfil'] = Usuario_Servicio.MENSAJE_TAM_IMAGEN
+            return None
 # Buscar usuario por token público
     @staticmethod
-    def buscar_por_token_publico(db: Session, token_publico: str):
+    async def buscar_por_token_publico(db: AsyncSession, token_publico: str):
         """
         Busca un usuario por token público y devuelve la info tipo login.
         """
         errores = {}
         try:
-            usuario = db.query(Usuario).filter_by(token_publico=token_publico).first()
+            usuario = (await db.execute(
+                Usuario_Servicio.CONSULTA_SESION.filter_by(token_publico=token_publico).limit(1)
+            )).first()
             if not usuario:
                 errores['token_publico'] = 'No existe usuario con ese token.'
                 return {'errores': errores}
             if usuario.estado_cuenta == 'bloqueado':
                 errores['cuenta'] = 'La cuenta está bloqueada. Contacte al administrador.'
                 return {'errores': errores}
-            return {
-                "id": usuario.id,
-                "username": usuario.username,
-                "correo": usuario.correo,
-                "telefono": usuario.telefono,
-                "nombre": usuario.nombre,
-                "apellidos": usuario.apellidos,
-                "rol_id": usuario.rol_id,
-                "estado_cuenta": usuario.estado_cuenta
-            }
+            datos = Usuario_Servicio._datos_sesion(usuario)
+            # Tokens de sesión para no tener que reenviar la contraseña
+            return {**datos, **Token_Servicio.emitir(datos)}
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             return {'errores': {'internal': f'Error interno: {str(e)}'}}
         finally:
-            db.close()
+            await db.close()
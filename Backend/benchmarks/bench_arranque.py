@@ -0,0 +1,121 @@
+"""
+Tiempo de importación y memoria de `main:app` (arranque en frío de un worker).
+
+Cada corrida es un proceso nuevo que importa main.py con `python -X importtime` y reporta el tiempo
+de importación y el RSS. Se resumen p50/p95 del tiempo y la mediana del RSS, junto con los paquetes
+que más tardan en importarse. Sirve como control de regresiones porque los workers se crean y se
+destruyen con frecuencia:
+  - termina con código 1 si se importa algún paquete prohibido (por defecto Flask y sus dependencias),
+  - si se supera --max-importacion-ms o --max-rss-mb,
+  - o si empeora respecto a --base más que --tolerancia.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_arranque --corridas 10 --salida arranque.json
+    python -m benchmarks.bench_arranque --base arranque.json --tolerancia 0.15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.comun import comparar, guardar_json, percentil, preparar_entorno
+
+# Código que ejecuta cada proceso hijo
+CODIGO_HIJO = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+import main
+duracion = time.perf_counter() - inicio
+with open('/proc/self/statm') as f:
+    rss = int(f.read().split()[1]) * resource.getpagesize()
+print(json.dumps({'importacion_s': duracion, 'rss': rss, 'modulos': sorted(sys.modules)}))
+"""
+
+PROHIBIDOS = ('flask', 'flask_sqlalchemy', 'werkzeug', 'jinja2')
+
+
+# Ejecutar una corrida en un proceso nuevo
+def corrida(carpeta_backend: str) -> dict:
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CODIGO_HIJO],
+        cwd=carpeta_backend, capture_output=True, text=True, env=os.environ.copy(), check=True,
+    )
+    datos = json.loads(proceso.stdout.strip().splitlines()[-1])
+    datos['importtime'] = proceso.stderr
+    return datos
+
+
+# Paquetes que más tardan en importarse
+def paquetes_mas_lentos(importtime: str, cantidad: int) -> list:
+    """
+    Suma el tiempo propio (columna self de -X importtime) de cada módulo bajo su paquete de primer
+    nivel, así el costo de un paquete no se cuenta dos veces cuando otro lo importa.
+    """
+    tiempos = {}
+    for linea in importtime.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        propio, _, modulo = linea[len('import time:'):].split('|')
+        paquete = modulo.strip().split('.')[0]
+        tiempos[paquete] = tiempos.get(paquete, 0) + int(propio)
+    return sorted(tiempos.items(), key=lambda t: -t[1])[:cantidad]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corridas", type=int, default=10)
+    parser.add_argument("--prohibidos", default=','.join(PROHIBIDOS), help="Paquetes que main.py no debe importar")
+    parser.add_argument("--max-importacion-ms", type=float, default=None, help="Límite absoluto del p50")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="Límite absoluto del RSS")
+    parser.add_argument("--base", help="Corrida anterior (JSON) para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.15)
+    parser.add_argument("--salida", default="resultados_arranque.json")
+    args = parser.parse_args()
+
+    carpeta_backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    preparar_entorno(tempfile.mkdtemp(prefix='bench_arranque_'))
+    # Una corrida de calentamiento para que los .pyc ya estén compilados
+    corrida(carpeta_backend)
+    corridas = [corrida(carpeta_backend) for _ in range(args.corridas)]
+
+    tiempos = sorted(c['importacion_s'] for c in corridas)
+    rss_mb = statistics.median(c['rss'] for c in corridas) / (1024 * 1024)
+    resultados = [
+        {'id': 'arranque/importar_main', 'p50_ms': round(percentil(tiempos, 50) * 1000, 1),
+         'p95_ms': round(percentil(tiempos, 95) * 1000, 1), 'modulos': len(corridas[-1]['modulos'])},
+        {'id': 'arranque/rss', 'rss_mb': round(rss_mb, 1)},
+    ]
+    print(f"importar main: p50 {resultados[0]['p50_ms']} ms  p95 {resultados[0]['p95_ms']} ms  "
+          f"({resultados[0]['modulos']} módulos)  RSS {resultados[1]['rss_mb']} MB")
+    print("paquetes más lentos (tiempo propio sumado por paquete):")
+    for paquete, microsegundos in paquetes_mas_lentos(corridas[-1]['importtime'], 12):
+        print(f"  {paquete:<24} {microsegundos / 1000:>8.1f} ms")
+    guardar_json(args.salida, {k: v for k, v in vars(args).items() if k != 'salida'}, resultados)
+
+    fallas = []
+    prohibidos = {p.strip() for p in args.prohibidos.split(',') if p.strip()}
+    importados = sorted({m.split('.')[0] for m in corridas[-1]['modulos']} & prohibidos)
+    if importados:
+        fallas.append(f"main.py importa paquetes prohibidos: {', '.join(importados)}")
+    if args.max_importacion_ms is not None and resultados[0]['p50_ms'] > args.max_importacion_ms:
+        fallas.append(f"la importación supera {args.max_importacion_ms} ms")
+    if args.max_rss_mb is not None and resultados[1]['rss_mb'] > args.max_rss_mb:
+        fallas.append(f"el RSS supera {args.max_rss_mb} MB")
+    if args.base:
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        for id_resultado, metrica, anterior, actual, cambio, regresion in comparar(
+                base, {'resultados': resultados}, args.tolerancia):
+            print(f"  {id_resultado} {metrica}: {anterior} -> {actual} ({cambio:+.1%})")
+            if regresion:
+                fallas.append(f"{id_resultado} {metrica} empeoró {cambio:+.1%}")
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark de la detección de marca de tarjeta y del algoritmo de Luhn.
+
+Mide 1M búsquedas en el índice de rangos de BIN (bisect) con la tabla real y con tablas sintéticas
+de miles de rangos, y las compara con una búsqueda lineal por prefijos (equivalente a la cadena de
+`startswith` anterior). También mide 1M verificaciones de Luhn.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_bin --busquedas 1000000 --rangos 1000 10000
+"""
+import argparse
+import random
+import time
+
+from Servicios.Tarjeta_Servicio import IndiceBIN, Tarjeta_Servicio, DIGITOS_BIN
+
+
+# Tabla sintética de rangos de 8 dígitos sin solapamientos
+def tabla_sintetica(cantidad: int, semilla: int = 42) -> IndiceBIN:
+    rnd = random.Random(semilla)
+    inicios = sorted(rnd.sample(range(10_000_000, 99_999_999, 1000), cantidad))
+    return IndiceBIN(
+        IndiceBIN.rango(str(inicio), str(inicio + rnd.randint(0, 999)), f'Marca{i % 50}', (16,))
+        for i, inicio in enumerate(inicios)
+    )
+
+
+# Búsqueda lineal por prefijos (como la cadena de startswith)
+def busqueda_lineal(indice: IndiceBIN):
+    rangos = indice._rangos
+
+    def buscar(numero):
+        prefijo = int(numero[:DIGITOS_BIN])
+        for rango in rangos:
+            if rango.inicio <= prefijo <= rango.fin:
+                return rango
+        return None
+    return buscar
+
+
+# Números de tarjeta aleatorios de 16 dígitos
+def numeros(cantidad: int, semilla: int = 7) -> list:
+    rnd = random.Random(semilla)
+    return [str(rnd.randrange(10**15, 10**16)) for _ in range(cantidad)]
+
+
+# Medir operaciones por segundo
+def medir(funcion, datos) -> float:
+    inicio = time.perf_counter()
+    for dato in datos:
+        funcion(dato)
+    return len(datos) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--busquedas", type=int, default=1_000_000)
+    parser.add_argument("--rangos", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    datos = numeros(args.busquedas)
+    # La búsqueda lineal es mucho más lenta con tablas grandes, se mide sobre una muestra
+    muestra = datos[:max(1, len(datos) // 100)]
+
+    indices = {'real': Tarjeta_Servicio.obtener()}
+    indices.update({f'{n} rangos': tabla_sintetica(n) for n in args.rangos})
+    for nombre, indice in indices.items():
+        bisect_ops = medir(indice.buscar, datos)
+        lineal_ops = medir(busqueda_lineal(indice), muestra)
+        print(f"{nombre:>14} ({len(indice):>6} rangos): bisect {bisect_ops:>10.0f} búsquedas/s | "
+              f"lineal {lineal_ops:>10.0f} búsquedas/s")
+
+    print(f"{'luhn':>14}: {medir(Tarjeta_Servicio.luhn, datos):>10.0f} verificaciones/s")
+
+
+if __name__ == "__main__":
+    main()
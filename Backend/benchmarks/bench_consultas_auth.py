@@ -0,0 +1,142 @@
+"""
+SQL emitido por las rutas de autenticación y costo de la proyección de columnas.
+
+1. Ejecuta login, recuperación de contraseña, restablecimiento y búsqueda por token sobre una base
+   temporal, captura cada sentencia enviada al motor y la compara con el SQL esperado (una consulta
+   por búsqueda, sin columnas que el endpoint no usa). Termina con código 1 si alguna difiere.
+2. Mide búsquedas de login por segundo cargando el Usuario completo (25 columnas, como antes) y con
+   la proyección CONSULTA_LOGIN.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_consultas_auth --usuarios 5000 --busquedas 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import undefer_group
+
+from Modelos.Usuario import Usuario
+from Servicios.Hash_Servicio import Hash_Servicio, pwd_context
+from Servicios.Token_Servicio import Token_Servicio
+from Servicios.Usuario_Servicio import Usuario_Servicio
+from benchmarks.bench_db_concurrencia import preparar_base
+
+SESION = ('usuario.id, usuario.username, usuario.correo, usuario.telefono, usuario.nombre, '
+          'usuario.apellidos, usuario.rol_id, usuario.estado_cuenta')
+
+# Sentencias esperadas por endpoint (SQLite), en orden
+SQL_ESPERADO = {
+    'login': [
+        f'SELECT {SESION}, usuario.contrasena, usuario.intentos_fallidos \nFROM usuario \n'
+        'WHERE usuario.username = ?\n LIMIT ? OFFSET ?',
+    ],
+    'login por correo': [
+        f'SELECT {SESION}, usuario.contrasena, usuario.intentos_fallidos \nFROM usuario \n'
+        'WHERE usuario.correo = ?\n LIMIT ? OFFSET ?',
+    ],
+    'recuperar-contrasena': [
+        'SELECT preguntas_recuperacion.id, preguntas_recuperacion.texto \nFROM preguntas_recuperacion '
+        'JOIN usuario ON usuario.pregunta_recuperacion_id = preguntas_recuperacion.id \n'
+        'WHERE usuario.username = ?\n LIMIT ? OFFSET ?',
+    ],
+    'restablecer-contrasena': [
+        'SELECT usuario.id, usuario.respuesta_recuperacion \nFROM usuario \n'
+        'WHERE usuario.username = ?\n LIMIT ? OFFSET ?',
+        'UPDATE usuario SET contrasena=?, intentos_fallidos=?, estado_cuenta=? WHERE usuario.id = ?',
+    ],
+    'buscar-por-token': [
+        f'SELECT {SESION} \nFROM usuario \nWHERE usuario.token_publico = ?\n LIMIT ? OFFSET ?',
+    ],
+}
+
+
+# Ejecutar cada endpoint y capturar su SQL
+async def capturar_sql(session_factory, sentencias: list) -> dict:
+    llamadas = {
+        'login': lambda db: Usuario_Servicio.login_usuario(db, 'usuario1', 'abc12345'),
+        'login por correo': lambda db: Usuario_Servicio.login_usuario(db, 'usuario1@correo.com', 'abc12345'),
+        'recuperar-contrasena': lambda db: Usuario_Servicio.obtener_pregunta_recuperacion(db, 'usuario1'),
+        'restablecer-contrasena': lambda db: Usuario_Servicio.restablecer_contrasena(db, 'usuario1', 'abc12345', 'r'),
+        'buscar-por-token': lambda db: Usuario_Servicio.buscar_por_token_publico(db, 'token1'),
+    }
+    emitido = {}
+    for nombre, llamada in llamadas.items():
+        sentencias.clear()
+        async with session_factory() as db:
+            resultado = await llamada(db)
+        if 'errores' in resultado:
+            raise RuntimeError(f'{nombre}: {resultado["errores"]}')
+        emitido[nombre] = list(sentencias)
+    return emitido
+
+
+# Búsquedas de login por segundo con una consulta dada
+async def medir(session_factory, consulta, busquedas: int, cantidad_usuarios: int) -> float:
+    inicio = time.perf_counter()
+    async with session_factory() as db:
+        for i in range(busquedas):
+            (await db.execute(consulta.where(Usuario.username == f'usuario{i % cantidad_usuarios}'))).first()
+            db.expunge_all()
+    return busquedas / (time.perf_counter() - inicio)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=5000)
+    parser.add_argument("--busquedas", type=int, default=5000)
+    args = parser.parse_args()
+
+    ruta = os.path.join(tempfile.mkdtemp(), "bench.db")
+    preparar_base(ruta, args.usuarios)
+    engine = create_engine(f"sqlite:///{ruta}")
+    with engine.begin() as conn:
+        conn.execute(update(Usuario.__table__).where(Usuario.__table__.c.id == 2)
+                     .values(contrasena=pwd_context.hash('abc12345'), token_publico='token1'))
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    sentencias = []
+    event.listen(async_engine.sync_engine, 'before_cursor_execute',
+                 lambda conn, cursor, sql, parametros, contexto, executemany: sentencias.append(sql))
+    Token_Servicio._secreto = os.urandom(32)
+
+    fallos = 0
+    try:
+        emitido = await capturar_sql(AsyncSessionLocal, sentencias)
+        for nombre, esperado in SQL_ESPERADO.items():
+            correcto = emitido[nombre] == esperado
+            fallos += not correcto
+            print(f"[{'ok' if correcto else 'DIFERENTE'}] {nombre}: {len(emitido[nombre])} sentencia(s)")
+            for sql in emitido[nombre]:
+                print('    ' + ' '.join(sql.split()))
+            if not correcto:
+                for sql in esperado:
+                    print('    esperado: ' + ' '.join(sql.split()))
+
+        # Se alternan las mediciones y se toma la mejor de cada una (la primera calienta la caché del motor)
+        consultas = {
+            'completo': select(Usuario).options(undefer_group('sensible')).limit(1),
+            'proyeccion': Usuario_Servicio.CONSULTA_LOGIN.limit(1),
+        }
+        mejores = dict.fromkeys(consultas, 0.0)
+        for _ in range(3):
+            for nombre, consulta in consultas.items():
+                mejores[nombre] = max(mejores[nombre], await medir(AsyncSessionLocal, consulta, args.busquedas, args.usuarios))
+        completo, proyeccion = mejores['completo'], mejores['proyeccion']
+        print(f"usuario completo: {completo:>8.0f} búsquedas/s")
+        print(f"proyección login: {proyeccion:>8.0f} búsquedas/s  (x{proyeccion / completo:.2f})")
+    finally:
+        await async_engine.dispose()
+        Hash_Servicio.cerrar()
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Sentencias SQL por registro de usuario.
+
+Registra un usuario para calentar las cachés (catálogos, sentencias compiladas) y cuenta las
+sentencias que llegan al motor (before_cursor_execute) durante un segundo registro. Termina con
+código 1 si se superan los límites:
+
+  - una sola consulta de lectura (unicidad de correo, username y teléfono en una consulta; los
+    IDs de hobbies, tipos de casa y pregunta se validan contra los catálogos en memoria);
+  - MAX_SENTENCIAS en total para el registro (la lectura + usuario, hobbies y tipos de casa),
+    más una inserción por cada trabajo encolado en la misma transacción (miniaturas).
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_consultas_registro
+"""
+import asyncio
+import io
+import sys
+import tempfile
+
+from benchmarks.comun import preparar_entorno
+
+# Sentencias permitidas por registro (sin contar los trabajos encolados)
+MAX_SENTENCIAS = 4
+
+# Lecturas permitidas por registro
+MAX_LECTURAS = 1
+
+
+async def main():
+    preparar_entorno(tempfile.mkdtemp(), HASH_WORKERS=1)
+
+    from sqlalchemy import create_engine, event
+    from starlette.datastructures import UploadFile
+
+    import config
+    from Base_de_Datos.db import AsyncSessionLocal, async_engine
+    from Modelos.Roles import Rol  # noqa: F401 (necesario para crear el esquema)
+    from Modelos.TipoCasa import TipoCasa  # noqa: F401
+    from Servicios.Cifrado_Servicio import Cifrado_Servicio
+    from Servicios.Hash_Servicio import Hash_Servicio
+    from Servicios.Usuario_Servicio import Usuario_Servicio
+    from benchmarks.bench_endpoints import crear_esquema, imagen_png
+
+    engine = create_engine(config.DATABASE_URL)
+    crear_esquema(engine)
+    engine.dispose()
+    Cifrado_Servicio.cargar()
+    png = imagen_png()
+    sentencias = []
+    event.listen(async_engine.sync_engine, 'before_cursor_execute',
+                 lambda conn, cursor, sql, parametros, contexto, executemany: sentencias.append(' '.join(sql.split())))
+
+    async def registrar(i: int) -> dict:
+        async with AsyncSessionLocal() as db:
+            return await Usuario_Servicio.registrar_usuario(
+                db, nombre='Ana', apellidos='Mora', username=f'ana{i}', correo=f'ana{i}@correo.com',
+                telefono=f'{70000000 + i}', fecha_nacimiento='1990-01-01', domicilio='San José',
+                contrasena='Abc12345', imagen_perfil=UploadFile(io.BytesIO(png), size=len(png), filename='foto.png'),
+                hobbies_ids=[1, 2], tipos_casa_ids=[1], pregunta_recuperacion_id=1, respuesta_recuperacion='respuesta',
+                permitir_huella=0, nombre_titular='Ana Mora', numero_tarjeta='4111111111111111', fecha_expiracion='12/2030',
+            )
+
+    try:
+        for i in range(2):
+            sentencias.clear()
+            resultado = await registrar(i)
+            if 'errores' in resultado:
+                raise RuntimeError(f'registro {i}: {resultado["errores"]}')
+    finally:
+        await async_engine.dispose()
+        Hash_Servicio.cerrar()
+
+    lecturas = [sql for sql in sentencias if sql.upper().startswith('SELECT')]
+    trabajos = [sql for sql in sentencias if sql.upper().startswith('INSERT INTO TRABAJOS')]
+    registro = len(sentencias) - len(trabajos)
+    for sql in sentencias:
+        print(f"    {sql[:140]}")
+    correcto = len(lecturas) <= MAX_LECTURAS and registro <= MAX_SENTENCIAS
+    print(f"[{'ok' if correcto else 'EXCEDE'}] registro en caliente: {registro} sentencia(s) (máx. {MAX_SENTENCIAS}), "
+          f"{len(lecturas)} lectura(s) (máx. {MAX_LECTURAS}), {len(trabajos)} trabajo(s) encolado(s)")
+    sys.exit(0 if correcto else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Benchmark de concurrencia de la capa de base de datos.
+
+Compara cuántas consultas por segundo se atienden a distintos niveles de concurrencia con:
+  - antes:   Session síncrona ejecutada en el threadpool de anyio (como un endpoint `def`).
+  - despues: AsyncSession con aiosqlite (como los endpoints `async def` actuales).
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_db_concurrencia --usuarios 5000 --peticiones 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date
+
+import anyio
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from Modelos import Base
+from Modelos.Usuario import Usuario
+from Modelos.Roles import Rol
+from Modelos.PreguntaRecuperacion import PreguntaRecuperacion
+from Modelos.TipoCasa import TipoCasa  # necesario para crear el esquema
+
+NIVELES_CONCURRENCIA = (1, 8, 32, 64, 128, 256)
+
+
+# Crear y poblar la base de datos temporal
+def preparar_base(ruta: str, cantidad_usuarios: int):
+    """
+    Crea el esquema en un archivo SQLite temporal e inserta usuarios sintéticos.
+    """
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Rol.__table__), [{"id": 2, "nombre": "usuario"}])
+        conn.execute(insert(PreguntaRecuperacion.__table__), [{"id": 1, "texto": "pregunta"}])
+        conn.execute(insert(Usuario.__table__), [
+            {
+                "rol_id": 2, "imagen_perfil": "", "nombre": "Nombre", "apellidos": "Apellidos",
+                "correo": f"usuario{i}@correo.com", "username": f"usuario{i}", "contrasena": "x",
+                "telefono": f"{80000000 + i}", "fecha_nacimiento": date(2000, 1, 1), "domicilio": "",
+                "pregunta_recuperacion_id": 1, "respuesta_recuperacion": "r", "permitir_huella": 0,
+                "intentos_fallidos": 0, "estado_cuenta": "activo", "nombre_titular": "T",
+                "numero_encriptado": "x", "fecha_expiracion": "12/2030", "marca": "Visa", "ultimos_4": "1111",
+            }
+            for i in range(cantidad_usuarios)
+        ])
+    engine.dispose()
+
+
+# Ejecutar peticiones con un nivel de concurrencia dado
+async def medir(peticion, concurrencia: int, total: int, cantidad_usuarios: int) -> float:
+    """
+    Ejecuta `total` peticiones con `concurrencia` tareas simultáneas y devuelve peticiones/s.
+    """
+    restantes = iter(range(total))
+
+    async def trabajador():
+        for _ in restantes:
+            await peticion(f"usuario{random.randrange(cantidad_usuarios)}")
+
+    inicio = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(concurrencia):
+            tg.start_soon(trabajador)
+    return total / (time.perf_counter() - inicio)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=5000)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    args = parser.parse_args()
+
+    ruta = os.path.join(tempfile.mkdtemp(), "bench.db")
+    preparar_base(ruta, args.usuarios)
+
+    sync_engine = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(bind=sync_engine, autoflush=False)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    # Endpoint síncrono: cada petición ocupa un hilo del threadpool
+    def consulta_sync(username):
+        with SessionLocal() as sesion:
+            return sesion.scalar(select(Usuario).filter_by(username=username))
+
+    async def antes(username):
+        return await anyio.to_thread.run_sync(consulta_sync, username)
+
+    # Endpoint asíncrono: la sesión no ocupa hilos del threadpool
+    async def despues(username):
+        async with AsyncSessionLocal() as sesion:
+            return await sesion.scalar(select(Usuario).filter_by(username=username))
+
+    print(f"{'concurrencia':>12} {'antes (req/s)':>15} {'despues (req/s)':>16}")
+    for concurrencia in NIVELES_CONCURRENCIA:
+        rps_antes = await medir(antes, concurrencia, args.peticiones, args.usuarios)
+        rps_despues = await medir(despues, concurrencia, args.peticiones, args.usuarios)
+        print(f"{concurrencia:>12} {rps_antes:>15.0f} {rps_despues:>16.0f}")
+
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,309 @@
+"""
+Prueba de carga de los endpoints de la API.
+
+Levanta la `app` de main.py (con su ciclo de inicio y apagado) sobre una base SQLite temporal,
+la siembra con usuarios sintéticos y ejecuta cada escenario con una concurrencia fija, llamando a la
+aplicación por ASGI (sin red). La latencia de una solicitud va desde que se llama a la aplicación
+hasta que se envía el último fragmento del cuerpo (las tareas de fondo no cuentan, como con un cliente real).
+
+Las escalas se ejecutan de menor a mayor sobre la misma base: se agregan usuarios hasta llegar a cada una.
+Todos los usuarios sembrados comparten la misma contraseña (un solo hash bcrypt) y la misma imagen.
+
+Escenarios: raiz, catalogos, catalogos_304, login, recuperar_contrasena, restablecer_contrasena, registro,
+registro_reintento_idempotente, registro_reintento, buscar_por_token, validar, yo, token_refrescar, logout, imagen, metrics. Los que hashean con bcrypt
+(login, restablecer_contrasena, registro) usan --peticiones-bcrypt.
+
+Resultados (p50/p95/p99/max en ms y solicitudes/s) se imprimen y se guardan en JSON; para comparar
+dos corridas: python -m benchmarks.comparar base.json nuevo.json
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_endpoints --escalas 10000,100000,1000000 --concurrencia 1,32 --salida endpoints.json
+"""
+import argparse
+import asyncio
+import collections
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import date
+from urllib.parse import urlsplit
+
+import httpx
+
+from benchmarks.comun import guardar_json, preparar_entorno, resumen_latencias
+
+CONTRASENA = 'Bench12345'
+RESPUESTA = 'respuesta'
+TAMANO_LOTE_SIEMBRA = 20000
+
+
+# Imagen PNG de prueba
+def imagen_png() -> bytes:
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (320, 240), (30, 120, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+#================================= BASE DE DATOS ================================= #
+
+# Crear el esquema y los catálogos
+def crear_esquema(engine):
+    from Modelos import Base
+    carpeta = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Base_de_Datos')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for archivo in ('RolesPredeterminados', 'HobbiesPredeterminados', 'TipodeCasaPredeterminados',
+                        'PreguntasPredeterminadas'):
+            with open(os.path.join(carpeta, f'{archivo}.sql'), encoding='utf-8') as f:
+                conn.exec_driver_sql(f.read())
+
+
+# Sembrar usuarios sintéticos [desde, hasta)
+def sembrar(engine, desde: int, hasta: int, fijos: dict):
+    """
+    Inserta usuarios con executemany por lotes. El usuario i tiene id i + 1, username usuario{i} y token token{i}.
+    """
+    from sqlalchemy import insert
+    from Modelos.Usuario import Usuario
+
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        for lote in range(desde, hasta, TAMANO_LOTE_SIEMBRA):
+            conn.execute(insert(Usuario.__table__), [
+                {
+                    **fijos,
+                    'username': f'usuario{i}', 'correo': f'usuario{i}@bench.com', 'telefono': str(60000000 + i),
+                    'token_publico': f'token{i}',
+                }
+                for i in range(lote, min(lote + TAMANO_LOTE_SIEMBRA, hasta))
+            ])
+    print(f"sembrados {hasta - desde} usuarios (total {hasta}) en {time.perf_counter() - inicio:.1f} s")
+
+
+#================================= CLIENTE ASGI ================================= #
+
+# Ejecutar una solicitud contra la aplicación
+async def llamar(app, solicitud: httpx.Request):
+    """
+    Devuelve (estado, latencia en segundos, encabezados de la respuesta).
+    """
+    url = urlsplit(str(solicitud.url))
+    cuerpo = solicitud.read()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': solicitud.method,
+        'scheme': 'http', 'path': url.path, 'raw_path': url.path.encode(), 'query_string': url.query.encode(),
+        'root_path': '', 'headers': [(k.lower(), v) for k, v in solicitud.headers.raw],
+        'client': ('127.0.0.1', 50000), 'server': ('bench', 80), 'state': {},
+    }
+    respuesta = {'estado': None, 'fin': None, 'encabezados': {}}
+    completa = asyncio.Event()
+    cuerpo_enviado = False
+
+    async def receive():
+        nonlocal cuerpo_enviado
+        if not cuerpo_enviado:
+            cuerpo_enviado = True
+            return {'type': 'http.request', 'body': cuerpo, 'more_body': False}
+        # Como un cliente que sigue conectado hasta recibir la respuesta completa
+        await completa.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(mensaje):
+        if mensaje['type'] == 'http.response.start':
+            respuesta['estado'] = mensaje['status']
+            respuesta['encabezados'] = {k.decode('latin-1'): v.decode('latin-1') for k, v in mensaje['headers']}
+        elif mensaje['type'] == 'http.response.body' and not mensaje.get('more_body'):
+            respuesta['fin'] = time.perf_counter()
+            completa.set()
+
+    inicio = time.perf_counter()
+    await app(scope, receive, send)
+    return respuesta['estado'], (respuesta['fin'] or time.perf_counter()) - inicio, respuesta['encabezados']
+
+
+# Ejecutar un escenario con una concurrencia dada
+async def ejecutar(app, construir, total: int, concurrencia: int, esperados: tuple) -> dict:
+    """
+    `construir(i)` devuelve la httpx.Request número i. Devuelve latencias, estados y solicitudes/s.
+    """
+    solicitudes = [construir(i) for i in range(total)]
+    pendientes = iter(solicitudes)
+    latencias, estados = [], collections.Counter()
+
+    async def trabajador():
+        for solicitud in pendientes:
+            estado, latencia, _ = await llamar(app, solicitud)
+            latencias.append(latencia)
+            estados[estado] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+    return {
+        'peticiones': total,
+        'errores': sum(c for estado, c in estados.items() if estado not in esperados),
+        'estados': {str(estado): c for estado, c in sorted(estados.items())},
+        'rps': round(total / duracion, 1),
+        **resumen_latencias(latencias),
+    }
+
+
+#================================= ESCENARIOS ================================= #
+
+# Escenarios para una escala: nombre -> (construir(i), esperados, usa bcrypt)
+def escenarios(escala: int, contexto: dict, rnd: random.Random) -> dict:
+    from Servicios.Token_Servicio import Token_Servicio
+
+    def usuario():
+        return rnd.randrange(escala)
+
+    def formulario(ruta, **datos):
+        return lambda i: httpx.Request('POST', f'http://bench{ruta}', data={k: v(i) if callable(v) else v for k, v in datos.items()})
+
+    def tokens(i):
+        indice = usuario()
+        return Token_Servicio.emitir({'id': indice + 1, 'username': f'usuario{indice}', 'rol_id': 2})
+
+    def solicitud_registro(n, headers=None):
+        datos = {
+            'nombre': 'Nuevo', 'apellidos': 'Usuario', 'username': f'nuevo{n}', 'correo': f'nuevo{n}@bench.com',
+            'telefono': str(40000000 + n), 'fecha_nacimiento': '1995-06-15', 'domicilio': 'San José',
+            'contrasena': CONTRASENA, 'hobbies_ids': '1,2', 'tipos_casa_ids': '1', 'pregunta_recuperacion_id': '1',
+            'respuesta_recuperacion': RESPUESTA, 'permitir_huella': '0', 'nombre_titular': 'Nuevo Usuario',
+            'numero_tarjeta': '4111111111111111', 'fecha_expiracion': '12/2035', 'token_publico': f'nuevo-token{n}',
+        }
+        return httpx.Request('POST', 'http://bench/usuarios/registro', data=datos, headers=headers,
+                             files={'imagen_perfil': ('foto.png', contexto['png'], 'image/png')})
+
+    def registro(i):
+        n = contexto['registrados'] = contexto['registrados'] + 1
+        return solicitud_registro(n)
+
+    # Reintentos de un mismo registro (n = 0): sin clave recorren validaciones y base de datos
+    # hasta fallar por unicidad; con Idempotency-Key reciben la respuesta guardada
+    def reintento(i):
+        return solicitud_registro(0)
+
+    def reintento_idempotente(i):
+        return solicitud_registro(0, headers={'Idempotency-Key': 'bench-reintento'})
+
+    catalogos = ('hobbies', 'tipos-casa', 'preguntas-recuperacion')
+    return {
+        'raiz': (lambda i: httpx.Request('GET', 'http://bench/'), (200,), False),
+        'catalogos': (lambda i: httpx.Request('GET', f'http://bench/catalogos/{catalogos[i % 3]}'), (200,), False),
+        'catalogos_304': (lambda i: httpx.Request('GET', 'http://bench/catalogos/hobbies',
+                                                  headers={'If-None-Match': contexto['etag_hobbies']}), (304,), False),
+        'login': (formulario('/usuarios/login', identificador=lambda i: f'usuario{usuario()}', contrasena=CONTRASENA),
+                  (200,), True),
+        'recuperar_contrasena': (formulario('/usuarios/recuperar-contrasena',
+                                            identificador=lambda i: f'usuario{usuario()}@bench.com'), (200,), False),
+        'restablecer_contrasena': (formulario('/usuarios/restablecer-contrasena',
+                                              identificador=lambda i: str(60000000 + usuario()),
+                                              nueva_contrasena=CONTRASENA, respuesta_recuperacion=RESPUESTA),
+                                   (200,), True),
+        'registro': (registro, (200,), True),
+        # El reintento idempotente va primero: su primera solicitud registra al usuario 0 y la respuesta
+        # guardada es un 200, como cuando la respuesta original se perdió en la red
+        'registro_reintento_idempotente': (reintento_idempotente, (200,), False),
+        'registro_reintento': (reintento, (200, 422), False),
+        'buscar_por_token': (formulario('/usuarios/buscar-por-token', token_publico=lambda i: f'token{usuario()}'),
+                             (200,), False),
+        'validar': (lambda i: httpx.Request('POST', 'http://bench/usuarios/validar', json={
+            'contrasena': 'abc12345', 'telefono': '88887777', 'fecha_nacimiento': '1990-05-17',
+            'numero_tarjeta': '4111111111111111', 'fecha_expiracion': '12/2035', 'username': f'usuario{i}',
+        }), (200,), False),
+        'yo': (lambda i: httpx.Request('GET', 'http://bench/usuarios/yo', headers={
+            'Authorization': f"Bearer {tokens(i)['access_token']}"}), (200,), False),
+        'token_refrescar': (formulario('/usuarios/token/refrescar', refresh_token=lambda i: tokens(i)['refresh_token']),
+                            (200,), False),
+        'logout': (formulario('/usuarios/logout', refresh_token=lambda i: tokens(i)['refresh_token']), (200,), False),
+        'imagen': (lambda i: httpx.Request('GET', f'http://bench/usuarios/{usuario() + 1}/imagen?size=64'), (200,), False),
+        'metrics': (lambda i: httpx.Request('GET', 'http://bench/metrics'), (200,), False),
+    }
+
+
+#================================= PRINCIPAL ================================= #
+
+async def correr(args, carpeta: str) -> list:
+    import main
+    import config
+    from Base_de_Datos.db import async_engine, crear_engine
+    from Servicios.Almacenamiento_Servicio import obtener_almacenamiento
+    from Servicios.Cifrado_Servicio import Cifrado_Servicio
+    from Servicios.Hash_Servicio import pwd_context
+    from Servicios.Imagen_Servicio import Imagen_Servicio
+
+    engine = crear_engine(config.DATABASE_URL)
+    crear_esquema(engine)
+    png = imagen_png()
+    rnd = random.Random(args.semilla)
+    resultados = []
+
+    async with main.app.router.lifespan_context(main.app):
+        async def bloques():
+            yield png
+        clave_imagen = await obtener_almacenamiento().guardar(bloques(), 'png', len(png) + 1)
+        await Imagen_Servicio.generar_miniaturas(clave_imagen)
+        _, _, encabezados = await llamar(main.app, httpx.Request('GET', 'http://bench/catalogos/hobbies'))
+        contexto = {'png': png, 'registrados': 0, 'etag_hobbies': encabezados.get('etag', '')}
+        fijos = {
+            'rol_id': 2, 'imagen_perfil': clave_imagen, 'nombre': 'Usuario', 'apellidos': 'Sintético',
+            'contrasena': pwd_context.hash(CONTRASENA), 'fecha_nacimiento': date(1990, 1, 1), 'domicilio': 'San José',
+            'pregunta_recuperacion_id': 1, 'respuesta_recuperacion': RESPUESTA, 'permitir_huella': 0,
+            'intentos_fallidos': 0, 'estado_cuenta': 'activo', 'nombre_titular': 'Usuario Sintético',
+            'numero_encriptado': Cifrado_Servicio.encriptar('4111111111111111'), 'fecha_expiracion': '12/2035',
+            'marca': 'Visa', 'ultimos_4': '1111',
+        }
+
+        sembrados = 0
+        for escala in sorted(args.escalas):
+            sembrar(engine, sembrados, escala, fijos)
+            sembrados = escala
+            todos = escenarios(escala, contexto, rnd)
+            nombres = args.escenarios or list(todos)
+            desconocidos = set(nombres) - set(todos)
+            if desconocidos:
+                raise SystemExit(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+            for concurrencia in args.concurrencia:
+                for nombre in nombres:
+                    construir, esperados, usa_bcrypt = todos[nombre]
+                    total = args.peticiones_bcrypt if usa_bcrypt else args.peticiones
+                    medicion = await ejecutar(main.app, construir, total, concurrencia, esperados)
+                    resultado = {'id': f'{escala}/{nombre}/c{concurrencia}', 'escala': escala, 'escenario': nombre,
+                                 'concurrencia': concurrencia, **medicion}
+                    resultados.append(resultado)
+                    print(f"{escala:>8} {nombre:<24} c={concurrencia:<4} {medicion['rps']:>9.1f} req/s  "
+                          f"p50 {medicion['p50_ms']:>8.2f}  p95 {medicion['p95_ms']:>8.2f}  "
+                          f"p99 {medicion['p99_ms']:>8.2f} ms  errores {medicion['errores']}")
+    # Sin esto los hilos de aiosqlite impiden que el proceso termine
+    await async_engine.dispose()
+    engine.dispose()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    lista_enteros = lambda texto: [int(v) for v in texto.split(',') if v.strip()]
+    parser.add_argument("--escalas", type=lista_enteros, default=[10000], help="Usuarios sembrados (p. ej. 10000,100000,1000000)")
+    parser.add_argument("--concurrencia", type=lista_enteros, default=[32], help="Solicitudes simultáneas (lista)")
+    parser.add_argument("--escenarios", type=lambda t: [v for v in t.split(',') if v.strip()], default=None)
+    parser.add_argument("--peticiones", type=int, default=2000, help="Solicitudes por escenario")
+    parser.add_argument("--peticiones-bcrypt", type=int, default=100, help="Solicitudes por escenario con bcrypt")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default="resultados_endpoints.json")
+    args = parser.parse_args()
+
+    carpeta = tempfile.mkdtemp(prefix='bench_endpoints_')
+    # La API se importa después de apuntar la configuración a la carpeta temporal
+    preparar_entorno(carpeta, LIMITE_TASA_ACTIVO=0)
+    resultados = asyncio.run(correr(args, carpeta))
+    parametros = {k: v for k, v in vars(args).items() if k != 'salida'}
+    guardar_json(args.salida, parametros, resultados)
+    print(f"resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Prueba de carga del limitador de tasa de las rutas de autenticación.
+
+Simula un ataque de fuerza bruta contra /usuarios/login llamando directamente al middleware ASGI
+(sin red) y mide cuánto cuesta cada solicitud rechazada en dos escenarios:
+  - ip:            muchas solicitudes desde una misma IP (se rechaza sin leer el cuerpo).
+  - identificador: muchas IPs contra una misma cuenta (se lee el formulario y se rechaza).
+
+Como referencia se mide una verificación bcrypt, que es lo que costaría cada solicitud sin el limitador.
+Termina con código 1 si el p99 de una solicitud rechazada supera --umbral-ms (1 ms por defecto).
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_limitador --peticiones 20000 --concurrencia 64
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from urllib.parse import urlencode
+
+from passlib.context import CryptContext
+
+from Middlewares.Limitador_Middleware import Limitador_Middleware
+
+
+# Aplicación que reemplaza a la API: cuenta las solicitudes que dejó pasar el limitador
+class AplicacionContador:
+    def __init__(self):
+        self.atendidas = 0
+
+    async def __call__(self, scope, receive, send):
+        self.atendidas += 1
+        await receive()
+        await send({'type': 'http.response.start', 'status': 401, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+# Construir el scope y el receive de una solicitud de login
+def solicitud(ip: str, identificador: str):
+    cuerpo = urlencode({'identificador': identificador, 'contrasena': 'intento-fallido'}).encode()
+    scope = {
+        'type': 'http',
+        'method': 'POST',
+        'path': '/usuarios/login',
+        'client': (ip, 50000),
+        'headers': [(b'content-type', b'application/x-www-form-urlencoded')],
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': cuerpo, 'more_body': False}
+
+    return scope, receive
+
+
+# Ejecutar el ataque y devolver las latencias (segundos) de las solicitudes rechazadas
+async def atacar(middleware, peticiones: int, concurrencia: int, generar) -> list:
+    rechazadas = []
+
+    async def trabajador(indices):
+        for i in indices:
+            scope, receive = generar(i)
+            estado = []
+
+            async def send(mensaje):
+                if mensaje['type'] == 'http.response.start':
+                    estado.append(mensaje['status'])
+
+            inicio = time.perf_counter()
+            await middleware(scope, receive, send)
+            if estado == [429]:
+                rechazadas.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(trabajador(range(t, peticiones, concurrencia)) for t in range(concurrencia)))
+    return rechazadas
+
+
+# Percentil de una lista de valores
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peticiones", type=int, default=20000)
+    parser.add_argument("--concurrencia", type=int, default=64)
+    parser.add_argument("--umbral-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    escenarios = {
+        'ip': lambda i: solicitud('203.0.113.7', f'usuario{i}'),
+        'identificador': lambda i: solicitud(f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}', 'victima@correo.com'),
+    }
+
+    bcrypt = CryptContext(schemes=["bcrypt"])
+    hash_referencia = bcrypt.hash('contrasena-correcta')
+    inicio = time.perf_counter()
+    bcrypt.verify('intento-fallido', hash_referencia)
+    costo_bcrypt = time.perf_counter() - inicio
+    print(f"referencia: una verificación bcrypt cuesta {costo_bcrypt * 1000:.1f} ms de CPU")
+
+    aprobado = True
+    for nombre, generar in escenarios.items():
+        aplicacion = AplicacionContador()
+        middleware = Limitador_Middleware(aplicacion, limite_ip='30/60', limite_identificador='5/300')
+        rechazadas = asyncio.run(atacar(middleware, args.peticiones, args.concurrencia, generar))
+        p50, p99 = percentil(rechazadas, 0.50), percentil(rechazadas, 0.99)
+        print(f"{nombre:>13}: {len(rechazadas)} rechazadas, {aplicacion.atendidas} atendidas | "
+              f"media {statistics.mean(rechazadas) * 1e6:.0f} µs  p50 {p50 * 1e6:.0f} µs  p99 {p99 * 1e6:.0f} µs")
+        aprobado &= p99 * 1000 < args.umbral_ms
+
+    print("OK" if aprobado else f"FALLA: p99 por encima de {args.umbral_ms} ms")
+    sys.exit(0 if aprobado else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Micro-benchmarks de los validadores y utilidades de Usuario_Servicio.
+
+Cada caso se mide con timeit (autorange + repeticiones, se toma la mejor) y se reporta en µs por
+operación. Incluye una verificación bcrypt como referencia del costo dominante del login.
+Los resultados se guardan en JSON con el mismo formato que bench_endpoints, para comparar
+entre commits con: python -m benchmarks.comparar base.json nuevo.json
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_micro --repeticiones 5 --salida micro.json
+"""
+import argparse
+import tempfile
+import timeit
+
+from benchmarks.comun import guardar_json, preparar_entorno
+
+
+# Casos: nombre -> función sin argumentos
+def casos() -> dict:
+    from sqlalchemy.exc import IntegrityError
+
+    from Servicios.Cifrado_Servicio import Cifrado_Servicio
+    from Servicios.Hash_Servicio import pwd_context
+    from Servicios.Obscenidad_Servicio import Obscenidad_Servicio
+    from Servicios.Reglas_Validacion import REGLAS_REGISTRO
+    from Servicios.Tarjeta_Servicio import Tarjeta_Servicio
+    from Servicios.Token_Servicio import Token_Servicio
+    from Servicios.Usuario_Servicio import Usuario_Servicio
+
+    Cifrado_Servicio.cargar()
+    Obscenidad_Servicio.cargar()
+    Tarjeta_Servicio.cargar()
+    Token_Servicio.cargar()
+
+    formulario_valido = {
+        'nombre': 'Ana', 'apellidos': 'Pérez Mora', 'username': 'ana.perez', 'contrasena': 'abc12345',
+        'telefono': '88887777', 'fecha_nacimiento': '1990-05-17', 'respuesta_recuperacion': 'saprissa',
+        'nombre_titular': 'Ana Pérez', 'numero_tarjeta': '4111111111111111', 'fecha_expiracion': '12/2035',
+    }
+    formulario_invalido = {
+        'contrasena': 'corta', 'telefono': '8888-7777', 'fecha_nacimiento': '17/05/1990',
+        'numero_tarjeta': '4111111111111112', 'fecha_expiracion': '13/2030', 'nombre_titular': '  ',
+    }
+    usuario = {'id': 1, 'username': 'ana.perez', 'correo': 'ana@correo.com', 'telefono': '88887777',
+               'nombre': 'Ana', 'apellidos': 'Pérez Mora', 'rol_id': 2, 'estado_cuenta': 'activo'}
+    tokens = Token_Servicio.emitir(usuario)
+    cifrado = Cifrado_Servicio.encriptar('4111111111111111')
+    error_integridad = IntegrityError('INSERT', {}, Exception('UNIQUE constraint failed: usuario.correo'))
+    hash_bcrypt = pwd_context.hash('abc12345')
+
+    class Fila:
+        # Objeto con atributos, como una fila de CONSULTA_SESION
+        def __init__(self, datos):
+            self.__dict__.update(datos)
+    fila_sesion = Fila(usuario)
+
+    def validar(funcion, *args):
+        return lambda: funcion(*args, {})
+
+    return {
+        'clasificar_identificador_correo': lambda: Usuario_Servicio._clasificar_identificador('ana@correo.com'),
+        'clasificar_identificador_telefono': lambda: Usuario_Servicio._clasificar_identificador('88887777'),
+        'clasificar_identificador_username': lambda: Usuario_Servicio._clasificar_identificador('ana.perez'),
+        'validar_contrasena_registro': validar(Usuario_Servicio._validar_contrasena_registro, 'abc12345'),
+        'validar_telefono': validar(Usuario_Servicio._validar_telefono, '88887777'),
+        'validar_fecha_nacimiento': validar(Usuario_Servicio._validar_fecha_nacimiento, '1990-05-17'),
+        'validar_tarjeta': validar(Usuario_Servicio._validar_tarjeta, '4111111111111111', '12/2035', 'Ana Pérez'),
+        'validar_nombres_obscenos': validar(Usuario_Servicio._validar_nombres_obscenos, 'Ana', 'Pérez Mora', 'ana.perez'),
+        'validar_respuesta_recuperacion': validar(Usuario_Servicio._validar_respuesta_recuperacion, 'saprissa'),
+        'validar_campos_formulario_valido': lambda: Usuario_Servicio.validar_campos(formulario_valido),
+        'reglas_formulario_invalido': lambda: REGLAS_REGISTRO.validar(formulario_invalido),
+        'calcular_marca_y_ultimos4': lambda: Usuario_Servicio._calcular_marca_y_ultimos4('4111111111111111'),
+        'luhn': lambda: Tarjeta_Servicio.luhn('4111111111111111'),
+        'encriptar_tarjeta': lambda: Usuario_Servicio._encriptar_tarjeta('4111111111111111'),
+        'desencriptar_tarjeta': lambda: Cifrado_Servicio.desencriptar(cifrado),
+        'datos_sesion': lambda: Usuario_Servicio._datos_sesion(fila_sesion),
+        'errores_integridad': lambda: Usuario_Servicio._errores_integridad(error_integridad),
+        'token_emitir': lambda: Token_Servicio.emitir(usuario),
+        'token_verificar': lambda: Token_Servicio.verificar(tokens['access_token'], 'acceso'),
+        'bcrypt_verificar': lambda: pwd_context.verify('abc12345', hash_bcrypt),
+    }
+
+
+# Medir un caso
+def medir(funcion, repeticiones: int) -> float:
+    """
+    Devuelve los µs por operación de la mejor repetición.
+    """
+    temporizador = timeit.Timer(funcion)
+    numero, _ = temporizador.autorange()
+    return min(temporizador.repeat(repeticiones, numero)) / numero * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--filtro", default="", help="Solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--salida", default="resultados_micro.json")
+    args = parser.parse_args()
+
+    # Las claves se generan en una carpeta temporal (se importa la API después de configurarla)
+    preparar_entorno(tempfile.mkdtemp(prefix='bench_micro_'))
+    resultados = []
+    for nombre, funcion in casos().items():
+        if args.filtro not in nombre:
+            continue
+        us = medir(funcion, args.repeticiones)
+        resultados.append({'id': f'micro/{nombre}', 'nombre': nombre, 'us_por_op': round(us, 3)})
+        print(f"{nombre:<36} {us:>12.3f} µs/op")
+    guardar_json(args.salida, vars(args), resultados)
+    print(f"resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
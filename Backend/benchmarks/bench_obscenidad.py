@@ -0,0 +1,95 @@
+"""
+Micro-benchmark del filtro de palabras no permitidas.
+
+Compara la búsqueda ingenua anterior (`any(pal in valor.lower() for pal in PALABRAS)` por campo)
+con el autómata de Aho-Corasick de Obscenidad_Servicio, usando una lista de palabras sintética.
+Antes verifica con la lista real (Servicios/datos/palabras_obscenas.txt) que los nombres de
+VALIDOS se acepten y los textos de NO_VALIDOS se rechacen; termina con código 1 si alguno falla.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_obscenidad --palabras 10000 --registros 2000
+"""
+import argparse
+import random
+import string
+import sys
+import time
+
+from Servicios.Obscenidad_Servicio import FiltroObscenidad, Obscenidad_Servicio
+
+# Textos que la lista real debe aceptar (contienen una palabra de la lista sin la ñ, u otra letra con tilde)
+VALIDOS = ['Conocido', 'Reconocimiento', 'CONOCIMIENTO', 'Peña', 'Muñoz', 'Ñoño', 'Pera', 'Picadillo']
+
+# Textos que la lista real debe rechazar (mayúsculas, tildes, leetspeak y letras repetidas)
+NO_VALIDOS = ['coño', 'COÑO', 'c0ño', 'cooñoo', 'puuuta', 'Pütä', 'p3rr4', 'mi usuario es cabrón']
+
+
+# Generar palabras y registros sintéticos
+def generar(cantidad_palabras: int, cantidad_registros: int, semilla: int = 42):
+    """
+    Devuelve una lista de palabras aleatorias y registros (nombre, apellidos, username).
+    """
+    rnd = random.Random(semilla)
+    palabra = lambda a, b: ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(a, b)))
+    palabras = {palabra(5, 10) for _ in range(cantidad_palabras)}
+    registros = [
+        {'nombre': palabra(4, 10).title(), 'apellidos': f'{palabra(5, 10)} {palabra(5, 10)}'.title(),
+         'username': palabra(6, 12) + str(rnd.randint(0, 999))}
+        for _ in range(cantidad_registros)
+    ]
+    return sorted(palabras), registros
+
+
+# Verificar la lista real de palabras
+def verificar() -> int:
+    """
+    Imprime una línea por texto y devuelve la cantidad de resultados distintos de lo esperado.
+    """
+    Obscenidad_Servicio.cargar()
+    filtro = Obscenidad_Servicio.obtener()
+    fallos = 0
+    for texto, esperado in [(t, True) for t in VALIDOS] + [(t, False) for t in NO_VALIDOS]:
+        aceptado = not filtro.campos_con_coincidencias({'valor': texto})
+        fallos += aceptado != esperado
+        print(f"[{'ok' if aceptado == esperado else 'DIFERENTE'}] {'acepta' if aceptado else 'rechaza'} {texto!r}")
+    return fallos
+
+
+# Medir registros por segundo
+def medir(funcion, registros) -> float:
+    inicio = time.perf_counter()
+    for registro in registros:
+        funcion(registro)
+    return len(registros) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--palabras", type=int, default=10000)
+    parser.add_argument("--registros", type=int, default=2000)
+    args = parser.parse_args()
+
+    fallos = verificar()
+    palabras, registros = generar(args.palabras, args.registros)
+
+    inicio = time.perf_counter()
+    filtro = FiltroObscenidad(palabras)
+    construccion = time.perf_counter() - inicio
+
+    def ingenua(registro):
+        return {c for c, v in registro.items() if any(p in v.lower() for p in palabras)}
+
+    # La búsqueda ingenua es mucho más lenta, se mide sobre una muestra
+    muestra = registros[:max(1, len(registros) // 10)]
+    rps_ingenua = medir(ingenua, muestra)
+    rps_automata = medir(filtro.campos_con_coincidencias, registros)
+
+    print(f"palabras: {len(palabras)}  construcción del autómata: {construccion * 1000:.1f} ms "
+          f"({len(filtro._transiciones)} estados)")
+    print(f"ingenua:  {rps_ingenua:>10.0f} registros/s (3 campos por registro)")
+    print(f"autómata: {rps_automata:>10.0f} registros/s (3 campos por registro)")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
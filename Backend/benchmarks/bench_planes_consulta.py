@@ -0,0 +1,91 @@
+"""
+Planes de consulta de las búsquedas de usuario por identificador.
+
+Crea una base temporal con las migraciones de Alembic (los índices reales, no los de create_all),
+ejecuta cada camino de búsqueda (login por correo, teléfono y nombre de usuario, el reintento por
+nombre de usuario y la búsqueda por token público), captura las sentencias que llegan al motor y
+corre EXPLAIN QUERY PLAN sobre cada una con sus parámetros. Termina con código 1 si algún plan
+recorre la tabla usuario completa (SCAN usuario) en lugar de buscar por un índice.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_planes_consulta
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from Servicios.Token_Servicio import Token_Servicio
+from Servicios.Usuario_Servicio import Usuario_Servicio
+from benchmarks.bench_db_concurrencia import preparar_base
+
+# Recorrido completo de la tabla usuario (SQLite < 3.36 escribe "SCAN TABLE usuario")
+RECORRIDO_COMPLETO = re.compile(r'\bSCAN (TABLE )?usuario\b')
+
+# Caminos de búsqueda: nombre -> llamada (usuario1 existe en la base sembrada)
+CAMINOS = {
+    'correo': lambda db: Usuario_Servicio._validar_identificador(db, 'usuario1@correo.com', {}, Usuario_Servicio.CONSULTA_LOGIN),
+    'telefono': lambda db: Usuario_Servicio._validar_identificador(db, '80000001', {}, Usuario_Servicio.CONSULTA_LOGIN),
+    'username': lambda db: Usuario_Servicio._validar_identificador(db, 'usuario1', {}, Usuario_Servicio.CONSULTA_LOGIN),
+    'username con @ (reintento)': lambda db: Usuario_Servicio._validar_identificador(db, 'no@existe', {}, Usuario_Servicio.CONSULTA_LOGIN),
+    'token_publico': lambda db: Usuario_Servicio.buscar_por_token_publico(db, 'token1'),
+}
+
+
+# Crear el esquema con las migraciones
+def migrar(ruta: str):
+    configuracion = Config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alembic.ini'))
+    configuracion.set_main_option('sqlalchemy.url', f'sqlite:///{ruta}')
+    command.upgrade(configuracion, 'head')
+
+
+async def main():
+    ruta = os.path.join(tempfile.mkdtemp(), "planes.db")
+    migrar(ruta)
+    preparar_base(ruta, 100)
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("UPDATE usuario SET token_publico = 'token1' WHERE id = 2")
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    sentencias = []
+    event.listen(async_engine.sync_engine, 'before_cursor_execute',
+                 lambda conn, cursor, sql, parametros, contexto, executemany: sentencias.append((sql, parametros)))
+    Token_Servicio._secreto = os.urandom(32)
+
+    capturadas = {}
+    try:
+        for nombre, llamada in CAMINOS.items():
+            sentencias.clear()
+            async with AsyncSessionLocal() as db:
+                await llamada(db)
+            capturadas[nombre] = [(sql, parametros) for sql, parametros in sentencias if sql.lstrip().upper().startswith('SELECT')]
+    finally:
+        await async_engine.dispose()
+
+    fallos = 0
+    with sqlite3.connect(ruta) as conexion:
+        for nombre, consultas in capturadas.items():
+            if not consultas:
+                fallos += 1
+                print(f"[SIN CONSULTAS] {nombre}")
+                continue
+            for sql, parametros in consultas:
+                plan = [fila[-1] for fila in conexion.execute(f'EXPLAIN QUERY PLAN {sql}', parametros)]
+                correcto = not any(RECORRIDO_COMPLETO.search(paso) for paso in plan)
+                fallos += not correcto
+                print(f"[{'ok' if correcto else 'RECORRIDO COMPLETO'}] {nombre}: {' '.join(sql.split())}")
+                for paso in plan:
+                    print(f"    {paso}")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
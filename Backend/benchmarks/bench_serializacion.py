@@ -0,0 +1,120 @@
+"""
+Benchmark del costo de serialización por respuesta.
+
+Compara, para la respuesta del login (usuario + tokens) y un catálogo:
+  - antes:   dict sin response_model -> jsonable_encoder + json.dumps (JSONResponse por defecto).
+  - despues: response_model de Esquemas/ (pydantic-core) + orjson (ORJSONResponse).
+Se mide la serialización sola y una solicitud completa por ASGI (sin red) a una app mínima.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_serializacion --respuestas 50000
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+import orjson
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from Esquemas.Usuario_Esquemas import LoginRespuesta
+from Esquemas.Catalogos_Esquemas import ElementoCatalogo
+
+LOGIN = {
+    'id': 1, 'username': 'juan1', 'correo': 'juan@correo.com', 'telefono': '88887777', 'nombre': 'Juan',
+    'apellidos': 'Pérez Mora', 'rol_id': 2, 'estado_cuenta': 'activo',
+    'access_token': 'a' * 180, 'refresh_token': 'r' * 160, 'token_type': 'bearer', 'expires_in': 900,
+}
+CATALOGO = [{'id': i, 'nombre': f'Elemento número {i}'} for i in range(1, 51)]
+
+
+# Serialización como la hacía FastAPI sin response_model
+def serializar_antes(contenido) -> bytes:
+    return json.dumps(jsonable_encoder(contenido), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(',', ':')).encode('utf-8')
+
+
+# Serialización con el modelo de respuesta y orjson
+def serializador_despues(modelo):
+    adaptador = TypeAdapter(modelo)
+
+    def serializar(contenido) -> bytes:
+        return orjson.dumps(adaptador.dump_python(adaptador.validate_python(contenido), mode='json'))
+    return serializar
+
+
+# App mínima con las dos variantes de la misma ruta
+def crear_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/antes/login', response_class=JSONResponse)
+    async def login_antes():
+        return LOGIN
+
+    @app.get('/despues/login', response_model=LoginRespuesta, response_class=ORJSONResponse)
+    async def login_despues():
+        return LOGIN
+
+    @app.get('/antes/catalogo', response_class=JSONResponse)
+    async def catalogo_antes():
+        return CATALOGO
+
+    @app.get('/despues/catalogo', response_model=List[ElementoCatalogo], response_class=ORJSONResponse)
+    async def catalogo_despues():
+        return CATALOGO
+
+    return app
+
+
+# Solicitudes por segundo llamando a la app por ASGI
+async def solicitudes_por_segundo(app, ruta: str, cantidad: int) -> float:
+    scope = {'type': 'http', 'method': 'GET', 'path': ruta, 'raw_path': ruta.encode(), 'query_string': b'',
+             'headers': [], 'http_version': '1.1', 'scheme': 'http', 'server': ('test', 80), 'client': ('c', 1),
+             'root_path': ''}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(mensaje):
+        pass
+
+    inicio = time.perf_counter()
+    for _ in range(cantidad):
+        await app(dict(scope), receive, send)
+    return cantidad / (time.perf_counter() - inicio)
+
+
+# Medir operaciones por segundo
+def medir(funcion, contenido, cantidad: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(cantidad):
+        funcion(contenido)
+    return cantidad / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--respuestas", type=int, default=50000)
+    args = parser.parse_args()
+    n = args.respuestas
+
+    casos = {'login': (LOGIN, LoginRespuesta), 'catálogo (50)': (CATALOGO, List[ElementoCatalogo])}
+    for nombre, (contenido, modelo) in casos.items():
+        despues = serializador_despues(modelo)
+        assert json.loads(serializar_antes(contenido)) == json.loads(despues(contenido))
+        a, d = medir(serializar_antes, contenido, n), medir(despues, contenido, n)
+        print(f"serialización {nombre:>14}: antes {1e6 / a:6.1f} µs  después {1e6 / d:6.1f} µs  (x{d / a:.2f})")
+
+    app = crear_app()
+    for nombre in ('login', 'catalogo'):
+        a = asyncio.run(solicitudes_por_segundo(app, f'/antes/{nombre}', n // 5))
+        d = asyncio.run(solicitudes_por_segundo(app, f'/despues/{nombre}', n // 5))
+        print(f"solicitud ASGI {nombre:>13}: antes {1e6 / a:6.1f} µs  después {1e6 / d:6.1f} µs  (x{d / a:.2f})")
+
+
+if __name__ == "__main__":
+    main()
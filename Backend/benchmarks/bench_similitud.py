@@ -0,0 +1,166 @@
+"""
+Benchmark de "usuarios parecidos": índice de bitmaps en memoria contra el JOIN equivalente en SQL.
+
+Siembra una base SQLite temporal con usuarios que eligen al azar entre 1 y 4 hobbies y entre 1 y 2
+tipos de casa, construye el índice como en el arranque (Similitud_Servicio.cargar) y mide la
+latencia del top-k por Jaccard para usuarios al azar con el índice y con la consulta SQL (auto-JOIN
+de las tablas de asociación, agrupado por usuario). Verifica que ambos devuelvan los mismos usuarios
+y puntajes; termina con código 1 si alguno difiere.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_similitud --usuarios 1000000 --consultas 500 --consultas-sql 10
+    python -m benchmarks.bench_similitud --usuarios 200000 --hobbies 30 --salida similitud.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from Modelos import Base
+from Modelos.Usuario import Usuario  # noqa: F401 (necesario para crear el esquema)
+from Modelos.Roles import Rol  # noqa: F401
+from Modelos.TipoCasa import TipoCasa  # noqa: F401
+from Modelos.PreguntaRecuperacion import PreguntaRecuperacion  # noqa: F401
+from Modelos.Hobby import Hobby  # noqa: F401
+from Modelos.UsuarioTipoCasa import UsuarioTipoCasa  # noqa: F401
+from Servicios.Similitud_Servicio import Similitud_Servicio
+from benchmarks.comun import guardar_json, resumen_latencias
+
+# Top-k por Jaccard con SQL: coincidencias por usuario (JOIN contra las características del usuario)
+# y cantidad de características de cada candidato
+CONSULTA_SQL = text("""
+    WITH c AS (
+        SELECT usuario_id, 'h' || hobby_id AS f FROM usuario_hobbies
+        UNION ALL
+        SELECT usuario_id, 't' || tipo_casa_id AS f FROM usuario_tipos_casa
+    ),
+    yo AS (SELECT f FROM c WHERE usuario_id = :u),
+    comun AS (
+        SELECT c.usuario_id, COUNT(*) AS n FROM c JOIN yo ON c.f = yo.f
+        WHERE c.usuario_id != :u GROUP BY c.usuario_id
+    ),
+    tam AS (SELECT usuario_id, COUNT(*) AS t FROM c GROUP BY usuario_id)
+    SELECT comun.usuario_id, comun.n, CAST(comun.n AS REAL) / ((SELECT COUNT(*) FROM yo) + tam.t - comun.n) AS j
+    FROM comun JOIN tam ON tam.usuario_id = comun.usuario_id
+    ORDER BY j DESC, comun.usuario_id
+    LIMIT :k
+""")
+
+# Usuarios con sus columnas obligatorias, generados en SQLite (más rápido que un executemany de dicts)
+SEMBRAR_USUARIOS = text("""
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :cantidad)
+    INSERT INTO usuario (id, rol_id, imagen_perfil, nombre, apellidos, correo, username, contrasena, telefono,
+                         fecha_nacimiento, domicilio, pregunta_recuperacion_id, respuesta_recuperacion,
+                         permitir_huella, intentos_fallidos, estado_cuenta, nombre_titular, numero_encriptado,
+                         fecha_expiracion, marca, ultimos_4)
+    SELECT i, 2, '', 'Nombre', 'Apellidos', 'usuario' || i || '@correo.com', 'usuario' || i, 'x', 80000000 + i,
+           '2000-01-01', '', 1, 'r', 0, 0, 'activo', 'T', 'x', '12/2030', 'Visa', '1111'
+    FROM n
+""")
+
+
+# Crear y poblar la base de datos temporal
+def preparar_base(ruta: str, cantidad_usuarios: int, hobbies: int, tipos_casa: int, semilla: int):
+    """
+    Crea el esquema, los catálogos y `cantidad_usuarios` usuarios con hobbies y tipos de casa al azar.
+    """
+    rnd = random.Random(semilla)
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO roles (id, nombre) VALUES (2, 'usuario')")
+        conn.exec_driver_sql("INSERT INTO preguntas_recuperacion (id, texto) VALUES (1, 'pregunta')")
+        conn.exec_driver_sql("INSERT INTO hobbies (id, nombre) VALUES (?, ?)", [(h, f'hobby{h}') for h in range(1, hobbies + 1)])
+        conn.exec_driver_sql("INSERT INTO tipos_casa (id, nombre) VALUES (?, ?)", [(t, f'tipo{t}') for t in range(1, tipos_casa + 1)])
+        conn.execute(SEMBRAR_USUARIOS, {'cantidad': cantidad_usuarios})
+        for inicio in range(1, cantidad_usuarios + 1, 100000):
+            usuarios = range(inicio, min(inicio + 100000, cantidad_usuarios + 1))
+            conn.exec_driver_sql("INSERT INTO usuario_hobbies (usuario_id, hobby_id) VALUES (?, ?)", [
+                (u, h) for u in usuarios for h in rnd.sample(range(1, hobbies + 1), rnd.randint(1, min(4, hobbies)))
+            ])
+            conn.exec_driver_sql("INSERT INTO usuario_tipos_casa (usuario_id, tipo_casa_id) VALUES (?, ?)", [
+                (u, t) for u in usuarios for t in rnd.sample(range(1, tipos_casa + 1), rnd.randint(1, min(2, tipos_casa)))
+            ])
+    engine.dispose()
+
+
+# Tamaño del índice en memoria
+def tamano_indice_mb(indice) -> float:
+    bitmaps = list(indice.caracteristicas.values()) + list(indice.por_tamano.values()) + [indice.presentes]
+    return sum(sys.getsizeof(b) for b in bitmaps) / 1024 / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=100000)
+    parser.add_argument("--hobbies", type=int, default=5, help="Hobbies del catálogo (el predeterminado tiene 5)")
+    parser.add_argument("--tipos-casa", type=int, default=3, help="Tipos de casa del catálogo (el predeterminado tiene 3)")
+    parser.add_argument("--consultas", type=int, default=500, help="Consultas con el índice")
+    parser.add_argument("--consultas-sql", type=int, default=10, help="Consultas SQL (también se comparan con el índice)")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", help="Guardar los resultados en JSON (para benchmarks.comparar)")
+    args = parser.parse_args()
+
+    carpeta = tempfile.mkdtemp()
+    ruta = os.path.join(carpeta, "similitud.db")
+    inicio = time.perf_counter()
+    preparar_base(ruta, args.usuarios, args.hobbies, args.tipos_casa, args.semilla)
+    print(f"sembrados {args.usuarios} usuarios en {time.perf_counter() - inicio:.1f} s")
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    rnd = random.Random(args.semilla)
+    diferencias = 0
+    try:
+        inicio = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await Similitud_Servicio.cargar(db)
+        construccion = time.perf_counter() - inicio
+        indice = Similitud_Servicio._indice
+        print(f"índice construido en {construccion:.2f} s  ({tamano_indice_mb(indice):.2f} MB, "
+              f"{len(indice.caracteristicas)} características)")
+
+        latencias_indice = []
+        for _ in range(args.consultas):
+            usuario_id = rnd.randint(1, args.usuarios)
+            inicio = time.perf_counter()
+            indice.similares(usuario_id, args.k)
+            latencias_indice.append(time.perf_counter() - inicio)
+
+        latencias_sql = []
+        async with async_engine.connect() as conexion:
+            for _ in range(args.consultas_sql):
+                usuario_id = rnd.randint(1, args.usuarios)
+                inicio = time.perf_counter()
+                filas = (await conexion.execute(CONSULTA_SQL, {'u': usuario_id, 'k': args.k})).all()
+                latencias_sql.append(time.perf_counter() - inicio)
+                esperado = [(fila[0], fila[1], round(fila[2], 9)) for fila in filas]
+                obtenido = [(uid, en_comun, round(jaccard, 9)) for uid, en_comun, jaccard in indice.similares(usuario_id, args.k)]
+                if obtenido != esperado:
+                    diferencias += 1
+                    print(f"  DIFERENCIA usuario {usuario_id}: índice {obtenido} / SQL {esperado}")
+    finally:
+        await async_engine.dispose()
+
+    resultados = []
+    for nombre, latencias in (('indice', latencias_indice), ('sql', latencias_sql)):
+        resumen = resumen_latencias(latencias)
+        resultados.append({'id': f'similitud_{nombre}_{args.usuarios}', **resumen})
+        print(f"{nombre:>7}  p50 {resumen['p50_ms']:>10.3f}  p95 {resumen['p95_ms']:>10.3f}  máx {resumen['max_ms']:>10.3f} ms"
+              f"  ({len(latencias)} consultas)")
+    print(f"resultados {'idénticos' if not diferencias else f'distintos en {diferencias} consultas'}")
+    if args.salida:
+        guardar_json(args.salida, vars(args), resultados + [{'id': 'similitud_construccion', 'p50_ms': round(construccion * 1000, 1)}])
+        print(f"resultados guardados en {args.salida}")
+    sys.exit(1 if diferencias else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
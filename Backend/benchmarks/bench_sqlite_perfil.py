@@ -0,0 +1,97 @@
+"""
+Benchmark de lecturas durante una tormenta de escrituras (logins fallidos).
+
+Compara el engine SQLite por defecto (journal en modo rollback) con el perfil ajustado de
+Base_de_Datos.db.crear_engine (WAL, synchronous=NORMAL, busy_timeout, mmap, cache y pool).
+Varios hilos actualizan `intentos_fallidos` con un commit por operación mientras otros leen usuarios.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_sqlite_perfil --segundos 5 --escritores 4 --lectores 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.exc import OperationalError
+
+from Base_de_Datos.db import crear_engine
+from Modelos.Usuario import Usuario
+from benchmarks.bench_db_concurrencia import preparar_base
+
+
+# Ejecutar la tormenta de escrituras con lectores concurrentes
+def ejecutar(engine, segundos: float, escritores: int, lectores: int, cantidad_usuarios: int) -> dict:
+    """
+    Devuelve lecturas/s, escrituras/s y errores por bloqueo durante `segundos`.
+    """
+    fin = time.perf_counter() + segundos
+    contadores = {'lecturas': 0, 'escrituras': 0, 'errores': 0}
+    lock = threading.Lock()
+
+    def sumar(clave):
+        with lock:
+            contadores[clave] += 1
+
+    def escritor():
+        while time.perf_counter() < fin:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(update(Usuario.__table__)
+                                 .where(Usuario.__table__.c.id == random.randint(1, cantidad_usuarios))
+                                 .values(intentos_fallidos=Usuario.__table__.c.intentos_fallidos + 1))
+                sumar('escrituras')
+            except OperationalError:
+                sumar('errores')
+
+    def lector():
+        while time.perf_counter() < fin:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(select(Usuario.__table__)
+                                 .where(Usuario.__table__.c.username == f"usuario{random.randrange(cantidad_usuarios)}")).first()
+                sumar('lecturas')
+            except OperationalError:
+                sumar('errores')
+
+    hilos = [threading.Thread(target=escritor) for _ in range(escritores)]
+    hilos += [threading.Thread(target=lector) for _ in range(lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return {
+        'lecturas/s': contadores['lecturas'] / segundos,
+        'escrituras/s': contadores['escrituras'] / segundos,
+        'errores': contadores['errores'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=5000)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--lectores", type=int, default=8)
+    args = parser.parse_args()
+
+    perfiles = {
+        'predeterminado': lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        'ajustado': crear_engine,
+    }
+    print(f"{'perfil':>15} {'lecturas/s':>12} {'escrituras/s':>13} {'errores':>8}")
+    for nombre, fabrica in perfiles.items():
+        # Cada perfil usa su propio archivo (journal_mode=WAL es persistente)
+        ruta = os.path.join(tempfile.mkdtemp(), "bench.db")
+        preparar_base(ruta, args.usuarios)
+        engine = fabrica(f"sqlite:///{ruta}")
+        r = ejecutar(engine, args.segundos, args.escritores, args.lectores, args.usuarios)
+        engine.dispose()
+        print(f"{nombre:>15} {r['lecturas/s']:>12.0f} {r['escrituras/s']:>13.0f} {r['errores']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark de las validaciones de campos del registro.
+
+Compara los validadores anteriores de Usuario_Servicio (expresiones sin compilar e `import` dentro de
+cada llamada) con el motor de reglas precompiladas de Reglas_Validacion, sobre los mismos campos:
+contraseña, teléfono, fecha de nacimiento, respuesta de recuperación y datos de la tarjeta.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.bench_validacion --registros 50000
+"""
+import argparse
+import random
+import time
+
+from Servicios.Reglas_Validacion import REGLAS_REGISTRO
+
+CAMPOS = ('contrasena', 'telefono', 'fecha_nacimiento', 'respuesta_recuperacion',
+          'nombre_titular', 'numero_tarjeta', 'fecha_expiracion')
+
+
+# Validadores tal como estaban antes del motor de reglas
+def validar_antes(datos: dict) -> dict:
+    import re
+    errores = {}
+    contrasena = datos['contrasena']
+    if len(contrasena) < 8 or not re.search(r'[A-Za-z]', contrasena) or not re.search(r'\d', contrasena):
+        errores['contrasena'] = 'La contraseña debe tener al menos 8 caracteres y ser alfanumérica.'
+    if datos['telefono'] is None or not str(datos['telefono']).isdigit():
+        errores['telefono'] = 'El teléfono debe contener solo caracteres numéricos.'
+    from datetime import datetime
+    if datos['fecha_nacimiento']:
+        try:
+            datetime.strptime(datos['fecha_nacimiento'], '%Y-%m-%d').date()
+        except Exception:
+            errores['fecha_nacimiento'] = 'El formato de la fecha debe ser YYYY-MM-DD.'
+    if not datos['respuesta_recuperacion']:
+        errores['respuesta_recuperacion'] = 'La respuesta de recuperación es obligatoria.'
+    nombre_titular, numero_tarjeta, fecha_expiracion = datos['nombre_titular'], datos['numero_tarjeta'], datos['fecha_expiracion']
+    if not nombre_titular or not nombre_titular.strip():
+        errores['nombre_titular'] = 'El nombre del titular es obligatorio.'
+    if not numero_tarjeta or not numero_tarjeta.isdigit() or len(numero_tarjeta) != 16:
+        errores['numero_tarjeta'] = 'El número de tarjeta debe tener 16 dígitos numéricos.'
+    import re, datetime
+    if not fecha_expiracion or not re.match(r'^(0[1-9]|1[0-2])/\d{4}$', fecha_expiracion):
+        errores['fecha_expiracion'] = 'La fecha de expiración debe tener formato MM/YYYY.'
+    else:
+        mes, anio = fecha_expiracion.split('/')
+        try:
+            if datetime.date(int(anio), int(mes), 1) < datetime.date.today().replace(day=1):
+                errores['fecha_expiracion'] = 'La fecha de expiración debe ser futura.'
+        except Exception:
+            errores['fecha_expiracion'] = 'La fecha de expiración no es válida.'
+    return errores
+
+
+# Generar registros con una mezcla de valores válidos e inválidos
+def generar(cantidad: int, semilla: int = 42) -> list:
+    rnd = random.Random(semilla)
+    opciones = {
+        'contrasena': ['abc12345', 'corta1', 'solotexto', 'Segura2024!'],
+        'telefono': ['88887777', '8888-7777', '50688887777'],
+        'fecha_nacimiento': ['1990-05-17', '17/05/1990', '', '2001-02-29'],
+        'respuesta_recuperacion': ['saprissa', ''],
+        'nombre_titular': ['Ana Pérez', '  '],
+        'numero_tarjeta': ['4111111111111111', '41111111', '5500x00000000004'],
+        'fecha_expiracion': ['12/2030', '01/2020', '13/2030', '06/2029'],
+    }
+    return [{campo: rnd.choice(opciones[campo]) for campo in CAMPOS} for _ in range(cantidad)]
+
+
+# Medir validaciones por segundo
+def medir(funcion, registros) -> float:
+    inicio = time.perf_counter()
+    for registro in registros:
+        funcion(registro)
+    return len(registros) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=50000)
+    args = parser.parse_args()
+
+    registros = generar(args.registros)
+    # Ambas implementaciones deben reportar los mismos errores (salvo el número de tarjeta,
+    # que ahora se valida con Luhn y la longitud de su marca, y la fecha de nacimiento vacía,
+    # que antes pasaba la validación y la rechazaba la base de datos)
+    for registro in registros[:1000]:
+        antes, despues = validar_antes(registro), REGLAS_REGISTRO.validar(registro)
+        antes.pop('numero_tarjeta', None)
+        despues.pop('numero_tarjeta', None)
+        if not registro['fecha_nacimiento']:
+            despues.pop('fecha_nacimiento')
+        assert antes == despues, registro
+
+    antes = medir(validar_antes, registros)
+    despues = medir(REGLAS_REGISTRO.validar, registros)
+    print(f"validadores anteriores: {antes:>10.0f} registros/s ({len(CAMPOS)} campos por registro)")
+    print(f"motor de reglas:        {despues:>10.0f} registros/s ({len(CAMPOS)} campos por registro)")
+    print(f"mejora: x{despues / antes:.2f}")
+
+
+if __name__ == "__main__":
+    main()
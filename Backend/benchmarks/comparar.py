@@ -0,0 +1,40 @@
+"""
+Compara dos corridas de bench_endpoints o bench_micro (archivos JSON).
+
+Muestra el cambio de cada métrica (p50/p95/p99, solicitudes/s, µs por operación) entre la corrida
+base y la nueva, y termina con código 1 si alguna empeora más que la tolerancia.
+
+Uso (desde la carpeta Backend):
+    python -m benchmarks.comparar base.json nuevo.json --tolerancia 0.10
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.comun import comparar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("nuevo")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Empeoramiento relativo permitido (0.10 = 10 %%)")
+    args = parser.parse_args()
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.nuevo, encoding='utf-8') as f:
+        nuevo = json.load(f)
+
+    print(f"base: {base.get('commit')} ({base.get('fecha')})  nuevo: {nuevo.get('commit')} ({nuevo.get('fecha')})")
+    filas = comparar(base, nuevo, args.tolerancia)
+    for id_resultado, metrica, anterior, actual, cambio, regresion in filas:
+        marca = 'REGRESIÓN' if regresion else ''
+        print(f"{id_resultado:<44} {metrica:<10} {anterior:>12.3f} -> {actual:>12.3f} ({cambio:+7.1%}) {marca}")
+    regresiones = sum(1 for fila in filas if fila[-1])
+    print(f"{len(filas)} métricas comparadas, {regresiones} regresiones (tolerancia {args.tolerancia:.0%})")
+    sys.exit(1 if regresiones else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Utilidades compartidas por la suite de benchmarks (bench_endpoints, bench_micro y comparar).
+
+Los resultados se guardan como JSON con los metadatos de la corrida (commit, Python, plataforma) y
+una lista de mediciones identificadas por "id", para poder compararlos entre commits.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Métricas comparables y si un valor mayor es mejor
+METRICAS_COMPARABLES = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'rps': True,
+    'us_por_op': False,
+    'rss_mb': False,
+}
+
+
+# Preparar variables de entorno aisladas
+def preparar_entorno(carpeta: str, **extra):
+    """
+    Apunta la base de datos, las claves y las imágenes a una carpeta temporal para no tocar los
+    archivos reales. Debe llamarse antes de importar config (es decir, cualquier módulo de la API).
+    """
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(carpeta, 'bench.db')}",
+        'ASYNC_DATABASE_URL': '',
+        'FERNET_KEYS': '',
+        'FERNET_KEY_PATH': os.path.join(carpeta, 'clave_fernet.key'),
+        'TOKEN_SECRETO': '',
+        'TOKEN_SECRETO_PATH': os.path.join(carpeta, 'clave_tokens.key'),
+        'UPLOADS_DIR': os.path.join(carpeta, 'uploads'),
+        'ALMACENAMIENTO_IMAGENES': 'local',
+        'ALMACEN_CONTADORES': 'memoria',
+        'PERFILADOR_ACTIVO': '0',
+        **{clave: str(valor) for clave, valor in extra.items()},
+    })
+
+
+# Percentil por interpolación lineal (misma definición que numpy por defecto)
+def percentil(ordenados: list, p: float) -> float:
+    if not ordenados:
+        return math.nan
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = math.floor(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+# Resumen de latencias en milisegundos
+def resumen_latencias(latencias: list) -> dict:
+    ordenadas = sorted(latencias)
+    return {
+        'p50_ms': round(percentil(ordenadas, 50) * 1000, 3),
+        'p95_ms': round(percentil(ordenadas, 95) * 1000, 3),
+        'p99_ms': round(percentil(ordenadas, 99) * 1000, 3),
+        'max_ms': round(ordenadas[-1] * 1000, 3) if ordenadas else math.nan,
+    }
+
+
+# Metadatos de la corrida
+def metadatos(parametros: dict) -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parametros': parametros,
+    }
+
+
+# Guardar los resultados
+def guardar_json(ruta: str, parametros: dict, resultados: list):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({**metadatos(parametros), 'resultados': resultados}, archivo, ensure_ascii=False, indent=2)
+
+
+# Comparar dos corridas
+def comparar(base: dict, actual: dict, tolerancia: float) -> list:
+    """
+    Devuelve (id, métrica, valor base, valor actual, cambio relativo, es_regresion) para cada métrica
+    presente en ambas corridas. Un cambio es regresión si empeora más que la tolerancia (0.10 = 10 %).
+    """
+    anteriores = {r['id']: r for r in base['resultados']}
+    filas = []
+    for resultado in actual['resultados']:
+        anterior = anteriores.get(resultado['id'])
+        if anterior is None:
+            continue
+        for metrica, mayor_es_mejor in METRICAS_COMPARABLES.items():
+            if metrica not in resultado or metrica not in anterior or not anterior[metrica]:
+                continue
+            cambio = (resultado[metrica] - anterior[metrica]) / anterior[metrica]
+            empeora = -cambio if mayor_es_mejor else cambio
+            filas.append((resultado['id'], metrica, anterior[metrica], resultado[metrica], cambio, empeora > tolerancia))
+    return filas
@@ -1,12 +1,27 @@
 from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
-from Modelos import db
 from Modelos.Usuario import Usuario
 from Modelos.Roles import Rol
 from Servicios.Usuario_Servicio import Usuario_Servicio
 from Controladores.Usuario_Controlador import router as usuario_router
 from Controladores.Catalogos_Controlador import router as catalogos_router
+from Controladores.Metricas_Controlador import router as metricas_router
+from Controladores.Salud_Controlador import router as salud_router
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from Servicios.Hash_Servicio import Hash_Servicio, ColaHashLlenaError
+from Servicios.Token_Servicio import Token_Servicio
+from Servicios.Arranque_Servicio import Arranque_Servicio
+from Servicios.Trabajador import Trabajador
+from Servicios.Similitud_Servicio import Similitud_Servicio
+from Base_de_Datos.db import AsyncSessionLocal, async_engine
+from Middlewares.Limitador_Middleware import Limitador_Middleware
+from Middlewares.Metricas_Middleware import Metricas_Middleware
+from Middlewares.Idempotencia_Middleware import Idempotencia_Middleware
+from Servicios.Metricas_Servicio import Metricas_Servicio
+import config
+import asyncio
+from contextlib import asynccontextmanager
 from typing import Optional
 import uvicorn
 import os
@@ -14,8 +29,52 @@ import os
 # Dependencia para obtener la sesión de base de datos
 from Base_de_Datos.db_session import get_db
 
+# Ciclo de vida: precalentar el worker antes de aceptar tráfico y liberar los recursos al apagar
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await Arranque_Servicio.precalentar()
+    app.state.sincronizacion_tokens = asyncio.create_task(Token_Servicio.tarea_sincronizacion(AsyncSessionLocal))
+    app.state.sincronizacion_similitud = asyncio.create_task(Similitud_Servicio.tarea_sincronizacion(AsyncSessionLocal))
+    # Con varios workers cada uno guarda sus métricas en METRICAS_DIR y /metrics las suma
+    guardar_metricas = config.METRICAS_ACTIVO and bool(config.METRICAS_DIR)
+    if guardar_metricas:
+        app.state.guardado_metricas = asyncio.create_task(Metricas_Servicio.tarea_guardado())
+    # Trabajador de la cola en el mismo proceso (con COLA_TRABAJADOR_EMBEBIDO=0 se ejecuta aparte con Herramientas/trabajador.py)
+    trabajador = Trabajador() if config.COLA_TRABAJADOR_EMBEBIDO else None
+    if trabajador is not None:
+        app.state.trabajador = asyncio.create_task(trabajador.ejecutar())
+    yield
+    # Desde aquí /readyz responde 503 mientras se terminan las solicitudes en curso
+    Arranque_Servicio.listo = False
+    app.state.sincronizacion_tokens.cancel()
+    app.state.sincronizacion_similitud.cancel()
+    if guardar_metricas:
+        app.state.guardado_metricas.cancel()
+    if trabajador is not None:
+        # Dentro del margen de gunicorn tras el apagado de uvicorn; lo que no termine se retoma al vencer el bloqueo
+        await trabajador.detener(5)
+        app.state.trabajador.cancel()
+    if guardar_metricas:
+        Metricas_Servicio.guardar_proceso()
+    Hash_Servicio.cerrar()
+    await async_engine.dispose()
+
 # Inicialización de FastAPI
-app = FastAPI(title="IntelliHome API", description="API para autenticación y gestión de propiedades")
+app = FastAPI(
+    title="IntelliHome API",
+    description="API para autenticación y gestión de propiedades",
+    # Las respuestas se validan con los modelos de Esquemas/ y se serializan con orjson
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+# Limitación de tasa por IP e identificador en login, recuperación y búsqueda por token
+if config.LIMITE_TASA_ACTIVO:
+    app.add_middleware(Limitador_Middleware)
+
+# Claves de idempotencia en el registro (los reintentos reciben la respuesta guardada)
+if config.IDEMPOTENCIA_ACTIVO:
+    app.add_middleware(Idempotencia_Middleware)
 
 # Configuración de CORS (opcional, útil para desarrollo móvil)
 app.add_middleware(
@@ -26,6 +85,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas por ruta y consultas SQL (el último middleware agregado es el más externo: mide también el limitador)
+if config.METRICAS_ACTIVO:
+    app.add_middleware(Metricas_Middleware, rutas=app.routes)
+    Metricas_Servicio.instrumentar_engine(async_engine.sync_engine)
+
+# Respuesta 503 cuando la cola de hashing de contraseñas está llena
+@app.exception_handler(ColaHashLlenaError)
+async def cola_hash_llena_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": {"servicio": str(exc)}},
+        headers={"Retry-After": "1"},
+    )
+
 # Endpoint de prueba
 @app.get("/")
 def read_root():
@@ -35,7 +108,11 @@ def read_root():
 # Registrar el router modular de usuarios
 app.include_router(usuario_router)
 app.include_router(catalogos_router)
+app.include_router(salud_router)
+if config.METRICAS_ACTIVO:
+    app.include_router(metricas_router)
 
-# Para correr: uvicorn app:app --reload
+# Desarrollo: python main.py (un worker con recarga automática).
+# Producción: python servidor.py (varios workers con gunicorn, ver servidor.py)
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, forwarded_allow_ips=config.FORWARDED_ALLOW_IPS)
@@ -18,14 +18,21 @@ if config.config_file_name is not None:
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from Modelos import db
+from Modelos import Base
 from Modelos.Usuario import Usuario
 from Modelos.Roles import Rol
 from Modelos.Hobby import Hobby, UsuarioHobby
 from Modelos.TipoCasa import TipoCasa
 from Modelos.PreguntaRecuperacion import PreguntaRecuperacion
 from Modelos.UsuarioTipoCasa import UsuarioTipoCasa
-target_metadata = db.Model.metadata
+from Modelos.TokenRevocado import TokenRevocado
+from Modelos.Trabajo import Trabajo
+target_metadata = Base.metadata
+
+# La URL de la base de datos se toma de la configuración de la aplicación
+import config as app_config
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", app_config.DATABASE_URL.replace("%", "%%"))
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
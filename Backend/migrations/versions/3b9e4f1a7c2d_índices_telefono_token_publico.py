@@ -0,0 +1,52 @@
+"""Índices para telefono y token_publico
+
+Revision ID: 3b9e4f1a7c2d
+Revises: 57d27879b8cc
+Create Date: 2026-10-18 10:12:31.402115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e4f1a7c2d'
+down_revision: Union[str, Sequence[str], None] = '57d27879b8cc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Valores repetidos que impiden crear un índice único
+def _verificar_unicos(columna: str) -> None:
+    """
+    Los índices son únicos: si la tabla ya tiene valores repetidos, CREATE UNIQUE INDEX falla con
+    un error del motor que no dice cuáles son. Se listan para corregirlos (o eliminar los usuarios
+    duplicados) antes de volver a ejecutar la migración.
+    """
+    repetidos = op.get_bind().execute(sa.text(
+        f'SELECT {columna}, COUNT(*) FROM usuario WHERE {columna} IS NOT NULL '
+        f'GROUP BY {columna} HAVING COUNT(*) > 1 ORDER BY COUNT(*) DESC LIMIT 20'
+    )).all()
+    if repetidos:
+        detalle = ', '.join(f'{valor!r} ({cantidad} usuarios)' for valor, cantidad in repetidos)
+        raise RuntimeError(
+            f'No se puede crear el índice único de usuario.{columna}: hay valores repetidos. '
+            f'Corríjalos antes de migrar. Repetidos (hasta 20): {detalle}'
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _verificar_unicos('telefono')
+    _verificar_unicos('token_publico')
+    # Búsquedas por teléfono (login/recuperación) y por token público (huella)
+    op.create_index(op.f('ix_usuario_telefono'), 'usuario', ['telefono'], unique=True)
+    op.create_index(op.f('ix_usuario_token_publico'), 'usuario', ['token_publico'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_usuario_token_publico'), table_name='usuario')
+    op.drop_index(op.f('ix_usuario_telefono'), table_name='usuario')
@@ -0,0 +1,34 @@
+"""Tabla de tokens revocados
+
+Revision ID: 8c41d7e2a9f0
+Revises: 3b9e4f1a7c2d
+Create Date: 2026-10-18 11:40:05.218337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d7e2a9f0'
+down_revision: Union[str, Sequence[str], None] = '3b9e4f1a7c2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tokens_revocados',
+    sa.Column('jti', sa.String(length=32), nullable=False),
+    sa.Column('expira', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_tokens_revocados_expira'), 'tokens_revocados', ['expira'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tokens_revocados_expira'), table_name='tokens_revocados')
+    op.drop_table('tokens_revocados')
@@ -0,0 +1,44 @@
+"""Tabla de la cola de trabajos
+
+Revision ID: 9cb2a5bc7db8
+Revises: 8c41d7e2a9f0
+Create Date: 2026-10-18 10:40:34.200290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9cb2a5bc7db8'
+down_revision: Union[str, Sequence[str], None] = '8c41d7e2a9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trabajos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('datos', sa.Text(), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('max_intentos', sa.Integer(), nullable=False),
+    sa.Column('creado_en', sa.Float(), nullable=False),
+    sa.Column('disponible_en', sa.Float(), nullable=False),
+    sa.Column('bloqueado_hasta', sa.Float(), nullable=True),
+    sa.Column('trabajador', sa.String(length=100), nullable=True),
+    sa.Column('ultimo_error', sa.Text(), nullable=True),
+    sa.Column('terminado_en', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_trabajos_estado_disponible_en', 'trabajos', ['estado', 'disponible_en'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trabajos_estado_disponible_en', table_name='trabajos')
+    op.drop_table('trabajos')
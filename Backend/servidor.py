@@ -0,0 +1,113 @@
+"""
+Servidor de producción: gunicorn con workers de uvicorn.
+
+- SERVIDOR_WORKERS procesos (por defecto uno por núcleo). Los procesos de bcrypt de cada worker se
+  reparten los núcleos restantes (HASH_WORKERS = núcleos / workers, salvo que se defina).
+- preload: main.py se importa una sola vez en el proceso maestro y los workers se crean con fork,
+  así comparten la memoria de los módulos y arrancan más rápido. El maestro también carga (y si
+  no existen, crea) la clave Fernet y el secreto de tokens antes del fork: todos los workers
+  heredan las mismas claves.
+- Con varios workers, las métricas de cada uno se guardan en METRICAS_DIR (una carpeta temporal si
+  no se define) y /metrics devuelve la suma de todos. Los contadores de ALMACEN_CONTADORES=memoria
+  son de cada worker: el límite de tasa se multiplica por la cantidad de workers y una clave de
+  idempotencia repetida solo se detecta si llega al mismo worker. Al arrancar se advierte; en
+  producción conviene ALMACEN_CONTADORES=redis.
+- Cada worker ejecuta el lifespan (Arranque_Servicio.precalentar) antes de aceptar conexiones;
+  si el precalentamiento falla, el worker no arranca en lugar de atender en frío.
+- SIGTERM: se dejan de aceptar conexiones y se esperan las solicitudes en curso hasta
+  SERVIDOR_APAGADO_SEGUNDOS; SIGHUP recarga los workers uno a uno sin cortar el servicio.
+
+Uso (desde la carpeta Backend):
+    python servidor.py
+    SERVIDOR_WORKERS=4 SERVIDOR_BIND=0.0.0.0:8000 python servidor.py
+"""
+import glob
+import logging
+import os
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+import config
+
+
+class Worker(UvicornWorker):
+    # El lifespan es obligatorio (un error al precalentar detiene el worker) y el apagado de uvicorn
+    # termina antes de que gunicorn mate el proceso, para que el lifespan libere los recursos
+    CONFIG_KWARGS = {
+        "loop": "auto",
+        "http": "auto",
+        "lifespan": "on",
+        "timeout_graceful_shutdown": config.SERVIDOR_APAGADO_SEGUNDOS,
+    }
+
+
+class Servidor(BaseApplication):
+    """
+    Aplicación gunicorn configurada desde config.py (sin archivo de configuración aparte).
+    """
+
+    def __init__(self, opciones: dict):
+        self.opciones = opciones
+        super().__init__()
+
+    def load_config(self):
+        for clave, valor in self.opciones.items():
+            self.cfg.set(clave, valor)
+
+    def load(self):
+        from main import app
+        from Servicios.Cifrado_Servicio import Cifrado_Servicio
+        from Servicios.Token_Servicio import Token_Servicio
+
+        # Con preload se ejecuta en el maestro: los archivos de claves se crean una sola vez
+        Cifrado_Servicio.cargar()
+        Token_Servicio.cargar()
+        if config.SERVIDOR_WORKERS > 1 and config.ALMACEN_CONTADORES == 'memoria':
+            logging.getLogger('gunicorn.error').warning(
+                "%d workers con ALMACEN_CONTADORES=memoria: el límite de tasa y las claves de idempotencia "
+                "son de cada worker (los intentos de login se cuentan en la base de datos). "
+                "Use ALMACEN_CONTADORES=redis para compartirlos.", config.SERVIDOR_WORKERS
+            )
+        return app
+
+
+# Carpeta de métricas compartida por los workers
+def preparar_metricas():
+    """
+    Usa METRICAS_DIR o crea una carpeta temporal, y descarta las series de una ejecución anterior.
+    Los workers heredan la configuración con el fork.
+    """
+    if not config.METRICAS_DIR:
+        config.METRICAS_DIR = tempfile.mkdtemp(prefix='intellihome-metricas-')
+    os.makedirs(config.METRICAS_DIR, exist_ok=True)
+    for ruta in glob.glob(os.path.join(config.METRICAS_DIR, '*.json')):
+        os.remove(ruta)
+
+
+# Opciones de gunicorn
+def opciones() -> dict:
+    return {
+        'bind': config.SERVIDOR_BIND,
+        'workers': config.SERVIDOR_WORKERS,
+        'worker_class': Worker,
+        'preload_app': True,
+        'graceful_timeout': config.SERVIDOR_APAGADO_SEGUNDOS + 5,
+        'keepalive': config.SERVIDOR_KEEPALIVE,
+        'max_requests': config.SERVIDOR_MAX_SOLICITUDES,
+        'max_requests_jitter': config.SERVIDOR_MAX_SOLICITUDES // 10,
+        'forwarded_allow_ips': config.FORWARDED_ALLOW_IPS,
+        'accesslog': '-',
+    }
+
+
+if __name__ == "__main__":
+    # Sin HASH_WORKERS explícito, cada worker web usa su parte de los núcleos para bcrypt
+    if 'HASH_WORKERS' not in os.environ:
+        config.HASH_WORKERS = max(1, (os.cpu_count() or 1) // config.SERVIDOR_WORKERS)
+    # Los workers heredan la configuración con el fork (preload)
+    config.API_PROCESOS = config.SERVIDOR_WORKERS
+    if config.SERVIDOR_WORKERS > 1 and config.METRICAS_ACTIVO:
+        preparar_metricas()
+    Servidor(opciones()).run()
@@ -46,13 +46,31 @@ class Register : BaseActivity() {
     private var imagenUsuarioUri: android.net.Uri? = null
 
     // Constante para el código de solicitud de selección de imagen
-    companion object { private const val REQUEST_CODE_PICK_IMAGE = 1001 }
+    companion object {
+        private const val REQUEST_CODE_PICK_IMAGE = 1001
+        // Intentos del registro ante errores de red (el servidor deduplica con la clave de idempotencia)
+        private const val MAX_INTENTOS_REGISTRO = 3
+    }
 
     override fun onResume() {
         super.onResume()
         applyAppAppearance(binding.root)
     }
 
+    // Ejecuta la llamada y la repite ante errores de red, esperando un poco más en cada intento
+    private suspend fun <T> conReintentos(llamada: suspend () -> T): T {
+        var intento = 1
+        while (true) {
+            try {
+                return llamada()
+            } catch (e: java.io.IOException) {
+                if (intento >= MAX_INTENTOS_REGISTRO) throw e
+                kotlinx.coroutines.delay(1000L * intento)
+                intento++
+            }
+        }
+    }
+
     // Crea un archivo temporal a partir de una URI
     private fun crearArchivoTemp(uri: android.net.Uri): java.io.File? {
         return try {
@@ -284,6 +302,8 @@ class Register : BaseActivity() {
             val numeroTarjetaRB = numeroEncriptado.toRequestBody(textPlainUtf8)
             val fechaExpiracionRB = fechaExpiracion.toRequestBody(textPlainUtf8)
             val tokenPublicoRB = (tokenPublico ?: "").toRequestBody(textPlainUtf8)
+            // Clave de idempotencia: los reintentos de este envío reciben la respuesta original sin registrar de nuevo
+            val claveIdempotencia = java.util.UUID.randomUUID().toString()
             val nombreArchivoSeguro = archivoTemp.name.replace(Regex("[^A-Za-z0-9._-]"), "_") // Asegurar nombre de archivo seguro
             val imagenPerfilPart = okhttp3.MultipartBody.Part.createFormData("imagen_perfil", nombreArchivoSeguro, archivoTemp.asRequestBody("image/*".toMediaType()))
 
@@ -301,13 +321,15 @@ class Register : BaseActivity() {
                             .apply()
                     }
 
-                    // Intenta de registrar el usuario
+                    // Intenta de registrar el usuario (reintenta con la misma clave si falla la red)
                     try {
-                        val response = usuarioRepo.registrarUsuario(
-                            nombreRB, apellidosRB, usernameRB, correoRB, telefonoRB, fechaNacimientoRB, domicilioRB, contrasenaRB,
-                            imagenPerfilPart, hobbiesIdsRB, tiposCasaIdsRB, preguntaRecuperacionIdRB, respuestaRecuperacionRB, permitirHuellaRB,
-                            nombreTitularRB, numeroTarjetaRB, fechaExpiracionRB, tokenPublicoRB
-                        )
+                        val response = conReintentos {
+                            usuarioRepo.registrarUsuario(
+                                nombreRB, apellidosRB, usernameRB, correoRB, telefonoRB, fechaNacimientoRB, domicilioRB, contrasenaRB,
+                                imagenPerfilPart, hobbiesIdsRB, tiposCasaIdsRB, preguntaRecuperacionIdRB, respuestaRecuperacionRB, permitirHuellaRB,
+                                nombreTitularRB, numeroTarjetaRB, fechaExpiracionRB, tokenPublicoRB, claveIdempotencia
+                            )
+                        }
                         if (response.isSuccessful) {
                             val body = response.body()
                             if (body?.errores.isNullOrEmpty()) {
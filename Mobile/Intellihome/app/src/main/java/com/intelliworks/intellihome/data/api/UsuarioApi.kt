@@ -31,7 +31,8 @@ interface UsuarioApi {
         @Part("nombre_titular") nombreTitular: RequestBody,
         @Part("numero_tarjeta") numeroTarjeta: RequestBody,
         @Part("fecha_expiracion") fechaExpiracion: RequestBody,
-        @Part("token_publico") tokenPublico: RequestBody
+        @Part("token_publico") tokenPublico: RequestBody,
+        @Header("Idempotency-Key") claveIdempotencia: String
     ): Response<UsuarioRegistroResponseDto>
 
     @FormUrlEncoded
@@ -14,6 +14,14 @@ data class LoginResponseDto(
     @SerializedName("estado_cuenta")
     val estadoCuenta: String?,
 
+    // Tokens de sesión (el de acceso se envía como "Authorization: Bearer <token>")
+    @SerializedName("access_token")
+    val accessToken: String?,
+    @SerializedName("refresh_token")
+    val refreshToken: String?,
+    @SerializedName("expires_in")
+    val expiresIn: Int?,
+
     // Estos campos solo vendrán si hay un error (según tu Python)
     val errores: Map<String, String>?,
     val mensaje: String?
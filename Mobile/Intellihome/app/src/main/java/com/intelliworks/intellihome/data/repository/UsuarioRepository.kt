@@ -26,7 +26,8 @@ class UsuarioRepository(private val api: UsuarioApi) {
         nombreTitular: RequestBody,
         numeroTarjeta: RequestBody,
         fechaExpiracion: RequestBody,
-        tokenPublico: RequestBody
+        tokenPublico: RequestBody,
+        claveIdempotencia: String
     ): Response<UsuarioRegistroResponseDto> =
         api.registrarUsuario(
             nombre,
@@ -46,7 +47,8 @@ class UsuarioRepository(private val api: UsuarioApi) {
             nombreTitular,
             numeroTarjeta,
             fechaExpiracion,
-            tokenPublico
+            tokenPublico,
+            claveIdempotencia
         )
 
     suspend fun loginUsuario(identificador: String, contrasena: String): Response<LoginResponseDto> {